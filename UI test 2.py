@@ -2,9 +2,13 @@ from kivymd.app import MDApp
 from kivymd.uix.button import MDRaisedButton
 from kivymd.uix.label import MDLabel
 from kivymd.uix.boxlayout import BoxLayout
-from kivy.uix.scrollview import ScrollView
+from kivymd.uix.textfield import MDTextField
+from kivy.uix.spinner import Spinner
+from kivy.uix.recycleview import RecycleView
+from kivy.lang import Builder
 from kivy.clock import Clock
 from threading import Thread
+from functools import partial
 
 import os
 
@@ -13,12 +17,109 @@ base_path = os.path.dirname(os.path.abspath(__file__))
 
 print(f"Τρέχουμε από το: {base_path}")
 
-# Εισαγωγές από τον αρχικό κώδικα
-from sidp02 import main, clean_duplicate_products, analyze_products
-from sidp02 import top_isolate_products, top_mass_gainer_products, top_hydrolyzed_products, top_whey_products
+# Εισαγωγές από τον αρχικό κώδικα. Το sidp02 φορτώνει μόνο τη βάση και τις κατατάξεις· η στοίβα
+# του scraping (requests, Selenium, lxml) φορτώνεται όταν πατηθεί το κουμπί του scraping
+from sidp02 import main, clean_duplicate_products, product_rows, search_product_ids, CATEGORIES
+from query_service import QueryService
+from progress import ScrapeProgress
+
+ALL_STORES = "Όλα τα καταστήματα"
+ALL_CATEGORIES = "Όλες οι κατηγορίες"
+
+# Ταξινόμηση: (πεδίο, φθίνουσα). Τα προϊόντα χωρίς τιμή στο πεδίο πάνε πάντα στο τέλος
+SORT_OPTIONS = {
+    "Τιμή/γρ ↑": ("price_per_gram", False),
+    "Τιμή/γρ ↓": ("price_per_gram", True),
+    "Τιμή ↑": ("price", False),
+    "Τιμή ↓": ("price", True),
+    "Βάρος ↓": ("grams", True),
+    "Όνομα": ("name", False),
+}
+
+# Η λίστα αποτελεσμάτων: το RecycleView φτιάχνει widgets μόνο για τις ορατές γραμμές
+# και τα ξαναχρησιμοποιεί καθώς κάνουμε scroll, όσα προϊόντα κι αν έχει η λίστα
+Builder.load_string("""
+<ProductRow@BoxLayout>:
+    orientation: "vertical"
+    padding: dp(6), dp(2)
+    name: ""
+    details: ""
+    MDLabel:
+        text: root.name
+        bold: True
+        shorten: True
+        shorten_from: "right"
+    MDLabel:
+        text: root.details
+        theme_text_color: "Secondary"
+        font_style: "Caption"
+        shorten: True
+        shorten_from: "right"
+
+<ResultsList>:
+    viewclass: "ProductRow"
+    RecycleBoxLayout:
+        default_size: None, dp(56)
+        default_size_hint: 1, None
+        size_hint_y: None
+        height: self.minimum_height
+        orientation: "vertical"
+""")
+
+
+class ResultsList(RecycleView):
+    pass
+
+
+def product_row_data(product):
+    """Τα δεδομένα μιας γραμμής της λίστας (τα κλειδιά είναι ιδιότητες του ProductRow)."""
+    details = [f"{product['price']:.2f}€"]
+    if product["grams"]:
+        details.append(f"{product['grams']}g")
+    if product["price_per_gram"] is not None:
+        details.append(f"{product['price_per_gram']:.4f}€/γρ")
+    details.append(", ".join(product["stores"]))
+    return {"name": product["name"], "details": " · ".join(details)}
+
+
+def load_product_list():
+    """
+    Τα προϊόντα της βάσης σε στήλες (βλ. ranking.ProductColumns), με τις γραμμές τους ήδη
+    μορφοποιημένες (τρέχει σε worker).
+    """
+    # Το NumPy φορτώνεται εδώ και όχι στην εκκίνηση του UI
+    from ranking import ProductColumns
+
+    products = product_rows()
+    for product in products:
+        product["row"] = product_row_data(product)
+    return ProductColumns(products)
+
+
+def visible_products(products, store, category, max_price_per_gram, sort_option, search=None):
+    """
+    Οι γραμμές της λίστας για ένα συνδυασμό φίλτρων και ταξινόμησης (τρέχει σε worker).
+    Με search, μένουν μόνο τα προϊόντα που βρίσκει η αναζήτηση κειμένου της βάσης.
+    """
+    field, descending = SORT_OPTIONS[sort_option]
+    ids = search_product_ids(search) if search else None
+    visible = products.view(store, category, max_price_per_gram, field, descending, ids)
+    return [product["row"] for product in visible]
+
 
 class ProteinApp(MDApp):
     def build(self):
+        self.products = None
+        self.requested_view = None
+        # Η πρόοδος του scraping που τρέχει (None όταν δεν τρέχει)
+        self.progress = None
+        self.progress_event = None
+        self.shown_progress = None
+        # Τα ερωτήματα τρέχουν σε worker pool και τα αποτελέσματα γυρίζουν στο main thread
+        self.queries = QueryService(deliver=lambda callback: Clock.schedule_once(lambda dt: callback(), 0))
+        # Πολλές αλλαγές φίλτρων στο ίδιο frame (π.χ. από τα κουμπιά κατηγοριών) γίνονται ένα ερώτημα
+        self.refresh_view = Clock.create_trigger(self.apply_filters)
+
         layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
 
         # Τίτλος εφαρμογής
@@ -59,74 +160,174 @@ class ProteinApp(MDApp):
             button.bind(on_press=callback)
             layout.add_widget(button)
 
-        # Περιοχή εμφάνισης αποτελεσμάτων
-        scroll_view = ScrollView(size_hint=(1, 1))
-        self.result_label = MDLabel(
+        # Αναζήτηση στα ονόματα (χωρίς διάκριση πεζών/κεφαλαίων και τόνων)
+        self.search_field = MDTextField(hint_text="Αναζήτηση προϊόντος", multiline=False, size_hint=(1, 0.1))
+        self.search_field.bind(text=self.refresh_view)
+        layout.add_widget(self.search_field)
+
+        # Φίλτρα και ταξινόμηση της λίστας
+        filters = BoxLayout(orientation='horizontal', spacing=10, size_hint=(1, 0.1))
+        self.store_filter = Spinner(text=ALL_STORES, values=[ALL_STORES])
+        self.category_filter = Spinner(text=ALL_CATEGORIES, values=[ALL_CATEGORIES] + list(CATEGORIES))
+        self.price_filter = MDTextField(hint_text="Μέγ. €/γρ", input_filter="float", multiline=False)
+        self.sort_choice = Spinner(text="Τιμή/γρ ↑", values=list(SORT_OPTIONS))
+        for spinner in (self.store_filter, self.category_filter, self.sort_choice):
+            spinner.bind(text=self.refresh_view)
+        self.price_filter.bind(text=self.refresh_view)
+        for widget in (self.store_filter, self.category_filter, self.price_filter, self.sort_choice):
+            filters.add_widget(widget)
+        layout.add_widget(filters)
+
+        # Μηνύματα κατάστασης (scraping, σφάλματα, πλήθος αποτελεσμάτων)
+        self.status_label = MDLabel(
             text="",
-            size_hint_y=None,
             halign="left",
             theme_text_color="Custom",
             text_color=(0, 0, 0, 1),
-            markup=True  # Υποστήριξη για μορφοποίηση κειμένου
+            size_hint=(1, 0.08)
         )
-        self.result_label.bind(texture_size=self.result_label.setter('size'))
-        scroll_view.add_widget(self.result_label)
-        layout.add_widget(scroll_view)
+        layout.add_widget(self.status_label)
 
+        # Περιοχή εμφάνισης αποτελεσμάτων
+        self.results_list = ResultsList(size_hint=(1, 1))
+        layout.add_widget(self.results_list)
+
+        self.load_products()
         return layout
 
-    def update_label(self, message):
-        """Ενημέρωση ετικέτας αποτελεσμάτων."""
-        def update(dt):
-            if isinstance(message, list):
-                self.result_label.text = "\n".join(message)
-            else:
-                current_text = self.result_label.text
-                self.result_label.text = current_text + "\n" + message if current_text else message
-        Clock.schedule_once(update, 0)
+    def on_stop(self):
+        self.queries.close()
+
+    def show_error(self, error):
+        self.status_label.text = f"Σφάλμα: {error}"
+
+    def load_products(self):
+        """Φορτώνει όλα τα προϊόντα από τη βάση σε worker και ανανεώνει τη λίστα."""
+        if not self.queries.get("products", load_product_list, self.set_products, self.show_error):
+            self.status_label.text = "Φόρτωση προϊόντων..."
+
+    def set_products(self, products):
+        self.products = products
+        self.store_filter.values = [ALL_STORES] + products.stores
+        if self.store_filter.text not in self.store_filter.values:
+            self.store_filter.text = ALL_STORES
+        self.apply_filters()
+
+    def apply_filters(self, *args):
+        """
+        Ζητάει από την υπηρεσία ερωτημάτων τις γραμμές για τα τρέχοντα φίλτρα. Κάθε συνδυασμός
+        φίλτρων υπολογίζεται μία φορά ανά φόρτωμα δεδομένων και μετά απαντιέται από την cache.
+        """
+        if self.progress is not None:
+            # Όσο τρέχει το scraping η λίστα δείχνει τα προσωρινά Top της κατηγορίας
+            self.shown_progress = None
+            self.show_progress()
+            return
+        if self.products is None:
+            return
+        try:
+            max_price_per_gram = float(self.price_filter.text) if self.price_filter.text else None
+        except ValueError:
+            max_price_per_gram = None
+        view = (
+            None if self.store_filter.text == ALL_STORES else self.store_filter.text,
+            None if self.category_filter.text == ALL_CATEGORIES else self.category_filter.text,
+            max_price_per_gram,
+            self.sort_choice.text,
+            self.search_field.text.strip() or None,
+        )
+        self.requested_view = view
+        self.queries.get(("view",) + view, partial(visible_products, self.products, *view),
+                         partial(self.show_view, view), self.show_error)
+
+    def show_view(self, view, rows):
+        # Αποτελέσματα για φίλτρα που άλλαξαν στο μεταξύ αγνοούνται
+        if view != self.requested_view:
+            return
+        self.results_list.data = rows
+        self.results_list.scroll_y = 1
+        self.status_label.text = f"{len(rows)} από {len(self.products)} προϊόντα"
+        if not rows:
+            self.status_label.text = "Δεν βρέθηκαν αποτελέσματα."
 
     def run_scraping(self, instance):
-        """Ξεκινάει το scraping και εμφανίζει μήνυμα."""
-        self.result_label.text = "Ξεκινάμε το scraping...\nΠαρακαλώ περιμένετε."
-        Thread(target=self.scraping_task).start()
+        """Ξεκινάει το scraping και εμφανίζει την πρόοδό του όσο τρέχει."""
+        if self.progress is not None:
+            return
+        self.status_label.text = "Ξεκινάμε το scraping... Παρακαλώ περιμένετε."
+        self.progress = ScrapeProgress()
+        self.shown_progress = None
+        self.requested_view = None
+        self.progress_event = Clock.schedule_interval(self.show_progress, 0.5)
+        Thread(target=self.scraping_task, args=(self.progress,)).start()
 
-    def scraping_task(self):
+    def scraping_task(self, progress):
         """Εκτελεί το scraping σε ξεχωριστό thread."""
+        error = None
         try:
-            main()
+            main(progress=progress)
             clean_duplicate_products()
-            analysis_results = analyze_products()  # Αποθήκευση των αποτελεσμάτων ανάλυσης
-            if analysis_results:
-                self.update_label(analysis_results)  # Εμφάνιση αποτελεσμάτων ανάλυσης
-            else:
-                self.update_label(["Δεν βρέθηκαν αποτελέσματα ανάλυσης."])
         except Exception as e:
-            self.update_label([f"Σφάλμα: {str(e)}"])
+            error = e
+        finally:
+            # Νέα δεδομένα (έστω και μέρος τους αν το scraping απέτυχε): τα αποθηκευμένα
+            # αποτελέσματα δεν ισχύουν πια. Τα widgets αλλάζουν μόνο στο thread του Kivy.
+            self.queries.invalidate()
+            Clock.schedule_once(lambda dt: self.finish_scraping(error), 0)
+
+    def show_progress(self, *args):
+        """Πλήθος προϊόντων ανά κατάστημα και τα προσωρινά Top της επιλεγμένης κατηγορίας."""
+        category = None if self.category_filter.text == ALL_CATEGORIES else self.category_filter.text
+        snapshot = self.progress.snapshot(category)
+        if self.shown_progress == (snapshot["version"], category):
+            return
+        self.shown_progress = (snapshot["version"], category)
+
+        stores = " · ".join(f"{store} {count}{' ✓' if store in snapshot['status'] else ''}"
+                            for store, count in sorted(snapshot["counts"].items()))
+        self.status_label.text = f"Scraping: {snapshot['total']} προϊόντα μέχρι τώρα" + (f" ({stores})" if stores else "")
+        self.results_list.data = [product_row_data(product) for product in snapshot["top"]]
+
+    def finish_scraping(self, error=None):
+        """
+        Τέλος του scraping: η λίστα ξαναδιαβάζεται από τη βάση. Ένα σφάλμα του scraping
+        εμφανίζεται αφού ανανεωθεί η λίστα, ώστε να μην το σβήσει το πλήθος των προϊόντων.
+        """
+        if self.progress_event is not None:
+            self.progress_event.cancel()
+        self.progress = self.progress_event = None
+        if error is None:
+            self.load_products()
+            return
+
+        def loaded(products):
+            self.set_products(products)
+            self.show_error(error)
+
+        if not self.queries.get("products", load_product_list, loaded, self.show_error):
+            self.status_label.text = "Φόρτωση προϊόντων..."
+
+    def show_category(self, category):
+        """Τα φθηνότερα ανά γραμμάριο προϊόντα μιας κατηγορίας, στην κορυφή της λίστας."""
+        self.sort_choice.text = "Τιμή/γρ ↑"
+        self.category_filter.text = category
+        self.refresh_view()
 
     def show_isolate_products(self, instance):
         """Εμφάνιση προϊόντων Isolate."""
-        self.display_results(top_isolate_products())
+        self.show_category("Isolate")
 
     def show_mass_products(self, instance):
         """Εμφάνιση προϊόντων Mass Gainer."""
-        self.display_results(top_mass_gainer_products())
+        self.show_category("Mass Gainer")
 
     def show_hydrolyzed_products(self, instance):
         """Εμφάνιση προϊόντων Hydrolyzed."""
-        self.display_results(top_hydrolyzed_products())
+        self.show_category("Hydrolyzed")
 
     def show_whey_products(self, instance):
         """Εμφάνιση προϊόντων Whey."""
-        self.display_results(top_whey_products())
-
-    def display_results(self, results):
-        """Εμφάνιση αποτελεσμάτων στη λίστα."""
-        self.result_label.text = ""
-        if results:
-            self.update_label(results)
-        else:
-            self.update_label(["Δεν βρέθηκαν αποτελέσματα."])
+        self.show_category("Whey")
 
 if __name__ == "__main__":
     ProteinApp().run()
-
@@ -0,0 +1,98 @@
+"""
+Benchmark: ιστορικό τιμών (history.py) μετά από ένα χρόνο καθημερινών runs.
+
+Σε προσωρινή βάση καταγράφονται --days runs (ένα την ημέρα) για --products προϊόντα σε
+--stores καταστήματα, όπου κάθε μέρα αλλάζει η τιμή σε ποσοστό --change-rate των ζευγαριών
+(προϊόν, κατάστημα) και λίγα προϊόντα χάνονται ή επιστρέφουν. Αναφέρονται:
+    rows       γραμμές του price_history, απέναντι σε ένα snapshot όλων των τιμών ανά run
+    size       μέγεθος της βάσης
+    record     διάμεσος χρόνος καταγραφής ενός run
+    lowest     price_series + ελάχιστο 30 ημερών για ένα προϊόν (όπως το history.lowest_price)
+    drops      history.biggest_drops του τελευταίου run
+    trends     history.store_trends των τελευταίων 30 ημερών
+
+    python benchmarks/bench_history.py --products 10000 --stores 5 --days 365
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import history  # noqa: E402
+import sidp02  # noqa: E402
+from timing import median_ms  # noqa: E402
+
+START = 1_700_000_000
+
+
+def simulate(args) -> list:
+    """Καταγράφει τα runs και επιστρέφει τους χρόνους καταγραφής (ms)."""
+    rng = random.Random(7)
+    stores = [f"store{index}" for index in range(args.stores)]
+    prices = {(f"product {index}", store): rng.randrange(1500, 12000)
+              for index in range(args.products) for store in stores}
+    record_times = []
+    conn = sidp02.connect_db()
+    try:
+        cursor = conn.cursor()
+        history.create_history_tables(cursor)
+        for day in range(args.days):
+            for key in rng.sample(list(prices), int(len(prices) * args.change_rate)):
+                prices[key] = max(100, prices[key] + rng.choice((-1, 1)) * rng.randrange(50, 1500))
+            # Λίγα προϊόντα λείπουν κάθε μέρα (εξαντλημένα) και επιστρέφουν την επόμενη
+            missing = set(rng.sample(list(prices), len(prices) // 500))
+            snapshot = {key: (key[0], cents) for key, cents in prices.items() if key not in missing}
+            start = time.perf_counter()
+            with conn:
+                history.record_snapshot(cursor, day + 1, START + day * history.DAY, snapshot)
+            record_times.append((time.perf_counter() - start) * 1000)
+    finally:
+        conn.close()
+    return record_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--stores", type=int, default=5)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--change-rate", type=float, default=0.03, help="ποσοστό τιμών που αλλάζουν κάθε μέρα")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        sidp02.db_path = os.path.join(folder, "products.db")
+        record_times = simulate(args)
+        now = START + (args.days - 1) * history.DAY
+
+        conn = sidp02.connect_db()
+        try:
+            cursor = conn.cursor()
+            rows = cursor.execute("SELECT COUNT(*) FROM price_history").fetchone()[0]
+            size = os.path.getsize(sidp02.db_path) + os.path.getsize(sidp02.db_path + "-wal") \
+                if os.path.exists(sidp02.db_path + "-wal") else os.path.getsize(sidp02.db_path)
+            product_ids = [row[0] for row in cursor.execute("SELECT id FROM history_products").fetchall()]
+            rng = random.Random(1)
+            lowest = median_ms(lambda: min(
+                price for points in history.price_series(cursor, rng.choice(product_ids), now - 30 * history.DAY).values()
+                for _, price in points if price is not None), 20)
+        finally:
+            conn.close()
+        drops = median_ms(lambda: history.biggest_drops(10, run_id=args.days), 20)
+        trends = median_ms(lambda: history.store_trends(30, now=now), 5)
+
+    snapshot_rows = args.products * args.stores * args.days
+    print(f"rows     {rows:>12,}  (snapshot ανά run: {snapshot_rows:,}, {rows / snapshot_rows:.1%})")
+    print(f"size     {size / 2 ** 20:>12.1f} MB")
+    print(f"record   {statistics.median(record_times):>12.1f} ms/run (max {max(record_times):.1f})")
+    print(f"lowest   {lowest:>12.2f} ms")
+    print(f"drops    {drops:>12.2f} ms")
+    print(f"trends   {trends:>12.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
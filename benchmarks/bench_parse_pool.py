@@ -0,0 +1,94 @@
+"""
+Benchmark: parsing των σελίδων λίστας στις διεργασίες του scraper.ParsePool απέναντι στο
+parsing μέσα στο process του scraper (στο thread που διαβάζει τις απαντήσεις, ή σε threads).
+
+Φτιάχνονται --pages συνθετικές σελίδες (benchmarks/fixtures.py) με --per-page προϊόντα,
+μοιρασμένες στα καταστήματα, και για κάθε τρόπο αναφέρονται:
+    pages/s    σελίδες που γίνονται parse το δευτερόλεπτο (μαζί με τους αριθμούς σελίδων)
+    main cpu   χρόνος CPU του κύριου process, δηλαδή όσο κρατάει το parsing το GIL από τα
+               threads του fetch (με το ParsePool μένουν μόνο η αποστολή και τα dicts)
+Το pool μετριέται με ζεστούς workers (η εκκίνηση τους αναφέρεται χωριστά). Η επιτάχυνση
+ακολουθεί τους πυρήνες του μηχανήματος: με έναν πυρήνα κερδίζεται μόνο ο χρόνος CPU του fetch.
+
+    python benchmarks/bench_parse_pool.py --pages 200 --per-page 48 --workers 1 2 4
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fixtures  # noqa: E402
+from parsers import STORE_PARSERS, page_numbers  # noqa: E402
+from scraper import ParsePool  # noqa: E402
+from timing import measure  # noqa: E402
+
+BASE_URL = "https://store.example/whey"
+
+
+def make_pages(count: int, per_page: int) -> list:
+    stores = list(STORE_PARSERS)
+    return [(stores[index % len(stores)], fixtures.store_page(stores[index % len(stores)], per_page, seed=index))
+            for index in range(count)]
+
+
+def parse_inline(store_html) -> list:
+    """Όπως πριν: parser και αριθμοί σελίδων στο process του scraper."""
+    store, html = store_html
+    products = STORE_PARSERS[store](html)
+    page_numbers(html, BASE_URL)
+    return products
+
+
+def run_inline(pages: list, threads: int) -> list:
+    if threads <= 1:
+        return [parse_inline(page) for page in pages]
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(parse_inline, pages))
+
+
+def run_pool(pool: ParsePool, pages: list) -> list:
+    """Όπως το iter_http_pages: το πολύ max_pending σελίδες περιμένουν, με τη σειρά που στάλθηκαν."""
+    results, pending = [], []
+    for store, html in pages:
+        pending.append(pool.submit(STORE_PARSERS[store], html, BASE_URL, "page"))
+        if len(pending) >= pool.max_pending:
+            results.append(pool.result(pending.pop(0), store, BASE_URL)[0])
+    results.extend(pool.result(future, "", BASE_URL)[0] for future in pending)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--per-page", type=int, default=48, help="προϊόντα ανά σελίδα")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=4, help="threads για το parsing μέσα στο process")
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages, args.per_page)
+    size = sum(len(html) for _, html in pages)
+    print(f"{len(pages)} σελίδες, {size / 2 ** 20:.1f} MB, {os.cpu_count()} πυρήνες")
+    print(f"{'mode':<16} {'pages/s':>9} {'main cpu s':>11} {'startup s':>10}  same")
+
+    elapsed, cpu, expected = measure(lambda: run_inline(pages, 1))
+    print(f"{'inline':<16} {len(pages) / elapsed:>9.0f} {cpu:>11.2f} {'':>10}  True")
+    elapsed, cpu, result = measure(lambda: run_inline(pages, args.threads))
+    print(f"{f'{args.threads} threads':<16} {len(pages) / elapsed:>9.0f} {cpu:>11.2f} {'':>10}  {result == expected}")
+
+    for workers in args.workers:
+        pool = ParsePool(workers)
+        try:
+            startup, _, _ = measure(lambda: pool.parse(STORE_PARSERS[pages[0][0]], pages[0][1], "", BASE_URL))
+            # Ζέσταμα όλων των workers πριν τη μέτρηση
+            run_pool(pool, pages[:2 * workers])
+            elapsed, cpu, result = measure(lambda: run_pool(pool, pages))
+        finally:
+            pool.close()
+        print(f"{f'pool {workers} workers':<16} {len(pages) / elapsed:>9.0f} {cpu:>11.2f} {startup:>10.2f}  "
+              f"{result == expected}")
+
+
+if __name__ == "__main__":
+    main()
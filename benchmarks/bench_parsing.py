@@ -0,0 +1,199 @@
+"""
+Benchmark: οι parsers του parsers.py (lxml + XPath) απέναντι στους παλιούς parsers
+BeautifulSoup(..., "lxml") + find_all/find_next, ανά κατάστημα.
+
+Μετράει χρόνο ανά σελίδα και την αύξηση της μέγιστης μνήμης (RSS) του process
+κατά το parsing, σε ξεχωριστό process για κάθε μέτρηση, και ελέγχει ότι τα
+αποτελέσματα είναι ίδια. Χωρίς --pages χρησιμοποιούνται συνθετικές σελίδες
+(benchmarks/fixtures.py). Με --pages διαβάζονται αποθηκευμένες σελίδες από έναν
+φάκελο, με όνομα αρχείου που ξεκινάει από το κατάστημα (π.χ. Fit1-whey.html).
+
+    python benchmarks/bench_parsing.py --products 200 2000
+    python benchmarks/bench_parsing.py --pages saved_pages/
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import resource
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+import fixtures  # noqa: E402
+from parsers import STORE_PARSERS  # noqa: E402
+from timing import best_time  # noqa: E402
+
+
+# Οι παλιοί parsers, όπως ήταν στο WebScraper, για σύγκριση ---------------------
+
+def legacy_clean_text(text):
+    return re.sub(r'[^\x00-\x7F]+', ' ', text).strip()
+
+
+def legacy_extract_price(price_tag):
+    if price_tag:
+        price = price_tag.find("strong") or price_tag.find("span")
+        return price.text.strip() if price else "No price"
+    return "No price"
+
+
+def legacy_process_price(price_element):
+    main_price = price_element.text.strip().replace('€', '').strip()
+    sup_element = price_element.find("sup")
+    if sup_element:
+        main_price = main_price.replace(sup_element.text, "")
+        return f"{main_price},{sup_element.text.strip()}"
+    return main_price
+
+
+def legacy_katerelos(html):
+    soup = BeautifulSoup(html, "lxml")
+    return [{"name": legacy_clean_text(protein.find("h4").text.strip()),
+             "price": legacy_extract_price(protein.find("h6"))}
+            for protein in soup.find_all("div", class_="block_btm")]
+
+
+def legacy_fitrace(html):
+    soup = BeautifulSoup(html, "lxml")
+    return [{"name": legacy_clean_text(protein.find("h4").text.strip()),
+             "price": legacy_extract_price(protein.find_next("div", class_="price"))}
+            for protein in soup.find_all("div", class_="description")]
+
+
+def legacy_growling(html):
+    soup = BeautifulSoup(html, "lxml")
+    products = []
+    for protein in soup.find_all("h3", class_="heading-title product-name"):
+        price_tag = protein.find_next("span", class_="price")
+        products.append({"name": protein.find("a").text.strip(),
+                         "price": price_tag.text.strip() if price_tag else "No price"})
+    return products
+
+
+def legacy_fit1(html):
+    soup = BeautifulSoup(html, "lxml")
+    proteins = soup.find_all("div", class_="brand-line")
+    prices = soup.find_all("div", class_="price-line")
+    products = []
+    for i, protein in enumerate(proteins):
+        title = protein.find_next("h3").get('title', '').strip()
+        pack_info = protein.find_next("div", class_="pack-line").text.strip()
+        price = "No price"
+        if i < len(prices):
+            price_element = prices[i].find("b", class_="green") or prices[i].find("b", class_="normalp")
+            if price_element:
+                price = legacy_process_price(price_element)
+        products.append({"name": f"{protein.text.strip()} {title} {pack_info}", "price": price})
+    return products
+
+
+def legacy_gymbeam(html):
+    soup = BeautifulSoup(html, "lxml")
+    products = []
+    for product in soup.find_all("div", class_="product details product-item-details"):
+        link = product.find("a", class_="product-item-link")
+        if link and link.get('href'):
+            price_tag = product.find("span", class_="price")
+            products.append({"name": link.text.strip(), "url": link['href'],
+                             "price": price_tag.text.strip() if price_tag else ""})
+    return products
+
+
+LEGACY_PARSERS = {
+    "Katerelos": legacy_katerelos,
+    "Fitrace": legacy_fitrace,
+    "Growling": legacy_growling,
+    "Fit1": legacy_fit1,
+    "GymBeam": legacy_gymbeam,
+}
+IMPLEMENTATIONS = {"bs4": LEGACY_PARSERS, "lxml": STORE_PARSERS}
+
+
+# Μετρήσεις ----------------------------------------------------------------
+
+def peak_rss_kb():
+    """
+    Μέγιστη μνήμη του process σε KB. Στο Linux από το VmHWM, γιατί το ru_maxrss
+    κρατάει μετά το exec τη μέγιστη μνήμη του γονικού process.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def peak_memory_child(implementation, store, path, results):
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    before = peak_rss_kb()
+    IMPLEMENTATIONS[implementation][store](html)
+    results.put(peak_rss_kb() - before)
+
+
+def peak_memory_kb(implementation, store, path):
+    """Αύξηση της μέγιστης μνήμης (KB) σε ένα καθαρό process που κάνει μόνο το parsing."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=peak_memory_child, args=(implementation, store, path, results))
+    process.start()
+    growth = results.get()
+    process.join()
+    return growth
+
+
+def saved_pages(folder):
+    pages = []
+    for filename in sorted(os.listdir(folder)):
+        store = next((name for name in STORE_PARSERS if filename.lower().startswith(name.lower())), None)
+        if store and filename.endswith(".html"):
+            pages.append((store, filename, os.path.join(folder, filename)))
+    return pages
+
+
+def synthetic_pages(folder, sizes):
+    pages = []
+    for store in STORE_PARSERS:
+        for size in sizes:
+            path = os.path.join(folder, f"{store}-{size}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(fixtures.store_page(store, size))
+            pages.append((store, f"{size} products", path))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", help="φάκελος με αποθηκευμένες σελίδες <Store>*.html")
+    parser.add_argument("--products", type=int, nargs="+", default=[200, 2000],
+                        help="προϊόντα ανά συνθετική σελίδα")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        pages = saved_pages(args.pages) if args.pages else synthetic_pages(folder, args.products)
+        print(f"{'store':<10} {'page':<16} {'KB':>7} {'bs4 ms':>8} {'lxml ms':>8} {'speedup':>8} "
+              f"{'bs4 MB':>7} {'lxml MB':>8}  same")
+        for store, label, path in pages:
+            with open(path, encoding="utf-8") as f:
+                html = f.read()
+            legacy, scoped = LEGACY_PARSERS[store], STORE_PARSERS[store]
+            same = legacy(html) == scoped(html)
+            legacy_time, scoped_time = (best_time(lambda: legacy(html), args.repeat),
+                                          best_time(lambda: scoped(html), args.repeat))
+            legacy_memory = peak_memory_kb("bs4", store, path) / 1024
+            scoped_memory = peak_memory_kb("lxml", store, path) / 1024
+            print(f"{store:<10} {label[:16]:<16} {len(html.encode('utf-8')) // 1024:>7} "
+                  f"{legacy_time * 1000:>8.1f} {scoped_time * 1000:>8.1f} {legacy_time / scoped_time:>7.1f}x "
+                  f"{legacy_memory:>7.1f} {scoped_memory:>8.1f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: οι όψεις της λίστας του UI (φίλτρα κατηγορίας/καταστήματος/τιμής ανά γραμμάριο και
+ταξινόμηση) με τη μηχανή στηλών NumPy (ranking.ProductColumns) απέναντι στο παλιό μονοπάτι
+γραμμή-γραμμή (φίλτρο και sorted σε Python για κάθε όψη), σε συνθετικούς καταλόγους 10k–1M
+προϊόντων με τα πεδία του sidp02.product_rows.
+
+Για κάθε μέγεθος αναφέρονται:
+    load       η κατασκευή των στηλών, των μασκών και της σειράς τιμής ανά γραμμάριο (μία φορά
+               ανά φόρτωμα των προϊόντων)
+    views      όλες οι όψεις του VIEWS (τα Top κάθε κατηγορίας και μερικοί συνδυασμοί φίλτρων)
+
+    python benchmarks/bench_ranking.py --sizes 10000 100000 1000000 --repeat 3
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sidp02 import CATEGORIES, clean_price, match_categories, parse_grams  # noqa: E402
+from ranking import ProductColumns  # noqa: E402
+from timing import timed  # noqa: E402
+
+BRANDS = ["Optimum Nutrition", "MyProtein", "Scitec", "Applied", "GymBeam", "Biotech USA", "Per4m", "Dymatize"]
+PRODUCTS = ["Whey Protein", "Gold Standard Whey", "Iso Whey Zero", "100% Isolate", "Hydro Whey",
+            "Serious Mass", "Mass Gainer", "Hydrolized Whey", "Casein", "Vegan Protein",
+            "Πρωτεΐνη ορρός γάλακτος", "Απομονωμένος ορός γάλακτος", "Υδρολυμένος ορός"]
+WEIGHTS = ["1kg", "2.27kg", "900g", "2 kg", "500gr", "1000 Γραμμάρια", "4k", "5lbs", "2000g", "30 servings"]
+STORES = ["Katerelos", "Fitrace", "Growling", "Fit1", "GymBeam"]
+
+# (store, category, max_price_per_gram, field, descending): τα κουμπιά των κατηγοριών του UI
+# (φθηνότερο ανά γραμμάριο πρώτο) και μερικοί συνδυασμοί των φίλτρων του
+VIEWS = [(None, category, None, "price_per_gram", False) for category in [None, *CATEGORIES]] + [
+    ("Katerelos", None, 0.05, "price", True),
+    (None, "Whey", None, "name", False),
+    ("Fit1", None, None, "grams", True),
+]
+
+
+def synthetic_catalog(size: int, seed: int = 42) -> list:
+    """Γραμμές (id, name, price, source_url) με ρεαλιστική ποικιλία ονομάτων και τιμών."""
+    rng = random.Random(seed)
+    rows = []
+    for product_id in range(1, size + 1):
+        name = f"{rng.choice(BRANDS)} {rng.choice(PRODUCTS)} {rng.choice(WEIGHTS)} #{rng.randrange(size // 4 + 1)}"
+        price = f"{rng.uniform(15, 120):.2f}".replace(".", ",") + " €"
+        rows.append((product_id, name, price, f"https://shop.example/p/{product_id}"))
+    return rows
+
+
+def synthetic_products(size: int, seed: int = 42) -> list:
+    """Τα dicts του sidp02.product_rows για τον synthetic_catalog, σε 1–2 καταστήματα το καθένα."""
+    rng = random.Random(seed)
+    products = []
+    for product_id, name, price, url in synthetic_catalog(size, seed):
+        price = clean_price(price)
+        grams = parse_grams(name)
+        products.append({
+            "id": product_id, "name": name, "price": price, "grams": grams,
+            "price_per_gram": price / grams if grams else None, "url": url,
+            "categories": match_categories(name),
+            "stores": sorted(rng.sample(STORES, rng.randint(1, 2))),
+        })
+    return products
+
+
+def view_per_row(products: list, store, category, max_price_per_gram, field: str, descending: bool) -> list:
+    """Το παλιό μονοπάτι του UI: φίλτρο και sorted σε Python για κάθε όψη."""
+    products = [
+        product for product in products
+        if (store is None or store in product["stores"])
+        and (category is None or category in product["categories"])
+        and (max_price_per_gram is None
+             or (product["price_per_gram"] is not None and product["price_per_gram"] <= max_price_per_gram))
+    ]
+    present = [product for product in products if product[field] is not None]
+    missing = [product for product in products if product[field] is None]
+    key = (lambda product: product[field].lower()) if field == "name" else (lambda product: product[field])
+    return sorted(present, key=key, reverse=descending) + missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'load (s)':>9} {'per-row (s)':>12} {'numpy (s)':>10} {'speedup':>8}  same results")
+    for size in args.sizes:
+        products = synthetic_products(size)
+
+        def load():
+            columns = ProductColumns(products)
+            columns.order("price_per_gram")
+            return columns
+
+        load_time, columns = timed(load, args.repeat)
+        per_row, expected = timed(lambda: [view_per_row(products, *view) for view in VIEWS], args.repeat)
+        vectorized, actual = timed(lambda: [columns.view(*view) for view in VIEWS], args.repeat)
+
+        same = all([product["id"] for product in a] == [product["id"] for product in b]
+                   for a, b in zip(expected, actual))
+        print(f"{size:>10} {load_time:>9.3f} {per_row:>12.3f} {vectorized:>10.3f} "
+              f"{per_row / vectorized:>7.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: προφίλ φόρτωσης του browser (stores.RenderProfile) στα καταστήματα με Selenium.
+
+Κάθε αρχική σελίδα των Growling, Fit1 και GymBeam στον τοπικό server (benchmarks/stand_in.py)
+φορτώνεται με το FULL_PROFILE (όλοι οι πόροι, αναμονή για το load) και με το προφίλ του
+καταστήματος. Για κάθε σελίδα αναφέρονται τα bytes που κατέβασε ο browser και ο χρόνος μέχρι
+να είναι έτοιμη η σελίδα (render, μαζί με τη σελιδοποίηση), και πόσα γλίτωσε το προφίλ.
+Κάθε μέτρηση γίνεται σε νέο browser, ώστε να μη βοηθάει η cache του.
+
+Ο tracker του server σερβίρεται από το localhost (τρίτο domain για τις σελίδες του 127.0.0.1),
+οπότε στο προφίλ του καταστήματος προστίθεται στα blocked_domains.
+
+    python benchmarks/bench_render.py --products 500 --repeat 3
+"""
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_scraper import BROWSER_STORES, browser_available, quiet  # noqa: E402
+from scraper import WebScraper  # noqa: E402
+from stand_in import StandInServer  # noqa: E402
+from stores import FULL_PROFILE, RenderProfile, StoreConfig, store_config  # noqa: E402
+
+
+def measure(config: StoreConfig, url: str, verbose: bool) -> tuple:
+    """(bytes, δευτερόλεπτα render) μιας σελίδας, σε νέο browser."""
+    scraper = WebScraper(driver_pool_size=1, use_cache=False)
+    try:
+        with quiet(verbose):
+            scraper.render_page(config, url)
+        metrics = scraper.metrics
+        return (metrics.counters.get((config.name, "render_bytes"), 0),
+                metrics.urls[(config.name, url)]["render"])
+    finally:
+        scraper.close()
+
+
+def bench_page(config: StoreConfig, url: str, profiles: dict, repeat: int, verbose: bool) -> dict:
+    results = {}
+    for name, profile in profiles.items():
+        runs = [measure(config._replace(profile=profile), url, verbose) for _ in range(repeat)]
+        results[name] = (statistics.median(run[0] for run in runs), statistics.median(run[1] for run in runs))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=200, help="προϊόντα ανά κατάστημα")
+    parser.add_argument("--per-page", type=int, default=48)
+    parser.add_argument("--stores", nargs="+", default=sorted(BROWSER_STORES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    probe = WebScraper(driver_pool_size=1, use_cache=False)
+    try:
+        available = browser_available(probe)
+    finally:
+        probe.close()
+    if not available:
+        print("Δεν υπάρχει Chrome: το benchmark των προφίλ φόρτωσης χρειάζεται browser.")
+        return
+
+    print(f"{'store':<10} {'full KB':>9} {'profile KB':>11} {'saved':>7} {'full s':>7} {'profile s':>10} {'saved':>7}")
+    with StandInServer(args.products, per_page=args.per_page) as server:
+        urls = server.store_urls()
+        for store in args.stores:
+            config = store_config(store, urls[store])
+            profile: RenderProfile = config.profile._replace(
+                blocked_domains=config.profile.blocked_domains + ("localhost",))
+            for url in config.urls:
+                results = bench_page(config, url, {"full": FULL_PROFILE, "profile": profile},
+                                     args.repeat, args.verbose)
+                (full_bytes, full_time), (light_bytes, light_time) = results["full"], results["profile"]
+                print(f"{store:<10} {full_bytes / 1024:>9.0f} {light_bytes / 1024:>11.0f} "
+                      f"{1 - light_bytes / full_bytes if full_bytes else 0:>7.0%} "
+                      f"{full_time:>7.2f} {light_time:>10.2f} {1 - light_time / full_time if full_time else 0:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Benchmark: όλο το scraping (WebScraper.scrape_store) και οι συναρτήσεις κατάταξης, χωρίς
+δίκτυο, πάνω στον τοπικό server των καταστημάτων (benchmarks/stand_in.py).
+
+Για κάθε μέγεθος καταλόγου (προϊόντα ανά κατάστημα) στήνεται μια προσωρινή βάση,
+τρέχει κάθε κατάστημα μέσα σε BulkWriter όπως στο main() και μετά η κατάταξη.
+Αναφέρει σελίδες/s και προϊόντα/s ανά κατάστημα, γραμμές/s του writer, χρόνο κάθε
+συνάρτησης κατάταξης και τη μέγιστη μνήμη (RSS) του process.
+
+Τα Growling, Fit1 και GymBeam χρειάζονται Chrome· αν δεν υπάρχει, παραλείπονται
+και μετράνε μόνο τα καταστήματα HTTP. Με --recordings σερβίρονται αποθηκευμένες
+σελίδες <Store>*.html αντί για τις συνθετικές.
+
+    python benchmarks/bench_scraper.py --sizes 200 2000
+    python benchmarks/bench_scraper.py --recordings saved_pages/ --stores Katerelos Fitrace
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sidp02  # noqa: E402
+from bench_parsing import peak_rss_kb, saved_pages  # noqa: E402
+from stores import store_config  # noqa: E402
+from stand_in import STORES, StandInServer  # noqa: E402
+from timing import best_time  # noqa: E402
+
+BROWSER_STORES = {"Growling", "Fit1", "GymBeam"}
+CHROME_BINARIES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+
+RANKINGS = {
+    "analyze_products": sidp02.analyze_products,
+    "top_whey_products": sidp02.top_whey_products,
+    "top_isolate_products": sidp02.top_isolate_products,
+    "top_mass_gainer_products": sidp02.top_mass_gainer_products,
+    "top_hydrolyzed_products": sidp02.top_hydrolyzed_products,
+}
+
+
+def reset_peak_rss():
+    """Μηδενίζει το VmHWM ώστε κάθε μέγεθος να μετράει τη δική του μέγιστη μνήμη (μόνο Linux)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def browser_available(scraper: sidp02.WebScraper) -> bool:
+    """Υπάρχει Chrome που ξεκινάει; Χωρίς εγκατεστημένο Chrome δεν γίνεται καν απόπειρα."""
+    if not any(shutil.which(binary) for binary in CHROME_BINARIES):
+        return False
+    try:
+        with scraper.driver_pool.lease():
+            return True
+    except Exception:
+        return False
+
+
+def load_recordings(folder):
+    recordings = {}
+    for store, _, path in saved_pages(folder):
+        with open(path, encoding="utf-8") as f:
+            recordings.setdefault(store, []).append(f.read())
+    return recordings
+
+
+def quiet(verbose: bool):
+    """Οι scrapers τυπώνουν μια γραμμή ανά σελίδα· στο benchmark κρύβονται εκτός από το --verbose."""
+    return contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+
+def bench_size(size: int, args, recordings, use_browser) -> dict:
+    """Ένα πλήρες run πάνω σε κατάλογο size προϊόντων ανά κατάστημα, σε προσωρινή βάση."""
+    reset_peak_rss()
+    report = {"stores": {}, "rankings": {}}
+    with tempfile.TemporaryDirectory() as folder:
+        sidp02.db_path = os.path.join(folder, "products.db")
+        sidp02.cache_path = os.path.join(folder, "http_cache.db")
+        with quiet(args.verbose):
+            sidp02.reset_database()
+            run_id = sidp02.start_run("full")
+        scraper = sidp02.WebScraper(use_cache=False)
+        if use_browser is None:
+            use_browser = browser_available(scraper)
+        stores = [store for store in args.stores if use_browser or store not in BROWSER_STORES]
+        report["skipped"] = [store for store in args.stores if store not in stores]
+
+        results = {}
+        try:
+            with StandInServer(size, per_page=args.per_page, recordings=recordings,
+                               failure_rate=args.failure_rate) as server:
+                urls = server.store_urls()
+                with quiet(args.verbose), sidp02.BulkWriter(run_id) as writer:
+                    for store in stores:
+                        requests_before = server.requests[store]
+                        start = time.perf_counter()
+                        products = scraper.scrape_store(store_config(store, urls[store]))
+                        elapsed = time.perf_counter() - start
+                        results[store] = {"status": "ok", "products": products, "elapsed": elapsed, "error": None}
+                        report["stores"][store] = {"pages": server.requests[store] - requests_before,
+                                                   "bytes": server.bytes_sent[store],
+                                                   "products": products, "elapsed": elapsed,
+                                                   "failures": server.failures[store],
+                                                   "retries": scraper.metrics.counters.get((store, "retries"), 0),
+                                                   "errors": scraper.metrics.counters.get((store, "errors"), 0)}
+                    flush_start = time.perf_counter()
+                    writer.flush()
+                    report["flush"] = time.perf_counter() - flush_start
+                report["rows"], report["writer_elapsed"] = writer.rows_written, writer.elapsed
+        finally:
+            scraper.close()
+
+        with quiet(args.verbose):
+            sidp02.finish_run(run_id, results)
+            for name, function in RANKINGS.items():
+                report["rankings"][name] = best_time(function, args.repeat)
+        conn = sidp02.connect_db()
+        try:
+            report["catalog"] = conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        finally:
+            conn.close()
+    report["peak_rss_kb"] = peak_rss_kb()
+    return report
+
+
+def print_report(size: int, report: dict):
+    print(f"\n=== {size} προϊόντα ανά κατάστημα ===")
+    print(f"{'store':<10} {'pages':>6} {'MB':>7} {'products':>9} {'time (s)':>9} {'pages/s':>8} {'products/s':>11}")
+    for store, stats in report["stores"].items():
+        elapsed = stats["elapsed"] or float("inf")
+        print(f"{store:<10} {stats['pages']:>6} {stats['bytes'] / 2 ** 20:>7.1f} {stats['products']:>9} "
+              f"{stats['elapsed']:>9.2f} {stats['pages'] / elapsed:>8.1f} {stats['products'] / elapsed:>11.0f}")
+    if any(stats["failures"] for stats in report["stores"].values()):
+        for store, stats in report["stores"].items():
+            print(f"{store:<10} 503: {stats['failures']}, επαναλήψεις: {stats['retries']:.0f}, "
+                  f"σελίδες που χάθηκαν: {stats['errors']:.0f}")
+    if report["skipped"]:
+        print(f"Παραλείφθηκαν (χωρίς Chrome): {', '.join(report['skipped'])}")
+
+    rate = report["rows"] / report["writer_elapsed"] if report["writer_elapsed"] else 0
+    print(f"Writer: {report['rows']} γραμμές σε {report['writer_elapsed']:.2f}s ({rate:.0f} γραμμές/s), "
+          f"αναμονή στο τέλος {report['flush']:.2f}s")
+    print(f"Κατάταξη σε {report['catalog']} προϊόντα:")
+    for name, elapsed in report["rankings"].items():
+        print(f"  {name:<28} {elapsed * 1000:>8.1f} ms")
+    print(f"Μέγιστη μνήμη (RSS): {report['peak_rss_kb'] / 1024:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 2000], help="προϊόντα ανά κατάστημα")
+    parser.add_argument("--per-page", type=int, default=48, help="προϊόντα ανά σελίδα ή ανά \"load more\"")
+    parser.add_argument("--stores", nargs="+", choices=STORES, default=STORES)
+    parser.add_argument("--recordings", help="φάκελος με αποθηκευμένες σελίδες <Store>*.html")
+    parser.add_argument("--no-browser", action="store_true", help="μόνο τα καταστήματα HTTP")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="ποσοστό σελίδων που απαντούν 503")
+    parser.add_argument("--repeat", type=int, default=3, help="επαναλήψεις κάθε συνάρτησης κατάταξης")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    recordings = load_recordings(args.recordings) if args.recordings else None
+    use_browser = False if args.no_browser else None
+    for size in args.sizes:
+        print_report(size, bench_size(size, args, recordings, use_browser))
+
+
+if __name__ == "__main__":
+    main()
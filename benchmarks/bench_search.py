@@ -0,0 +1,80 @@
+"""
+Benchmark: αναζήτηση στα ονόματα με το ευρετήριο κειμένου (products_fts, FTS5) απέναντι
+στο παλιό μονοπάτι που ελέγχει κάθε γραμμή με keyword.lower() in name.lower().
+
+Για κάθε μέγεθος καταλόγου φτιάχνεται μια προσωρινή βάση (με τα upserts της εφαρμογής) και
+μετριούνται (διάμεσος σε ms):
+    ids        sidp02.search_product_ids (όλα τα αποτελέσματα, όπως τα ζητάει το UI) για μερικά
+               ερωτήματα: ελληνικά με/χωρίς τόνους και με ρρ/ρ, λατινικά
+    search     sidp02.search_products για τα ίδια ερωτήματα (τα 50 πρώτα ως dicts)
+    keywords   get_top_products_by_category με λέξεις-κλειδιά εκτός CATEGORIES
+    scan       το παλιό μονοπάτι για τις ίδιες λέξεις-κλειδιά
+
+    python benchmarks/bench_search.py --sizes 10000 100000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sidp02  # noqa: E402
+from bench_ranking import synthetic_catalog  # noqa: E402
+from timing import median_ms  # noqa: E402
+
+QUERIES = ["ορος γαλακτος", "ΟΡΡΟΣ", "υδρολυμένος", "gold whey", "iso zero 2.27"]
+# Φράση χωρίς κανένα προϊόν: το παλιό μονοπάτι σταματάει μόλις βρει 5, οπότε η χειρότερη
+# περίπτωσή του είναι μια λέξη-κλειδί που δεν ταιριάζει πουθενά και διατρέχει όλο τον πίνακα
+KEYWORDS = ["vegan isolate"]
+
+
+def build_database(size: int):
+    conn = sidp02.connect_db()
+    try:
+        with conn:
+            sidp02.create_products_table(conn.cursor())
+            sidp02.upsert_products(conn.cursor(), [row[1:] for row in synthetic_catalog(size)])
+    finally:
+        conn.close()
+
+
+def scan_top(keywords: list, top_n: int = 5) -> list:
+    """Το παλιό μονοπάτι: όλα τα προϊόντα με σειρά τιμής ανά γραμμάριο, φίλτρο σε Python."""
+    conn = sidp02.connect_db()
+    try:
+        found = []
+        for product in conn.execute("""
+            SELECT id, name, price, grams, price_per_gram, source_url FROM products
+            WHERE price_per_gram IS NOT NULL ORDER BY price_per_gram
+        """):
+            if any(keyword.lower() in product[1].lower() for keyword in keywords):
+                found.append(product)
+                if len(found) == top_n:
+                    break
+        return found
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'ids (ms)':>9} {'search (ms)':>12} {'keywords (ms)':>14} {'scan (ms)':>10}  hits")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            sidp02.db_path = os.path.join(folder, "products.db")
+            build_database(size)
+            ids = median_ms(lambda: [sidp02.search_product_ids(query) for query in QUERIES], args.repeat) / len(QUERIES)
+            search = median_ms(lambda: [sidp02.search_products(query) for query in QUERIES], args.repeat) / len(QUERIES)
+            keywords = median_ms(lambda: sidp02.get_top_products_by_category(KEYWORDS, "custom"), args.repeat)
+            scan = median_ms(lambda: scan_top(KEYWORDS), args.repeat)
+            hits = {query: len(sidp02.search_product_ids(query)) for query in QUERIES}
+            print(f"{size:>10} {ids:>9.1f} {search:>12.1f} {keywords:>14.1f} {scan:>10.1f}  {hits}")
+
+
+if __name__ == "__main__":
+    main()
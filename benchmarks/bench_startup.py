@@ -0,0 +1,119 @@
+"""
+Benchmark: χρόνος εκκίνησης του UI, με όριο (budget) που ελέγχεται.
+
+Σε νέο process κάθε φορά μετράει:
+    imports      τα modules της εφαρμογής που φορτώνει το UI (sidp02, query_service, progress),
+                 και ελέγχει ότι δεν φόρτωσαν τη στοίβα του scraping (requests, Selenium, bs4, lxml)
+    first frame  από την εκκίνηση του process μέχρι να σχεδιαστεί το πρώτο frame του παραθύρου
+                 (χρειάζεται Kivy και οθόνη· αλλιώς παραλείπεται)
+
+Επιστρέφει κωδικό 1 αν η διάμεσος ξεπεράσει το όριο ή αν φορτώθηκε κάποιο βαρύ module.
+
+    python benchmarks/bench_startup.py --repeat 5 --import-budget 150 --frame-budget 2000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UI_PATH = os.path.join(ROOT, "UI test 2.py")
+# Τα modules που δεν πρέπει να φορτώνονται πριν ξεκινήσει scraping
+HEAVY_MODULES = ["scraper", "requests", "selenium", "bs4", "lxml", "numpy"]
+
+IMPORT_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import sidp02, query_service, progress
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+# Φορτώνει το UI από το αρχείο του, ξεκινάει την εφαρμογή και σταματάει στο πρώτο frame
+FRAME_PROBE = """
+import importlib.util, json, os, sys, time
+sys.path.insert(0, {root!r})
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_LOG_MODE", "PYTHON")
+import sidp02
+sidp02.db_path = {db_path!r}
+spec = importlib.util.spec_from_file_location("protein_ui", {ui_path!r})
+ui = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ui)
+from kivy.core.window import Window
+
+app = ui.ProteinApp()
+
+def first_frame(*args):
+    Window.unbind(on_flip=first_frame)
+    print(json.dumps({{"ms": (time.time() - {started!r}) * 1000,
+                      "heavy": [m for m in {heavy!r} if m in sys.modules]}}), flush=True)
+    app.stop()
+
+Window.bind(on_flip=first_frame)
+app.run()
+"""
+
+
+def probe(script: str, timeout: float = 60) -> dict:
+    """Τρέχει το script σε νέο process και διαβάζει τη γραμμή JSON που τυπώνει."""
+    completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                               timeout=timeout, cwd=ROOT)
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "no output")
+
+
+def kivy_available() -> bool:
+    return subprocess.run([sys.executable, "-c", "import kivy, kivymd"], capture_output=True).returncode == 0
+
+
+def measure_imports(repeat: int) -> dict:
+    runs = [probe(IMPORT_PROBE.format(root=ROOT, heavy=HEAVY_MODULES)) for _ in range(repeat)]
+    return {"ms": [run["ms"] for run in runs], "heavy": sorted({m for run in runs for m in run["heavy"]})}
+
+
+def measure_first_frame(repeat: int) -> dict:
+    runs = []
+    with tempfile.TemporaryDirectory() as folder:
+        for _ in range(repeat):
+            script = FRAME_PROBE.format(root=ROOT, heavy=HEAVY_MODULES, ui_path=UI_PATH,
+                                        db_path=os.path.join(folder, "products.db"), started=time.time())
+            runs.append(probe(script))
+    return {"ms": [run["ms"] for run in runs], "heavy": sorted({m for run in runs for m in run["heavy"]})}
+
+
+def report(label: str, result: dict, budget: float) -> bool:
+    """Τυπώνει διάμεσο/μέγιστο και επιστρέφει True αν η μέτρηση είναι μέσα στο όριο."""
+    median = statistics.median(result["ms"])
+    ok = median <= budget and not result["heavy"]
+    print(f"{label:<12} διάμεσος {median:>7.1f} ms  max {max(result['ms']):>7.1f} ms  "
+          f"όριο {budget:>6.0f} ms  {'OK' if ok else 'ΕΚΤΟΣ ΟΡΙΟΥ'}")
+    if result["heavy"]:
+        print(f"{'':<12} φορτώθηκαν: {', '.join(result['heavy'])}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=150, help="ms")
+    parser.add_argument("--frame-budget", type=float, default=2000, help="ms")
+    args = parser.parse_args()
+
+    ok = report("imports", measure_imports(args.repeat), args.import_budget)
+    if kivy_available():
+        ok = report("first frame", measure_first_frame(args.repeat), args.frame_budget) and ok
+    else:
+        print("first frame  παραλείφθηκε (δεν υπάρχει Kivy/KivyMD)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
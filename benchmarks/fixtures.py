@@ -0,0 +1,132 @@
+"""
+Συνθετικές σελίδες λίστας για κάθε κατάστημα, με το ίδιο markup που διαβάζουν οι parsers
+και με τον "θόρυβο" μιας πραγματικής σελίδας (μενού, inline scripts, εικόνες, footer).
+"""
+import json
+import random
+from typing import List, Tuple
+
+BRANDS = ["Optimum Nutrition", "MyProtein", "Scitec", "Applied", "GymBeam", "Biotech USA", "Per4m", "Dymatize"]
+PRODUCTS = ["Whey Protein", "Gold Standard Whey", "Iso Whey Zero", "100% Isolate", "Hydro Whey",
+            "Serious Mass", "Mass Gainer", "Hydrolized Whey", "Πρωτεΐνη ορρός γάλακτος", "Απομονωμένος ορός γάλακτος"]
+WEIGHTS = ["1kg", "2.27kg", "900g", "2 kg", "500gr", "1000 Γραμμάρια", "4k", "2000g"]
+FLAVOURS = ["Chocolate", "Vanilla", "Strawberry", "Cookies", "Banana", "Salted Caramel", "Pistachio",
+            "Unflavoured", "Mocha", "Coconut", "Peanut Butter", "Σοκολάτα Φουντούκι"]
+
+
+def catalog(count: int, seed: int = 1) -> List[Tuple[str, str, str, str, float]]:
+    """(brand, product, weight, slug, price) για count προϊόντα."""
+    rng = random.Random(seed)
+    items = []
+    for index in range(count):
+        brand, weight = rng.choice(BRANDS), rng.choice(WEIGHTS)
+        product = f"{rng.choice(PRODUCTS)} {rng.choice(FLAVOURS)}"
+        items.append((brand, product, weight, f"product-{seed}-{index}", round(rng.uniform(15, 120), 2)))
+    return items
+
+
+def euro(price: float) -> str:
+    return f"{price:.2f}".replace(".", ",") + " €"
+
+
+def page(title: str, cards: List[str], seed: int = 1, extra: str = "") -> str:
+    """
+    Ολόκληρη σελίδα γύρω από τις κάρτες, με το βάρος που έχουν οι πραγματικές σελίδες.
+    Το extra μπαίνει μετά τη λίστα (π.χ. κουμπί "load more" και το script του).
+    """
+    rng = random.Random(seed)
+    menu = "".join(f'<li class="menu-item"><a href="/c/{i}">Κατηγορία {i}</a><ul class="sub">'
+                   + "".join(f'<li><a href="/c/{i}/{j}">Υποκατηγορία {j}</a></li>' for j in range(8))
+                   + "</ul></li>" for i in range(40))
+    state = json.dumps({"products": [{"id": i, "sku": f"SKU{rng.randrange(10 ** 8)}", "tags": ["a"] * 10}
+                                     for i in range(len(cards))]})
+    return (
+        f'<!DOCTYPE html><html lang="el"><head><meta charset="utf-8"><title>{title}</title>'
+        f'<style>{".x{color:red}" * 500}</style>'
+        f'<script>window.__STATE__ = {state};</script></head><body>'
+        f'<header><nav><ul class="menu">{menu}</ul></nav></header>'
+        f'<main><div class="products">{"".join(cards)}</div>{extra}</main>'
+        f'<footer>{"<p>Πληροφορίες καταστήματος</p>" * 50}</footer>'
+        f'<script>{"var analytics = 1;" * 2000}</script></body></html>'
+    )
+
+
+def katerelos_card(brand, product, weight, slug, price) -> str:
+    return (f'<div class="product-block"><div class="image"><img src="/img/{slug}.jpg" alt=""></div>'
+            f'<div class="block_btm"><h4><a href="/{slug}">{brand} {product} {weight}</a></h4>'
+            f'<h6><span class="old-price">{euro(price * 1.2)}</span><strong>{euro(price)}</strong></h6></div></div>')
+
+
+def fitrace_card(brand, product, weight, slug, price) -> str:
+    return (f'<div class="product-thumb"><div class="image"><img src="/img/{slug}.jpg"></div>'
+            f'<div class="description"><h4><a href="/{slug}">{brand} {product} {weight}</a></h4><p>Περιγραφή</p></div>'
+            f'<div class="rating"><span class="star"></span></div>'
+            f'<div class="price"><span class="price-new">{euro(price)}</span></div></div>')
+
+
+def growling_card(brand, product, weight, slug, price) -> str:
+    return (f'<div class="product-layout"><div class="image"><img src="/img/{slug}.jpg"></div>'
+            f'<h3 class="heading-title product-name"><a href="/{slug}">{brand} {product} {weight}</a></h3>'
+            f'<div class="price-wrapper"><span class="price">{euro(price)}</span></div>'
+            f'<button class="btn-cart">Καλάθι</button></div>')
+
+
+def fit1_card(brand, product, weight, slug, price) -> str:
+    euros, cents = f"{price:.2f}".split(".")
+    price_class = "green" if int(cents) % 2 else "normalp"
+    return (f'<div class="product-item"><a href="/{slug}"><img src="/img/{slug}.jpg"></a>'
+            f'<div class="brand-line">{brand}</div><h3 title="{product}"><a href="/{slug}">{product}</a></h3>'
+            f'<div class="pack-line">{weight}</div>'
+            f'<div class="price-line"><b class="{price_class}">{euros}<sup>{cents}</sup>€</b></div></div>')
+
+
+def gymbeam_card(brand, product, weight, slug, price, base_url: str = "https://gymbeam.gr") -> str:
+    return (f'<li class="item product product-item"><div class="product-item-info">'
+            f'<a class="product-item-photo" href="{base_url}/{slug}.html"><img src="/img/{slug}.jpg"></a>'
+            f'<div class="product details product-item-details"><strong class="product name product-item-name">'
+            f'<a class="product-item-link" href="{base_url}/{slug}.html">{brand} {product}</a></strong>'
+            f'<div class="price-box"><span class="price">{euro(price)}</span></div></div></div></li>')
+
+
+GYMBEAM_SIZES = ["500 g", "1000 g", "2500 g"]
+
+
+def gymbeam_product_page(brand, product, weight, slug, price) -> str:
+    """
+    Σελίδα προϊόντος του GymBeam με το Magento spConfig (μεγέθη × γεύσεις)
+    μέσα σε <script type="text/x-magento-init">, όπως το διαβάζει το parse_gymbeam_variants.
+    """
+    options, option_prices = [], {}
+    for index, size in enumerate(GYMBEAM_SIZES):
+        product_ids = [f"{slug}-{index}-{flavour}" for flavour in range(3)]
+        options.append({"id": str(index), "label": size, "products": product_ids})
+        for flavour, product_id in enumerate(product_ids):
+            amount = round(price * (index + 1) * 0.9 + flavour, 2)
+            option_prices[product_id] = {"finalPrice": {"amount": amount}, "oldPrice": {"amount": amount + 5}}
+    config = {"#product_addtocart_form": {"configurable": {"spConfig": {
+        "attributes": {"139": {"id": "139", "code": "size", "label": "Γραμμάρια (γρ)", "options": options}},
+        "optionPrices": option_prices,
+    }}}}
+    body = f'<div class="product-info-main"><h1 class="page-title">{brand} {product}</h1></div>'
+    return page(f"{brand} {product}", [body], extra=f'<script type="text/x-magento-init">{json.dumps(config)}</script>')
+
+
+STORE_CARDS = {
+    "Katerelos": katerelos_card,
+    "Fitrace": fitrace_card,
+    "Growling": growling_card,
+    "Fit1": fit1_card,
+    "GymBeam": gymbeam_card,
+}
+
+
+def store_cards(store: str, items: List[tuple], base_url: str = "https://gymbeam.gr") -> List[str]:
+    """Οι κάρτες των items με το markup του store."""
+    if store == "GymBeam":
+        return [gymbeam_card(*item, base_url=base_url) for item in items]
+    return [STORE_CARDS[store](*item) for item in items]
+
+
+def store_page(store: str, count: int, seed: int = 1) -> str:
+    """Σελίδα λίστας του store με count προϊόντα."""
+    return page(store, store_cards(store, catalog(count, seed)), seed)
@@ -0,0 +1,312 @@
+"""
+Τοπικός HTTP server που παίζει τον ρόλο των πέντε καταστημάτων για τα benchmarks.
+
+Κάθε κατάστημα σερβίρεται με το markup του (benchmarks/fixtures.py) και με τον
+τρόπο που φορτώνει τα προϊόντα του στην πραγματικότητα:
+
+    /katerelos/?page=<n>       σελίδες με αρίθμηση (HTTP), με συνδέσμους προς τις
+    /fitrace/?page=<n>&sort=5a γειτονικές και την τελευταία σελίδα
+    /growling/                 κουμπί .load-more που φέρνει το /growling/more?page=<k>
+    /fit1/category/<c>         infinite scroll από το /fit1/more?category=<c>&page=<k>,
+                               με .no-more-products στο τέλος
+    /gymbeam/                  κουμπί .amscroll-load-button που φέρνει το /gymbeam/more?page=<k>
+    /gymbeam/p/<slug>.html     σελίδα προϊόντος με το Magento spConfig
+    /img/<slug>.jpg            εικόνες των καρτών, /static/store.woff2 γραμματοσειρά
+    /tracker.js                "third-party" script (από το localhost αντί για 127.0.0.1),
+                               που στέλνει ένα beacon λίγο μετά τη φόρτωση
+
+Οι σελίδες φορτώνουν εικόνες, γραμματοσειρά και tracker όπως οι πραγματικές, ώστε να
+μετράει η διαφορά ανάμεσα στα προφίλ φόρτωσης του browser (stores.RenderProfile).
+
+Αντί για συνθετικές σελίδες μπορούν να δοθούν αποθηκευμένες σελίδες ανά κατάστημα
+(recordings), που σερβίρονται αυτούσιες ως οι σελίδες του καταστήματος.
+Οι απαντήσεις έχουν ETag, οπότε και το conditional GET του HttpFetcher μετράει.
+Με failure_rate ένα ποσοστό των σελίδων απαντάει 503, για να μετρήσουν και οι επαναλήψεις.
+"""
+import hashlib
+import math
+import mimetypes
+import random
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import fixtures
+
+STORES = ["Katerelos", "Fitrace", "Growling", "Fit1", "GymBeam"]
+FIT1_CATEGORIES = 3
+# Παράμετροι που κρατάνε οι σύνδεσμοι σελιδοποίησης κάθε καταστήματος, όπως στα πραγματικά sites
+PAGE_QUERY = {"Katerelos": "", "Fitrace": "&sort=5a"}
+
+# Μεγέθη των στατικών πόρων (bytes)
+IMAGE_BYTES = 24 * 1024
+FONT_BYTES = 64 * 1024
+TRACKER_BYTES = 48 * 1024
+
+# Προσθέτει το HTML ενός αιτήματος στο τέλος της λίστας προϊόντων
+APPEND_SCRIPT = """
+function appendProducts(url, done) {
+    fetch(url).then(function (response) { return response.text(); }).then(function (html) {
+        document.querySelector('.products').insertAdjacentHTML('beforeend', html);
+        done();
+    });
+}
+"""
+
+
+class StandInServer:
+    """
+    Ο server τρέχει σε thread στο 127.0.0.1 (σε ελεύθερη θύρα με port=0).
+    requests και bytes_sent μετράνε τις σελίδες και τα bytes που σερβιρίστηκαν ανά κατάστημα,
+    failures τις σελίδες που απάντησαν 503 λόγω failure_rate.
+    """
+
+    def __init__(self, products_per_store: int = 200, per_page: int = 48, seed: int = 1,
+                 recordings: Optional[Dict[str, List[str]]] = None, port: int = 0, failure_rate: float = 0.0):
+        self.per_page = per_page
+        self.failure_rate = failure_rate
+        self.failures = Counter()
+        self._random = random.Random(seed)
+        self.recordings = recordings or {}
+        self.catalogs = {store: fixtures.catalog(products_per_store, seed + index)
+                         for index, store in enumerate(STORES)}
+        self.requests = Counter()
+        self.bytes_sent = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    # Διαχείριση του server ----------------------------------------------------
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    @property
+    def third_party_url(self) -> str:
+        """Ο ίδιος server με άλλο host, ώστε ο browser να τον βλέπει ως τρίτο domain."""
+        return f"http://localhost:{self._server.server_address[1]}"
+
+    def store_urls(self) -> Dict[str, List[str]]:
+        """
+        Οι αρχικές σελίδες κάθε καταστήματος (τα urls του stores.store_config). Για τα
+        καταστήματα με σελίδες δίνεται μόνο η πρώτη· οι υπόλοιπες βρίσκονται από τους συνδέσμους της.
+        """
+        return {
+            "Katerelos": [self.url("/katerelos/")],
+            "Fitrace": [self.url("/fitrace/?page=1&sort=5a")],
+            "Growling": [self.url("/growling/")],
+            "Fit1": [self.url(f"/fit1/category/{c}") for c in range(self.fit1_categories())],
+            "GymBeam": [self.url("/gymbeam/")],
+        }
+
+    # Περιεχόμενο ---------------------------------------------------------------
+
+    def page_count(self, store: str, items: Optional[list] = None) -> int:
+        if store in self.recordings:
+            return len(self.recordings[store])
+        items = self.catalogs[store] if items is None else items
+        return max(1, math.ceil(len(items) / self.per_page))
+
+    def fit1_categories(self) -> int:
+        return len(self.recordings["Fit1"]) if "Fit1" in self.recordings else FIT1_CATEGORIES
+
+    def fit1_items(self, category: int) -> list:
+        return self.catalogs["Fit1"][category::FIT1_CATEGORIES]
+
+    def chunk(self, items: list, page: int) -> list:
+        return items[(page - 1) * self.per_page:page * self.per_page]
+
+    def cards(self, store: str, items: list) -> str:
+        return "".join(fixtures.store_cards(store, items, base_url=self.url("/gymbeam/p")))
+
+    def recorded(self, store: str, index: int) -> Optional[str]:
+        pages = self.recordings.get(store, [])
+        if not 0 <= index < len(pages):
+            return None
+        # Οι σύνδεσμοι των αποθηκευμένων σελίδων του GymBeam δείχνουν στις σελίδες προϊόντων του server
+        return pages[index].replace("https://gymbeam.gr/", self.url("/gymbeam/p/"))
+
+    def paginated_page(self, store: str, page: int) -> Optional[str]:
+        if store in self.recordings:
+            return self.recorded(store, page - 1)
+        if not 1 <= page <= self.page_count(store):
+            return None
+        pages = self.page_count(store)
+        # Σύνδεσμοι προς τις δύο γειτονικές σελίδες από κάθε πλευρά και προς την τελευταία
+        numbers = sorted({n for n in range(page - 2, page + 3) if 1 <= n <= pages} | {pages})
+        links = "".join(f'<li><a href="?page={n}{PAGE_QUERY[store]}">{n}</a></li>' for n in numbers)
+        return fixtures.page(f"{store} {page}", [self.cards(store, self.chunk(self.catalogs[store], page))], page,
+                             extra=f'<ul class="pagination">{links}</ul>')
+
+    def load_more_page(self, store: str, items: list, button: str, more_url: str) -> str:
+        """Πρώτη σελίδα με κουμπί που φέρνει τις επόμενες και εξαφανίζεται στην τελευταία."""
+        pages = self.page_count(store, items)
+        button_html = (
+            f'<button class="{button}" onclick="loadNext(this)">Περισσότερα</button>'
+            f'<script>{APPEND_SCRIPT} var nextPage = 2;'
+            f'function loadNext(button) {{'
+            f'  if (nextPage > {pages}) return;'
+            f'  appendProducts("{more_url}" + nextPage, function () {{}});'
+            f'  if (++nextPage > {pages}) button.remove();'
+            f'}}</script>'
+        ) if pages > 1 else ""
+        return fixtures.page(store, [self.cards(store, self.chunk(items, 1))], extra=button_html)
+
+    def infinite_scroll_page(self, category: int) -> str:
+        items = self.fit1_items(category)
+        pages = self.page_count("Fit1", items)
+        scroll_html = (
+            f'<div class="no-more-products" style="display:{"none" if pages > 1 else "block"}">Τέλος</div>'
+            f'<script>{APPEND_SCRIPT} var nextPage = 2, loading = false;'
+            f'window.addEventListener("scroll", function () {{'
+            f'  if (loading || nextPage > {pages}) return;'
+            f'  if (window.innerHeight + window.scrollY < document.body.scrollHeight - 200) return;'
+            f'  loading = true;'
+            f'  appendProducts("/fit1/more?category={category}&page=" + nextPage, function () {{'
+            f'    loading = false;'
+            f'    if (++nextPage > {pages}) document.querySelector(".no-more-products").style.display = "block";'
+            f'  }});'
+            f'}});</script>'
+        )
+        return fixtures.page(f"Fit1 {category}", [self.cards("Fit1", self.chunk(items, 1))], extra=scroll_html)
+
+    def gymbeam_product(self, slug: str) -> str:
+        item = next((item for item in self.catalogs["GymBeam"] if item[3] == slug), None)
+        # Προϊόντα αποθηκευμένων σελίδων: συνθετικές παραλλαγές με σταθερή τιμή ανά slug
+        if item is None:
+            price = 15 + int(hashlib.md5(slug.encode("utf-8")).hexdigest(), 16) % 10000 / 100
+            item = ("GymBeam", slug, "", slug, price)
+        return fixtures.gymbeam_product_page(*item)
+
+    def assets(self) -> str:
+        """Η γραμματοσειρά και ο tracker που φορτώνει κάθε ολόκληρη σελίδα (μπαίνουν στο <head>)."""
+        return ('<style>@font-face{font-family:Store;src:url(/static/store.woff2)} body{font-family:Store}</style>'
+                f'<script async src="{self.third_party_url}/tracker.js"></script>')
+
+    def static(self, path: str) -> Optional[bytes]:
+        """Περιεχόμενο σταθερού μεγέθους για εικόνες, γραμματοσειρά και tracker."""
+        if path.startswith("/img/") and path.endswith(".jpg"):
+            return b"\xff\xd8" + b"\0" * (IMAGE_BYTES - 2)
+        if path == "/static/store.woff2":
+            return b"wOF2" + b"\0" * (FONT_BYTES - 4)
+        if path == "/tracker.js":
+            padding = "/*" + "x" * TRACKER_BYTES + "*/"
+            return (padding + "setTimeout(function () { fetch('/beacon', {mode: 'no-cors'}); }, 300);").encode()
+        if path == "/beacon":
+            return b""
+        return None
+
+    def route(self, path: str, query: Dict[str, List[str]]) -> tuple:
+        """(κατάστημα, HTML) για ένα path, ("static", bytes) για τους πόρους, ή (κατάστημα, None) αν δεν υπάρχει."""
+        static = self.static(path)
+        if static is not None:
+            return "static", static
+        parts = [part for part in path.split("/") if part]
+        page = int(query.get("page", ["1"])[0])
+        if not parts:
+            return None, None
+        store = next((name for name in STORES if name.lower() == parts[0]), None)
+        rest = parts[1:]
+
+        if store in ("Katerelos", "Fitrace") and not rest:
+            return store, self.paginated_page(store, page)
+
+        if store in ("Growling", "GymBeam") and not rest:
+            if store in self.recordings:
+                return store, self.recorded(store, 0)
+            button = "load-more" if store == "Growling" else "amscroll-load-button"
+            return store, self.load_more_page(store, self.catalogs[store], button, f"/{parts[0]}/more?page=")
+        if store in ("Growling", "GymBeam") and rest == ["more"]:
+            return store, self.cards(store, self.chunk(self.catalogs[store], page))
+        if store == "GymBeam" and len(rest) == 2 and rest[0] == "p" and rest[1].endswith(".html"):
+            return store, self.gymbeam_product(rest[1][:-len(".html")])
+
+        if store == "Fit1" and len(rest) == 2 and rest[0] == "category":
+            category = int(rest[1])
+            if "Fit1" in self.recordings:
+                return store, self.recorded("Fit1", category)
+            return store, self.infinite_scroll_page(category) if 0 <= category < FIT1_CATEGORIES else None
+        if store == "Fit1" and rest == ["more"]:
+            category = int(query.get("category", ["0"])[0])
+            return store, self.cards("Fit1", self.chunk(self.fit1_items(category), page))
+        return store, None
+
+    def fail(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.failure_rate
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                try:
+                    store, html = stand_in.route(parsed.path, parse_qs(parsed.query))
+                except ValueError:
+                    store, html = None, None
+                if html is None:
+                    self.send_error(404)
+                    return
+                if store != "static" and stand_in.fail():
+                    with stand_in._lock:
+                        stand_in.failures[store] += 1
+                    self.send_error(503)
+                    return
+
+                if isinstance(html, bytes):
+                    body, content_type = html, mimetypes.guess_type(parsed.path)[0] or "application/octet-stream"
+                else:
+                    # Οι ολόκληρες σελίδες φορτώνουν και τους πόρους τους
+                    html = html.replace("</head>", stand_in.assets() + "</head>", 1)
+                    body, content_type = html.encode("utf-8"), "text/html; charset=utf-8"
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    body = b""
+                else:
+                    self.send_response(200)
+                    # Χωρίς charset η requests διαβάζει το text/html ως Latin-1
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                with stand_in._lock:
+                    stand_in.requests[store] += 1
+                    stand_in.bytes_sent[store] += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
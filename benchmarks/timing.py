@@ -0,0 +1,39 @@
+"""
+Κοινές χρονομετρήσεις των benchmarks (όλοι οι χρόνοι σε δευτερόλεπτα, με time.perf_counter).
+"""
+import statistics
+import time
+from typing import Any, Callable, List, Tuple
+
+
+def run_times(function: Callable[[], Any], repeat: int) -> Tuple[List[float], Any]:
+    """(χρόνος κάθε εκτέλεσης, αποτέλεσμα της τελευταίας)"""
+    runs, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        runs.append(time.perf_counter() - start)
+    return runs, result
+
+
+def timed(function: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    """(διάμεσος, αποτέλεσμα της τελευταίας εκτέλεσης)"""
+    runs, result = run_times(function, repeat)
+    return statistics.median(runs), result
+
+
+def median_ms(function: Callable[[], Any], repeat: int) -> float:
+    """Διάμεσος χρόνος σε ms."""
+    return timed(function, repeat)[0] * 1000
+
+
+def best_time(function: Callable[[], Any], repeat: int) -> float:
+    """Ο καλύτερος χρόνος από repeat εκτελέσεις."""
+    return min(run_times(function, repeat)[0])
+
+
+def measure(function: Callable[[], Any]) -> Tuple[float, float, Any]:
+    """(χρόνος, χρόνος CPU του τρέχοντος process, αποτέλεσμα) μίας εκτέλεσης"""
+    start, cpu = time.perf_counter(), time.process_time()
+    result = function()
+    return time.perf_counter() - start, time.process_time() - cpu, result
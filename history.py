@@ -0,0 +1,308 @@
+"""
+Ιστορικό τιμών ανά προϊόν και κατάστημα, που κρατιέται από run σε run.
+
+Στο τέλος κάθε run (βλ. sidp02.main) καταγράφεται η χαμηλότερη τιμή κάθε προϊόντος σε
+κάθε κατάστημα, όπου "προϊόν" είναι η ομάδα καταχωρήσεων με το ίδιο canonical_id
+(βλ. matching.assign_canonical_ids). Επειδή τα ids των καταχωρήσεων ξεκινάνε από την
+αρχή μετά από reset_database και το canonical_id αλλάζει όταν η καταχώρησή του αφαιρεθεί,
+το προϊόν του ιστορικού (history_products) αναγνωρίζεται από τα name_keys όλων των
+καταχωρήσεων που ανήκαν ποτέ στην ομάδα του (πίνακας history_keys). Οι πίνακες του
+ιστορικού δεν σβήνονται στο reset.
+
+Οι τιμές γράφονται σε ακέραια λεπτά και μόνο όταν αλλάζουν: μια γραμμή του price_history
+σημαίνει "από το recorded_at η τιμή είναι price_cents" (NULL όταν το προϊόν χάθηκε από το
+κατάστημα), και το change_cents κρατάει τη διαφορά από την προηγούμενη τιμή, ώστε οι
+μεγαλύτερες πτώσεις ενός run να έρχονται κατευθείαν από το index. Η τρέχουσα τιμή κάθε
+ζευγαριού (προϊόν, κατάστημα) κρατιέται στο price_current, οπότε η καταγραφή ενός run
+δεν διαβάζει το ιστορικό.
+"""
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from sidp02 import clean_price, connect_db, create_listing_tables
+
+DAY = 24 * 60 * 60
+
+
+def create_history_tables(cursor):
+    """Δημιουργεί τους πίνακες του ιστορικού αν δεν υπάρχουν."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS history_products (
+            id INTEGER PRIMARY KEY,
+            name_key TEXT NOT NULL UNIQUE,
+            name TEXT NOT NULL
+        )
+    """)
+    has_keys = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'history_keys'"
+    ).fetchone() is not None
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS history_keys (
+            name_key TEXT PRIMARY KEY,
+            product_id INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    if not has_keys:
+        # Βάση από παλαιότερη έκδοση: κάθε προϊόν αναγνωριζόταν μόνο από το δικό του name_key
+        cursor.execute("INSERT OR IGNORE INTO history_keys (name_key, product_id) SELECT name_key, id FROM history_products")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS price_history (
+            product_id INTEGER NOT NULL,
+            store TEXT NOT NULL,
+            recorded_at INTEGER NOT NULL,
+            run_id INTEGER NOT NULL,
+            price_cents INTEGER,
+            change_cents INTEGER,
+            PRIMARY KEY (product_id, store, recorded_at)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS price_current (
+            product_id INTEGER NOT NULL,
+            store TEXT NOT NULL,
+            price_cents INTEGER NOT NULL,
+            PRIMARY KEY (product_id, store)
+        ) WITHOUT ROWID
+    """)
+    # Οι πτώσεις ενός run ταξινομημένες, και οι αλλαγές ενός διαστήματος χωρίς επίσκεψη στον πίνακα
+    # (τα product_id και store μπαίνουν στα indexes ως κλειδί του πίνακα)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_price_history_run ON price_history (run_id, change_cents)")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_price_history_time
+        ON price_history (recorded_at, change_cents, price_cents)
+    """)
+
+
+def to_cents(price) -> int:
+    """Τιμή σε ακέραια λεπτά, με τη διόρθωση τιμών κάτω του 1 όπως στο derive_product_columns."""
+    price = clean_price(price)
+    if price < 1:
+        price *= 100
+    return round(price * 100)
+
+
+def current_prices(cursor) -> Dict[Tuple[str, str], Tuple[str, int]]:
+    """
+    Η χαμηλότερη τιμή κάθε προϊόντος σε κάθε κατάστημα από τις ενεργές καταχωρήσεις:
+    (name_key, store) -> (name, λεπτά), με name_key και name της καταχώρησης του canonical_id.
+    """
+    rows = cursor.execute("""
+        SELECT canonical.name_key, canonical.name, l.store, l.price
+        FROM listings l
+        JOIN listings canonical ON canonical.id = COALESCE(l.canonical_id, l.id)
+        WHERE l.removed_at IS NULL
+    """).fetchall()
+    prices = {}
+    for name_key, name, store, price in rows:
+        try:
+            cents = to_cents(price)
+        except (ValueError, TypeError):
+            continue
+        current = prices.get((name_key, store))
+        if current is None or cents < current[1]:
+            prices[(name_key, store)] = (name, cents)
+    return prices
+
+
+def group_keys(cursor) -> Dict[str, Set[str]]:
+    """Τα name_keys των ενεργών καταχωρήσεων κάθε ομάδας, ανά name_key της καταχώρησης του canonical_id."""
+    groups: Dict[str, Set[str]] = {}
+    for canonical_key, name_key in cursor.execute("""
+        SELECT canonical.name_key, l.name_key
+        FROM listings l
+        JOIN listings canonical ON canonical.id = COALESCE(l.canonical_id, l.id)
+        WHERE l.removed_at IS NULL
+    """):
+        groups.setdefault(canonical_key, {canonical_key}).add(name_key)
+    return groups
+
+
+def history_ids(cursor, names: Dict[str, str], groups: Dict[str, Set[str]]) -> Dict[str, int]:
+    """
+    Το προϊόν του ιστορικού κάθε ομάδας (name_key του canonical_id -> id): αυτό που έχει ήδη
+    κάποιο από τα name_keys της, αλλιώς ένα νέο. Όλα τα name_keys της ομάδας καταγράφονται
+    στο history_keys, ώστε η ομάδα να βρίσκεται και όταν αλλάξει η καταχώρηση του canonical_id.
+    """
+    known = dict(cursor.execute("SELECT name_key, product_id FROM history_keys").fetchall())
+    product_ids, new_keys = {}, []
+    for name_key, name in names.items():
+        members = groups.get(name_key, set()) | {name_key}
+        found = [known[key] for key in members if key in known]
+        if found:
+            product_id = min(found)
+        else:
+            product_id = cursor.execute("INSERT INTO history_products (name_key, name) VALUES (?, ?)",
+                                        (name_key, name)).lastrowid
+        product_ids[name_key] = product_id
+        for key in members:
+            if key not in known:
+                known[key] = product_id
+                new_keys.append((key, product_id))
+    cursor.executemany("INSERT INTO history_keys (name_key, product_id) VALUES (?, ?)", new_keys)
+    return product_ids
+
+
+def record_snapshot(cursor, run_id: int, recorded_at: int, prices: Dict[Tuple[str, str], Tuple[str, int]],
+                    groups: Optional[Dict[str, Set[str]]] = None) -> int:
+    """
+    Γράφει τις τιμές ενός run ((name_key, store) -> (name, λεπτά)) στο ιστορικό: μία γραμμή
+    για κάθε τιμή που άλλαξε ή εμφανίστηκε και μία με NULL για κάθε προϊόν που δεν υπάρχει
+    πια στο κατάστημα. groups: τα name_keys κάθε ομάδας (βλ. group_keys)· χωρίς αυτό κάθε
+    name_key είναι ομάδα μόνο του. Επιστρέφει πόσες γραμμές γράφτηκαν.
+    """
+    product_ids = history_ids(cursor, {name_key: name for (name_key, _), (name, _) in prices.items()}, groups or {})
+    previous = {(product_id, store): cents for product_id, store, cents in
+                cursor.execute("SELECT product_id, store, price_cents FROM price_current").fetchall()}
+
+    current = {}
+    for (name_key, store), (_, cents) in prices.items():
+        key = (product_ids[name_key], store)
+        # Δύο ομάδες με το ίδιο προϊόν του ιστορικού (π.χ. μια ομάδα που χωρίστηκε): η χαμηλότερη τιμή
+        current[key] = min(cents, current.get(key, cents))
+    changes = [key + (recorded_at, run_id, cents, None if previous.get(key) is None else cents - previous[key])
+               for key, cents in current.items() if previous.get(key) != cents]
+    changes.extend(key + (recorded_at, run_id, None, None) for key in previous.keys() - current.keys())
+
+    cursor.executemany("""
+        INSERT OR REPLACE INTO price_history (product_id, store, recorded_at, run_id, price_cents, change_cents)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, changes)
+    cursor.executemany("DELETE FROM price_current WHERE product_id = ? AND store = ?",
+                       [change[:2] for change in changes if change[4] is None])
+    cursor.executemany("INSERT OR REPLACE INTO price_current (product_id, store, price_cents) VALUES (?, ?, ?)",
+                       [change[:2] + (change[4],) for change in changes if change[4] is not None])
+    return len(changes)
+
+
+def record_run_prices(run_id: int, recorded_at: Optional[float] = None) -> int:
+    """
+    Καταγράφει στο ιστορικό τις τιμές των ενεργών καταχωρήσεων στο τέλος ενός run (μετά το
+    assign_canonical_ids). Επιστρέφει πόσες αλλαγές τιμών γράφτηκαν.
+    """
+    conn = connect_db()
+    try:
+        cursor = conn.cursor()
+        create_listing_tables(cursor)
+        create_history_tables(cursor)
+        with conn:
+            return record_snapshot(cursor, run_id, int(recorded_at or time.time()),
+                                   current_prices(cursor), group_keys(cursor))
+    finally:
+        conn.close()
+
+
+def history_product_id(cursor, canonical_id: int) -> Optional[int]:
+    """Το προϊόν του ιστορικού για ένα canonical_id (από τα name_keys των καταχωρήσεων της ομάδας του)."""
+    return cursor.execute("""
+        SELECT MIN(k.product_id) FROM listings l JOIN history_keys k ON k.name_key = l.name_key
+        WHERE l.id = ? OR l.canonical_id = ?
+    """, (canonical_id, canonical_id)).fetchone()[0]
+
+
+def price_series(cursor, product_id: int, since: int) -> Dict[str, List[Tuple[int, Optional[float]]]]:
+    """
+    Οι τιμές (σε €) ενός προϊόντος ανά κατάστημα από το since και μετά: (χρόνος, τιμή) για
+    κάθε αλλαγή, με πρώτο σημείο την τιμή που ίσχυε στο since (None όταν δεν πωλούνταν).
+    """
+    rows = cursor.execute("""
+        SELECT store, MAX(recorded_at), price_cents FROM price_history
+        WHERE product_id = ? AND recorded_at < ?
+        GROUP BY store
+        UNION ALL
+        SELECT store, recorded_at, price_cents FROM price_history
+        WHERE product_id = ? AND recorded_at >= ?
+        ORDER BY 1, 2
+    """, (product_id, since, product_id, since)).fetchall()
+    series = {}
+    for store, recorded_at, cents in rows:
+        series.setdefault(store, []).append((max(recorded_at, since), None if cents is None else cents / 100))
+    return series
+
+
+def lowest_price(canonical_id: int, days: int = 30, now: Optional[float] = None) -> Optional[Dict]:
+    """
+    Η χαμηλότερη τιμή ενός προϊόντος σε οποιοδήποτε κατάστημα τις τελευταίες days ημέρες:
+    {"price", "store", "recorded_at"} (από πότε ίσχυε), ή None αν δεν υπάρχει ιστορικό.
+    """
+    conn = connect_db()
+    try:
+        cursor = conn.cursor()
+        create_listing_tables(cursor)
+        create_history_tables(cursor)
+        product_id = history_product_id(cursor, canonical_id)
+        if product_id is None:
+            return None
+        series = price_series(cursor, product_id, int((now or time.time()) - days * DAY))
+    finally:
+        conn.close()
+    points = [(price, recorded_at, store) for store, points in series.items()
+              for recorded_at, price in points if price is not None]
+    if not points:
+        return None
+    price, recorded_at, store = min(points)
+    return {"price": price, "store": store, "recorded_at": recorded_at}
+
+
+def price_trend(canonical_id: int, days: int = 90, now: Optional[float] = None) -> Dict[str, List[tuple]]:
+    """Η πορεία της τιμής ενός προϊόντος ανά κατάστημα τις τελευταίες days ημέρες (βλ. price_series)."""
+    conn = connect_db()
+    try:
+        cursor = conn.cursor()
+        create_listing_tables(cursor)
+        create_history_tables(cursor)
+        product_id = history_product_id(cursor, canonical_id)
+        if product_id is None:
+            return {}
+        return price_series(cursor, product_id, int((now or time.time()) - days * DAY))
+    finally:
+        conn.close()
+
+
+def biggest_drops(limit: int = 10, run_id: Optional[int] = None) -> List[Dict]:
+    """
+    Οι μεγαλύτερες πτώσεις τιμής (σε €) ενός run σε σχέση με την προηγούμενη τιμή του
+    προϊόντος στο ίδιο κατάστημα, προεπιλογή το τελευταίο run που ολοκληρώθηκε (κενή λίστα
+    αν σε εκείνο δεν άλλαξε καμία τιμή): dicts με name, store, old_price, price, drop και drop_pct.
+    """
+    conn = connect_db()
+    try:
+        cursor = conn.cursor()
+        create_listing_tables(cursor)
+        create_history_tables(cursor)
+        if run_id is None:
+            run_id = cursor.execute("SELECT MAX(id) FROM runs WHERE finished_at IS NOT NULL").fetchone()[0]
+        rows = cursor.execute("""
+            SELECT p.name, h.store, h.price_cents - h.change_cents, h.price_cents, -h.change_cents
+            FROM price_history h JOIN history_products p ON p.id = h.product_id
+            WHERE h.run_id = ? AND h.change_cents < 0
+            ORDER BY h.change_cents
+            LIMIT ?
+        """, (run_id, limit)).fetchall()
+    finally:
+        conn.close()
+    return [{"name": name, "store": store, "old_price": old / 100, "price": cents / 100,
+             "drop": drop / 100, "drop_pct": drop / old * 100}
+            for name, store, old, cents, drop in rows]
+
+
+def store_trends(days: int = 30, now: Optional[float] = None) -> Dict[str, Dict]:
+    """
+    Οι αλλαγές τιμών κάθε καταστήματος τις τελευταίες days ημέρες: πόσες πτώσεις (drops)
+    και αυξήσεις (rises) και η μέση μεταβολή σε ποσοστό (avg_change_pct).
+    """
+    conn = connect_db()
+    try:
+        cursor = conn.cursor()
+        create_history_tables(cursor)
+        rows = cursor.execute("""
+            SELECT store, SUM(change_cents < 0), SUM(change_cents > 0),
+                   AVG(change_cents * 100.0 / (price_cents - change_cents))
+            FROM price_history
+            WHERE recorded_at >= ? AND change_cents IS NOT NULL AND price_cents <> change_cents
+            GROUP BY store
+            ORDER BY store
+        """, (int((now or time.time()) - days * DAY),)).fetchall()
+    finally:
+        conn.close()
+    return {store: {"drops": drops, "rises": rises, "avg_change_pct": average}
+            for store, drops, rises, average in rows}
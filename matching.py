@@ -0,0 +1,262 @@
+"""
+Αντιστοίχιση των ίδιων προϊόντων ανάμεσα στα καταστήματα.
+
+Το ίδιο προϊόν εμφανίζεται με διαφορετικά ονόματα ("Whey 2kg", "WHEY PROTEIN 2000g",
+"Optimum Nutrition Whey 2 kg"). Τα ονόματα κανονικοποιούνται σε σύνολα λέξεων και το βάρος
+σε γραμμάρια, κάθε σύνολο γίνεται υπογραφή MinHash και ένα ευρετήριο LSH (ανά βάρος και κατηγορία) δίνει
+τα υποψήφια ζευγάρια χωρίς σύγκριση όλων με όλα. Όσα ζευγάρια από διαφορετικά καταστήματα
+έχουν αρκετή ομοιότητα παίρνουν το ίδιο canonical_id.
+"""
+import re
+import unicodedata
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from sidp02 import (CATEGORIES, WEIGHT_PATTERNS, connect_db, create_listing_tables, create_products_table,
+                    match_categories, parse_grams)
+
+# Λέξεις που δεν ξεχωρίζουν ένα προϊόν από ένα άλλο (χωρίς τόνους, σε πεζά)
+STOPWORDS = {
+    "protein", "proteins", "powder", "supplement", "new", "the", "and", "with", "of", "by", "for",
+    "πρωτεινη", "πρωτεινης", "σκονη", "συμπληρωμα", "με", "και", "σε", "του", "της", "γευση", "flavour", "flavor",
+}
+
+# Συνώνυμα που γράφονται αλλιώς σε κάθε κατάστημα
+SYNONYMS = {
+    "isolated": "isolate", "iso": "isolate", "απομονωμενος": "isolate",
+    "hydrolized": "hydrolyzed", "hydrolysed": "hydrolyzed", "hydro": "hydrolyzed", "υδρολυμενος": "hydrolyzed",
+    "gainer": "mass", "μαζα": "mass",
+    "ορος": "whey", "ορρος": "whey",
+    "chocolate": "σοκολατα", "vanilla": "βανιλια", "strawberry": "φραουλα",
+}
+
+# Πρώτος αριθμός Mersenne που χωράει σε 31 bits: a * x + b δεν ξεπερνάει τα 64 bits
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+# Πίνακας για str.translate που αφαιρεί τους τόνους (Latin-1 και ελληνικά)
+ACCENTS = {
+    code: unicodedata.normalize("NFD", chr(code))[0]
+    for code in list(range(0x00C0, 0x0180)) + list(range(0x0370, 0x0400)) + list(range(0x1F00, 0x2000))
+    if len(unicodedata.normalize("NFD", chr(code))) > 1
+}
+
+
+def strip_accents(text: str) -> str:
+    return text.translate(ACCENTS)
+
+
+def normalize_tokens(name: str) -> List[str]:
+    """Οι ταξινομημένες μοναδικές λέξεις ενός ονόματος, χωρίς βάρος, τόνους και γενικές λέξεις."""
+    text = name
+    for pattern, _ in WEIGHT_PATTERNS:
+        text = pattern.sub(" ", text)
+    text = strip_accents(text.lower())
+    tokens = {SYNONYMS.get(token, token) for token in re.findall(r"[^\W_]+", text)}
+    return sorted(token for token in tokens if token not in STOPWORDS and len(token) > 1)
+
+
+def block_key(name: str) -> int:
+    """
+    Το block μιας καταχώρησης: βάρος σε γραμμάρια και οι κατηγορίες της (CATEGORIES) ως bitmask.
+    Μόνο καταχωρήσεις του ίδιου block συγκρίνονται, οπότε ένα "Iso Whey 2kg" δεν ταιριάζει ποτέ
+    με ένα "Whey 2kg" ή με ένα "Iso Whey 1kg".
+    """
+    categories = set(match_categories(name))
+    mask = sum(1 << bit for bit, category in enumerate(CATEGORIES) if category in categories)
+    return ((parse_grams(name) or 0) << len(CATEGORIES)) | mask
+
+
+def minhash_signatures(token_lists: List[List[str]], num_perm: int = 64, seed: int = 7,
+                       chunk: int = 8) -> np.ndarray:
+    """
+    Υπογραφές MinHash (num_perm τιμές ανά όνομα) για όλα τα ονόματα μαζί.
+    Οι λέξεις γίνονται hash μία φορά (crc32, ίδιο σε κάθε εκτέλεση) και οι μεταθέσεις
+    (a * x + b) mod p εφαρμόζονται σε όλες τις λέξεις του καταλόγου ανά chunk μεταθέσεων.
+    Ονόματα χωρίς λέξεις έχουν υπογραφή ίση με p σε όλες τις θέσεις.
+    """
+    size = len(token_lists)
+    signatures = np.full((size, num_perm), MERSENNE_PRIME, dtype=np.uint64)
+    lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=size)
+    nonempty = lengths > 0
+    if not nonempty.any():
+        return signatures
+
+    vocabulary: Dict[str, int] = {}
+    flat = [vocabulary.setdefault(token, zlib.crc32(token.encode("utf-8")) % MERSENNE_PRIME)
+            for tokens in token_lists for token in tokens]
+    hashes = np.array(flat, dtype=np.uint64)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+    b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+    for start in range(0, num_perm, chunk):
+        stop = min(start + chunk, num_perm)
+        permuted = (a[start:stop, None] * hashes[None, :] + b[start:stop, None]) % MERSENNE_PRIME
+        signatures[nonempty, start:stop] = np.minimum.reduceat(permuted, offsets, axis=1).T
+    return signatures
+
+
+def lsh_candidate_pairs(signatures: np.ndarray, blocks: np.ndarray, bands: int = 16) -> np.ndarray:
+    """
+    Υποψήφια ζευγάρια (i, j), i < j, από ευρετήριο LSH: τα ονόματα που έχουν ίδιο block
+    (βάρος και κατηγορίες) και ίδιες τιμές σε τουλάχιστον μία ζώνη της υπογραφής πέφτουν στον ίδιο κάδο.
+    Μέσα σε κάθε κάδο κάθε όνομα ζευγαρώνεται με το επόμενο και με το πρώτο του κάδου,
+    οπότε τα ζευγάρια είναι O(n) ανά ζώνη αντί για O(n²).
+    """
+    size, num_perm = signatures.shape
+    rows_per_band = num_perm // bands
+    # Κάθε ζώνη (μαζί με το block) γίνεται ένα hash 64 bit. Οι σπάνιες συγκρούσεις
+    # δίνουν απλώς επιπλέον υποψήφια ζευγάρια, που απορρίπτονται στον έλεγχο ομοιότητας.
+    multipliers = np.random.default_rng(0).integers(1, 1 << 62, rows_per_band + 1, dtype=np.uint64) | np.uint64(1)
+    pairs = []
+    for band in range(bands):
+        band_values = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+        buckets = blocks.astype(np.uint64) * multipliers[0] + (band_values * multipliers[1:]).sum(axis=1, dtype=np.uint64)
+        order = np.argsort(buckets, kind="stable")
+        sorted_buckets = buckets[order]
+        same = sorted_buckets[1:] == sorted_buckets[:-1]
+        # Θέση του πρώτου μέλους του κάδου για κάθε θέση της ταξινόμησης
+        first = np.maximum.accumulate(np.where(np.concatenate(([True], ~same)), np.arange(size), 0))
+        pairs.append(np.column_stack((order[:-1][same], order[1:][same])))
+        pairs.append(np.column_stack((order[first[1:][same]], order[1:][same])))
+    pairs = np.concatenate(pairs).astype(np.int64)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    pairs.sort(axis=1)
+    # Κάθε ζευγάρι ως ένας ακέραιος: τα διπλότυπα φεύγουν με μία ταξινόμηση σε μία διάσταση
+    codes = np.sort(pairs[:, 0] * size + pairs[:, 1])
+    codes = codes[np.concatenate(([True], codes[1:] != codes[:-1]))]
+    return np.column_stack((codes // size, codes % size))
+
+
+def merge_groups(size: int, pairs: np.ndarray, similarity: np.ndarray, store_codes: np.ndarray) -> np.ndarray:
+    """
+    Ενώνει τα ζευγάρια σε ομάδες, από το πιο όμοιο προς το λιγότερο όμοιο, με τον περιορισμό
+    ότι μια ομάδα έχει το πολύ μία καταχώρηση από κάθε κατάστημα (ένα κατάστημα δεν πουλάει
+    το ίδιο προϊόν δύο φορές). Έτσι ένα γενικό όνομα ("Whey 1kg") δεν γίνεται γέφυρα που
+    ενώνει τα προϊόντα διαφορετικών brands. Επιστρέφει για κάθε κόμβο τον μικρότερο κόμβο της ομάδας του.
+    """
+    parent = list(range(size))
+    stores = [1 << int(code) for code in store_codes]
+
+    def root(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for index in np.argsort(-similarity, kind="stable"):
+        left, right = root(int(pairs[index, 0])), root(int(pairs[index, 1]))
+        if left == right or stores[left] & stores[right]:
+            continue
+        if right < left:
+            left, right = right, left
+        parent[right] = left
+        stores[left] |= stores[right]
+    return np.array([root(node) for node in range(size)], dtype=np.int64)
+
+
+def match_listings(names: List[str], stores: List[str], threshold: float = 0.8, min_jaccard: float = 0.3,
+                   num_perm: int = 64, bands: int = 32) -> np.ndarray:
+    """
+    Ομαδοποιεί τις καταχωρήσεις που είναι το ίδιο προϊόν. Επιστρέφει για κάθε καταχώρηση
+    τη θέση της πρώτης καταχώρησης της ομάδας της. Ζευγάρια ενώνονται μόνο αν είναι από
+    διαφορετικά καταστήματα και έχουν το ίδιο block (βλ. block_key). Η ομοιότητα είναι ο συντελεστής
+    επικάλυψης |A ∩ B| / min(|A|, |B|) (>= threshold), ώστε ένα brand μπροστά από το όνομα
+    να μη χαλάει το ταίριασμα, μαζί με ένα κατώτατο όριο Jaccard (>= min_jaccard).
+    Και τα δύο εκτιμώνται από τις υπογραφές MinHash.
+    """
+    size = len(names)
+    if size == 0:
+        return np.zeros(0, dtype=np.int64)
+    token_lists = [normalize_tokens(name) for name in names]
+    signatures = minhash_signatures(token_lists, num_perm)
+    lengths = np.fromiter(map(len, token_lists), dtype=np.float64, count=size)
+    blocks = np.array([block_key(name) for name in names], dtype=np.int64)
+    store_ids: Dict[str, int] = {}
+    store_codes = np.array([store_ids.setdefault(store, len(store_ids)) for store in stores], dtype=np.int64)
+
+    pairs = lsh_candidate_pairs(signatures, blocks, bands)
+    if len(pairs) == 0:
+        return np.arange(size)
+    left, right = pairs[:, 0], pairs[:, 1]
+    jaccard = (signatures[left] == signatures[right]).mean(axis=1)
+    # |A ∩ B| = J * (|A| + |B|) / (1 + J)
+    overlap = jaccard * (lengths[left] + lengths[right]) / (1 + jaccard)
+    overlap /= np.maximum(np.minimum(lengths[left], lengths[right]), 1)
+    keep = ((overlap >= threshold) & (jaccard >= min_jaccard) & (lengths[left] > 0) & (lengths[right] > 0)
+            & (store_codes[left] != store_codes[right]))
+    # Πρώτα τα ζευγάρια με την υψηλότερη ομοιότητα (Jaccard, και μετά επικάλυψη)
+    return merge_groups(size, pairs[keep], jaccard[keep] + overlap[keep] * 1e-3, store_codes)
+
+
+def assign_canonical_ids(threshold: float = 0.8) -> int:
+    """
+    Υπολογίζει το canonical_id όλων των ενεργών καταχωρήσεων (το μικρότερο id της ομάδας τους)
+    και το περνάει και στα προϊόντα. Επιστρέφει πόσα προϊόντα βρέθηκαν σε περισσότερα από ένα καταστήματα.
+    """
+    conn = connect_db()
+    try:
+        cursor = conn.cursor()
+        create_products_table(cursor)
+        create_listing_tables(cursor)
+        rows = cursor.execute("SELECT id, store, name FROM listings WHERE removed_at IS NULL ORDER BY id").fetchall()
+        if not rows:
+            return 0
+        ids, stores, names = zip(*rows)
+        ids = np.asarray(ids, dtype=np.int64)
+        canonical = ids[match_listings(list(names), list(stores), threshold)]
+        with conn:
+            cursor.executemany("UPDATE listings SET canonical_id = ? WHERE id = ?",
+                               zip(canonical.tolist(), ids.tolist()))
+            cursor.execute("""
+                UPDATE products SET canonical_id = (
+                    SELECT MIN(canonical_id) FROM listings
+                    WHERE listings.name_key = products.name_key AND removed_at IS NULL
+                )
+            """)
+        return cursor.execute("""
+            SELECT COUNT(*) FROM (
+                SELECT canonical_id FROM listings WHERE removed_at IS NULL
+                GROUP BY canonical_id HAVING COUNT(DISTINCT store) > 1
+            )
+        """).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def same_product_listings(canonical_id: int) -> List[tuple]:
+    """Οι ενεργές καταχωρήσεις (store, name, price, source_url) ενός προϊόντος σε όλα τα καταστήματα, από τη φθηνότερη."""
+    conn = connect_db()
+    try:
+        create_listing_tables(conn.cursor())
+        return conn.execute("""
+            SELECT store, name, price, source_url FROM listings
+            WHERE canonical_id = ? AND removed_at IS NULL
+            ORDER BY price
+        """, (canonical_id,)).fetchall()
+    finally:
+        conn.close()
+
+
+def cross_store_groups(min_stores: int = 2, limit: Optional[int] = None) -> List[tuple]:
+    """Τα προϊόντα που πωλούνται σε τουλάχιστον min_stores καταστήματα: (canonical_id, καταστήματα, φθηνότερη τιμή)."""
+    conn = connect_db()
+    try:
+        create_listing_tables(conn.cursor())
+        query = """
+            SELECT canonical_id, COUNT(DISTINCT store), MIN(price) FROM listings
+            WHERE removed_at IS NULL AND canonical_id IS NOT NULL
+            GROUP BY canonical_id HAVING COUNT(DISTINCT store) >= ?
+            ORDER BY COUNT(DISTINCT store) DESC, MIN(price)
+        """
+        params = (min_stores,)
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+        return conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
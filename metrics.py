@@ -0,0 +1,176 @@
+"""
+Μετρήσεις ανά στάδιο για τα scraping runs.
+
+Κάθε κατάστημα (και κάθε URL του) καταγράφει πόσο χρόνο πέρασε σε κάθε στάδιο:
+    fetch      κατέβασμα σελίδας με HTTP
+    render     φόρτωμα σελίδας στον browser, μαζί με τις αναμονές
+    wait       αναμονές μέχρι να σταθεροποιηθεί η σελίδα (μέρος του render)
+    parse      parsing του HTML
+    variants   τιμές μεγεθών από τις σελίδες προϊόντων (GymBeam)
+    db_write   εγγραφή στη βάση (ο χρόνος κάθε παρτίδας μοιράζεται ανά γραμμές)
+και μετρητές (requests, bytes, retries, rows, render_bytes = bytes που κατέβασε ο browser με το
+προφίλ του καταστήματος, χωρίς σύγκριση με πλήρη φόρτωση, βλ. benchmarks/bench_render.py,
+lost_pages = σελίδες που δεν διαβάστηκαν, write_errors = γραμμές που δεν γράφτηκαν στη βάση, ...).
+Στο τέλος του run γράφεται αναφορά JSON και, προαιρετικά, αρχείο κειμένου σε μορφή Prometheus
+(π.χ. για το textfile collector του node_exporter).
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+STAGES = ("fetch", "render", "wait", "parse", "variants", "db_write")
+COUNTERS = ("requests", "bytes", "retries", "throttled", "circuit_open", "errors", "cache_hits", "not_modified",
+            "renders", "render_bytes", "rows", "lost_pages", "write_errors")
+
+
+def duration_stats(durations: List[float]) -> Dict[str, float]:
+    """count, total, mean, p95 και max (σε δευτερόλεπτα) μιας λίστας χρόνων."""
+    ordered = sorted(durations)
+    return {
+        "count": len(ordered),
+        "total": sum(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+
+class RunMetrics:
+    """
+    Συλλέγει χρόνους σταδίων και μετρητές από όλα τα threads ενός run.
+
+    Οι χρόνοι κρατιούνται ανά (κατάστημα, στάδιο) και αθροιστικά ανά (κατάστημα, URL, στάδιο),
+    οι μετρητές ανά (κατάστημα, όνομα).
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.stages: Dict[tuple, List[float]] = {}
+        self.urls: Dict[tuple, Dict[str, float]] = {}
+        self.counters: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, store: str, stage: str, url: Optional[str] = None):
+        """Μετράει τον χρόνο του with-block ως στάδιο stage του store (και του url)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(store, stage, time.perf_counter() - start, url)
+
+    def record(self, store: str, stage: str, elapsed: float, url: Optional[str] = None):
+        with self._lock:
+            self.stages.setdefault((store, stage), []).append(elapsed)
+            if url is not None:
+                url_stages = self.urls.setdefault((store, url), {})
+                url_stages[stage] = url_stages.get(stage, 0.0) + elapsed
+
+    def count(self, store: str, name: str, amount: float = 1):
+        with self._lock:
+            self.counters[(store, name)] = self.counters.get((store, name), 0) + amount
+
+    def value(self, store: str, name: str) -> float:
+        """Η τρέχουσα τιμή ενός μετρητή."""
+        with self._lock:
+            return self.counters.get((store, name), 0)
+
+    def store_summary(self, store: str) -> Dict:
+        """Στάδια, μετρητές και χρόνοι ανά URL ενός καταστήματος."""
+        with self._lock:
+            stages = {stage: duration_stats(durations)
+                      for (name, stage), durations in self.stages.items() if name == store}
+            counters = {counter: self.counters.get((store, counter), 0) for counter in COUNTERS}
+            counters.update({counter: value for (name, counter), value in self.counters.items() if name == store})
+            urls = {url: dict(url_stages) for (name, url), url_stages in self.urls.items() if name == store}
+        return {"stages": stages, "counters": counters, "urls": urls}
+
+    def stores(self) -> List[str]:
+        with self._lock:
+            names = {store for store, _ in self.stages} | {store for store, _ in self.counters}
+        return sorted(names)
+
+    def report(self, run_id: Optional[int] = None, results: Optional[Dict[str, Dict]] = None,
+               mode: Optional[str] = None) -> Dict:
+        """Η αναφορά του run ως dict, έτοιμη για JSON."""
+        results = results or {}
+        finished_at = time.time()
+        stores = {}
+        for store in sorted(set(self.stores()) | set(results)):
+            entry = self.store_summary(store)
+            result = results.get(store)
+            if result is not None:
+                entry.update({"status": result["status"], "error": result["error"],
+                              "products": result["products"], "elapsed": result["elapsed"]})
+            stores[store] = entry
+
+        totals = {"stages": {}, "counters": {counter: 0 for counter in COUNTERS}}
+        for entry in stores.values():
+            for stage, stats in entry["stages"].items():
+                totals["stages"][stage] = totals["stages"].get(stage, 0.0) + stats["total"]
+            for counter, value in entry["counters"].items():
+                totals["counters"][counter] = totals["counters"].get(counter, 0) + value
+        return {
+            "run_id": run_id,
+            "mode": mode,
+            "started_at": self.started_at,
+            "finished_at": finished_at,
+            "elapsed": finished_at - self.started_at,
+            "stores": stores,
+            "totals": totals,
+        }
+
+
+def write_json_report(report: Dict, path: str) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def prometheus_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(report: Dict, prefix: str = "proteinapp_scrape") -> str:
+    """Η αναφορά σε μορφή κειμένου Prometheus (μόνο τα σύνολα ανά κατάστημα, όχι ανά URL)."""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{key}="{prometheus_label(val)}"' for key, val in labels.items())
+            lines.append(f"{prefix}_{name}{{{label_text}}} {value}")
+
+    stores = report["stores"]
+    metric("stage_seconds", "gauge", "Time spent per store and stage in the last run.",
+           [({"store": store, "stage": stage}, f"{stats['total']:.6f}")
+            for store, entry in stores.items() for stage, stats in entry["stages"].items()])
+    metric("stage_operations", "gauge", "Timed operations per store and stage in the last run.",
+           [({"store": store, "stage": stage}, stats["count"])
+            for store, entry in stores.items() for stage, stats in entry["stages"].items()])
+    for counter in COUNTERS:
+        metric(counter, "gauge", f"Total {counter.replace('_', ' ')} per store in the last run.",
+               [({"store": store}, entry["counters"].get(counter, 0)) for store, entry in stores.items()])
+    metric("products", "gauge", "Products found per store in the last run.",
+           [({"store": store}, entry["products"]) for store, entry in stores.items() if "products" in entry])
+    metric("store_success", "gauge", "1 if the store finished with status ok in the last run.",
+           [({"store": store}, int(entry["status"] == "ok")) for store, entry in stores.items() if "status" in entry])
+    metric("duration_seconds", "gauge", "Duration of the last run.", [({}, f"{report['elapsed']:.6f}")])
+    metric("last_run_timestamp_seconds", "gauge", "Unix time the last run finished.",
+           [({}, f"{report['finished_at']:.0f}")])
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_report(report: Dict, path: str) -> str:
+    """Γράφει ατομικά (προσωρινό αρχείο + rename), ώστε ο collector να μη διαβάσει μισό αρχείο."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(report))
+    os.replace(temporary, path)
+    return path
@@ -0,0 +1,369 @@
+"""
+Parsers των σελίδων λίστας κάθε καταστήματος.
+
+Κάθε συνάρτηση παίρνει το HTML μιας σελίδας και επιστρέφει τα προϊόντα της,
+επιλέγοντας με XPath μόνο τα στοιχεία των καρτών προϊόντων πάνω στο δέντρο της lxml,
+χωρίς να φτιάχνεται δέντρο BeautifulSoup για όλη τη σελίδα (που για το page_source
+μετά από όλα τα "load more" είναι πολύ αργό και βαρύ σε μνήμη).
+Οι κανόνες επιλογής είναι οι ίδιοι με τους παλιούς find_all/find_next.
+"""
+import json
+import multiprocessing
+import re
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urljoin, urlparse
+
+import lxml.html
+from lxml import etree
+
+# Ένα parser για όλες τις σελίδες: τα σχόλια δεν μπαίνουν καν στο δέντρο
+HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8", remove_comments=True, remove_pis=True)
+
+
+def has_class(name: str) -> str:
+    """Συνθήκη XPath: το στοιχείο έχει την κλάση name (όπως το class_= της BeautifulSoup)."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def with_next(root, cards: str, *targets: str) -> List[tuple]:
+    """
+    Για κάθε στοιχείο που ταιριάζει στο XPath cards, το πρώτο στοιχείο κάθε XPath του targets
+    που ακολουθεί σε σειρά εγγράφου, μαζί με τα παιδιά του (όπως το find_next της BeautifulSoup).
+    Όλα βρίσκονται με ένα XPath, που τα δίνει σε σειρά εγγράφου, και ένα πέρασμα της λίστας,
+    αντί για ένα following:: ανά κάρτα που θα έκανε το parsing O(n²).
+    """
+    card_set = set(root.xpath(cards))
+    target_sets = [set(root.xpath(target)) for target in targets]
+    rows, pending = [], [[] for _ in targets]
+    for element in root.xpath(" | ".join((cards,) + targets)):
+        # Ένα στοιχείο δεν είναι το "επόμενο" του εαυτού του, οπότε πρώτα κλείνουν οι προηγούμενες κάρτες
+        for index, target_set in enumerate(target_sets):
+            if element in target_set:
+                for row in pending[index]:
+                    row[index + 1] = element
+                pending[index] = []
+        if element in card_set:
+            row = [element] + [None] * len(targets)
+            rows.append(row)
+            for waiting in pending:
+                waiting.append(row)
+    return [tuple(row) for row in rows]
+
+
+def parse_html(html) -> etree._Element:
+    """Το δέντρο lxml μιας σελίδας (str ή UTF-8 bytes· ένα δέντρο που έχει ήδη φτιαχτεί επιστρέφεται ως έχει)."""
+    if isinstance(html, etree._Element):
+        return html
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+    return lxml.html.fromstring(html, parser=HTML_PARSER)
+
+
+def text_of(element) -> str:
+    return element.text_content().strip() if element is not None else ""
+
+
+def clean_text(text: str) -> str:
+    """Clean text by removing non-ASCII characters"""
+    return re.sub(r'[^\x00-\x7F]+', ' ', text).strip()
+
+
+def first(*results: list):
+    """Το πρώτο στοιχείο του πρώτου μη κενού αποτελέσματος XPath (ή None)."""
+    # Όχι "a or b": ένα στοιχείο lxml χωρίς παιδιά είναι False
+    for elements in results:
+        if elements:
+            return elements[0]
+    return None
+
+
+# Katerelos ---------------------------------------------------------------
+
+KATERELOS_CARDS = etree.XPath(f"//div[{has_class('block_btm')}]")
+KATERELOS_NAME = etree.XPath("(descendant::h4)[1]")
+KATERELOS_PRICE = etree.XPath("(descendant::h6)[1]")
+PRICE_STRONG = etree.XPath("(descendant::strong)[1]")
+PRICE_SPAN = etree.XPath("(descendant::span)[1]")
+
+
+def extract_price(price_tag) -> str:
+    """Η τιμή από το πρώτο strong (ή span) μέσα στο στοιχείο της τιμής"""
+    if price_tag is not None:
+        price = first(PRICE_STRONG(price_tag), PRICE_SPAN(price_tag))
+        return text_of(price) if price is not None else "No price"
+    return "No price"
+
+
+def parse_katerelos(html) -> List[Dict]:
+    products = []
+    for card in KATERELOS_CARDS(parse_html(html)):
+        name = first(KATERELOS_NAME(card))
+        if name is None:
+            continue
+        products.append({"name": clean_text(text_of(name)), "price": extract_price(first(KATERELOS_PRICE(card)))})
+    return products
+
+
+# Fitrace -----------------------------------------------------------------
+
+FITRACE_CARDS = f"//div[{has_class('description')}]"
+FITRACE_NAME = etree.XPath("(descendant::h4)[1]")
+FITRACE_PRICES = f"//div[{has_class('price')}]"
+
+
+def parse_fitrace(html) -> List[Dict]:
+    products = []
+    for card, price_tag in with_next(parse_html(html), FITRACE_CARDS, FITRACE_PRICES):
+        name = first(FITRACE_NAME(card))
+        if name is None:
+            continue
+        products.append({"name": clean_text(text_of(name)), "price": extract_price(price_tag)})
+    return products
+
+
+# Growling ----------------------------------------------------------------
+
+GROWLING_CARDS = "//h3[@class='heading-title product-name']"
+GROWLING_NAME = etree.XPath("(descendant::a)[1]")
+GROWLING_PRICES = f"//span[{has_class('price')}]"
+
+
+def parse_growling(html) -> List[Dict]:
+    products = []
+    for card, price_tag in with_next(parse_html(html), GROWLING_CARDS, GROWLING_PRICES):
+        name = first(GROWLING_NAME(card))
+        if name is None:
+            continue
+        products.append({"name": text_of(name), "price": text_of(price_tag) if price_tag is not None else "No price"})
+    return products
+
+
+# Fit1 --------------------------------------------------------------------
+
+FIT1_BRANDS = f"//div[{has_class('brand-line')}]"
+FIT1_TITLES = "//h3"
+FIT1_PACKS = f"//div[{has_class('pack-line')}]"
+FIT1_PRICES = etree.XPath(f"//div[{has_class('price-line')}]")
+# Προτιμάται η τιμή προσφοράς (green) από την κανονική (normalp)
+FIT1_PRICE_SALE = etree.XPath(f"(descendant::b[{has_class('green')}])[1]")
+FIT1_PRICE_NORMAL = etree.XPath(f"(descendant::b[{has_class('normalp')}])[1]")
+FIT1_PRICE_SUP = etree.XPath("(descendant::sup)[1]")
+
+
+def process_price(price_element) -> str:
+    """Η τιμή του Fit1, όπου τα δεκαδικά είναι σε ξεχωριστό <sup>"""
+    main_price = text_of(price_element).replace('€', '').strip()
+    sup_element = first(FIT1_PRICE_SUP(price_element))
+    if sup_element is not None:
+        main_price = main_price.replace(sup_element.text_content(), "")
+        return f"{main_price},{text_of(sup_element)}"
+    return main_price
+
+
+def parse_fit1(html) -> List[Dict]:
+    root = parse_html(html)
+    prices = FIT1_PRICES(root)
+    products = []
+    for i, (brand, title, pack) in enumerate(with_next(root, FIT1_BRANDS, FIT1_TITLES, FIT1_PACKS)):
+        if title is None or pack is None:
+            continue
+        full_name = f"{text_of(brand)} {title.get('title', '').strip()} {text_of(pack)}"
+
+        price = "No price"
+        if i < len(prices):
+            price_element = first(FIT1_PRICE_SALE(prices[i]), FIT1_PRICE_NORMAL(prices[i]))
+            if price_element is not None:
+                price = process_price(price_element)
+        products.append({"name": full_name, "price": price})
+    return products
+
+
+# GymBeam -----------------------------------------------------------------
+
+GYMBEAM_CARDS = etree.XPath("//div[@class='product details product-item-details']")
+GYMBEAM_LINK = etree.XPath(f"(descendant::a[{has_class('product-item-link')}])[1]")
+GYMBEAM_PRICE = etree.XPath(f"(descendant::span[{has_class('price')}])[1]")
+
+
+def parse_gymbeam_listing(html) -> List[Dict]:
+    """Οι κάρτες της λίστας του GymBeam: όνομα, URL σελίδας προϊόντος και τιμή λίστας."""
+    products = []
+    for card in GYMBEAM_CARDS(parse_html(html)):
+        link = first(GYMBEAM_LINK(card))
+        if link is None or not link.get("href"):
+            continue
+        products.append({"name": text_of(link), "url": link.get("href"),
+                         "price": text_of(first(GYMBEAM_PRICE(card)))})
+    return products
+
+
+def find_variant_config(data) -> Optional[Dict]:
+    """Βρίσκει αναδρομικά το Magento spConfig (attributes + optionPrices) μέσα σε ένα JSON."""
+    if isinstance(data, dict):
+        if "attributes" in data and "optionPrices" in data:
+            return data
+        children = data.values()
+    elif isinstance(data, list):
+        children = data
+    else:
+        return None
+    for child in children:
+        config = find_variant_config(child)
+        if config:
+            return config
+    return None
+
+
+def parse_gymbeam_variants(html: str, size_label: str = "Γραμμάρια") -> List[Dict]:
+    """
+    Get variant prices for a GymBeam product from the configurable-product
+    JSON (spConfig) embedded in the page, without rendering it.
+    """
+    if "optionPrices" not in html:
+        return []
+
+    config = None
+    for match in re.finditer(r'<script[^>]*type="text/x-magento-init"[^>]*>(.*?)</script>', html, re.S):
+        try:
+            config = find_variant_config(json.loads(match.group(1)))
+        except ValueError:
+            continue
+        if config:
+            break
+    if not config:
+        return []
+
+    attributes = list(config.get("attributes", {}).values())
+    size_attribute = next((a for a in attributes if size_label in a.get("label", "")), None)
+    if size_attribute is None and len(attributes) == 1:
+        size_attribute = attributes[0]
+    if size_attribute is None:
+        return []
+
+    option_prices = config.get("optionPrices", {})
+    variants = []
+    for option in size_attribute.get("options", []):
+        # Κάθε μέγεθος μπορεί να αντιστοιχεί σε πολλά προϊόντα (π.χ. γεύσεις), κρατάμε τη χαμηλότερη τιμή
+        amounts = [option_prices[product_id]["finalPrice"]["amount"]
+                   for product_id in option.get("products", [])
+                   if product_id in option_prices]
+        if amounts:
+            variants.append({
+                "size": option.get("label", "").strip(),
+                "price": f"{min(amounts):.2f}"
+            })
+    return variants
+
+
+# Σελιδοποίηση -----------------------------------------------------------
+
+# Μόνο οι σύνδεσμοι που έχουν την παράμετρο, ώστε να μην αναλύεται κάθε σύνδεσμος του μενού
+PAGE_LINKS = etree.XPath("//a[contains(@href, $needle)]/@href")
+
+
+def page_numbers(html, base_url: str, param: str = "page") -> Set[int]:
+    """
+    Οι αριθμοί σελίδων που εμφανίζονται στους συνδέσμους σελιδοποίησης μιας σελίδας λίστας:
+    όσοι σύνδεσμοι δείχνουν στην ίδια σελίδα (ίδιο host και path) με την παράμετρο param.
+    """
+    base = urlparse(base_url)
+    numbers = set()
+    for href in PAGE_LINKS(parse_html(html), needle=f"{param}="):
+        link = urlparse(urljoin(base_url, href))
+        if link.netloc != base.netloc or link.path != base.path:
+            continue
+        for value in parse_qs(link.query).get(param, []):
+            if value.isdigit():
+                numbers.add(int(value))
+    return numbers
+
+
+# Στάδιο parsing σε ξεχωριστή διεργασία ----------------------------------
+
+# Τα πεδία των tuples του parse_page, με αυτή τη σειρά. Ένα tuple έχει όσα πρώτα πεδία
+# έχει το dict του parser (name και price, και url για τις κάρτες του GymBeam)
+PRODUCT_FIELDS = ("name", "price", "url")
+
+
+def parse_page(parse: Optional[Callable], html, base_url: str,
+               page_param: Optional[str] = None) -> Tuple[List[tuple], List[int], float]:
+    """
+    Όλο το parsing μιας σελίδας λίστας σε ένα βήμα, όπως τρέχει στις διεργασίες του
+    scraper.ParsePool: το HTML (UTF-8 bytes) γίνεται δέντρο μία φορά, ο parser του
+    καταστήματος βγάζει τα προϊόντα (κανένα με parse=None) και, με page_param, οι αριθμοί
+    σελίδων διαβάζονται από το ίδιο δέντρο. Τα προϊόντα γυρίζουν ως tuples (PRODUCT_FIELDS),
+    που περνάνε στο κύριο process πιο φθηνά από τα dicts.
+    Επιστρέφει (προϊόντα, σελίδες, δευτερόλεπτα parsing).
+    """
+    start = time.perf_counter()
+    root = parse_html(html)
+    products = [tuple(product[field] for field in PRODUCT_FIELDS if field in product)
+                for product in (parse(root) if parse is not None else [])]
+    pages = sorted(page_numbers(root, base_url, page_param)) if page_param else []
+    return products, pages, time.perf_counter() - start
+
+
+def product_dicts(rows: List[tuple]) -> List[Dict]:
+    """Τα tuples του parse_page πίσω στα dicts των parsers."""
+    return [dict(zip(PRODUCT_FIELDS, row)) for row in rows]
+
+
+# Οι workers του ParsePool ξεκινάνε από τον forkserver, που έχει φορτώσει μόνο αυτό το module
+PARSE_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+_launch_lock = threading.Lock()
+
+
+@contextmanager
+def detached_main():
+    """
+    Κρύβει το main module όσο ξεκινάει ένας worker: το multiprocessing ξανατρέχει το main
+    module σε κάθε νέα διεργασία, που για την εφαρμογή σημαίνει Kivy, UI και βάση σε κάθε
+    worker του parsing.
+    """
+    with _launch_lock:
+        main = sys.modules["__main__"]
+        sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            yield
+        finally:
+            sys.modules["__main__"] = main
+
+
+_PARSE_CONTEXT_BASE = type(multiprocessing.get_context(PARSE_START_METHOD))
+_PARSE_PROCESS_BASE = _PARSE_CONTEXT_BASE.Process
+
+
+class ParseProcess(_PARSE_PROCESS_BASE):
+    """Διεργασία του ParsePool που ξεκινάει χωρίς το main module της εφαρμογής."""
+
+    @staticmethod
+    def _Popen(process_obj):
+        with detached_main():
+            return _PARSE_PROCESS_BASE._Popen(process_obj)
+
+
+class ParseContext(_PARSE_CONTEXT_BASE):
+    """Το multiprocessing context των workers του parsing (βλ. scraper.ParsePool)."""
+    Process = ParseProcess
+
+
+def parse_context() -> ParseContext:
+    context = ParseContext()
+    if PARSE_START_METHOD == "forkserver":
+        context.set_forkserver_preload(["parsers"])
+    return context
+
+
+# Ο parser της σελίδας λίστας κάθε καταστήματος
+STORE_PARSERS = {
+    "Katerelos": parse_katerelos,
+    "Fitrace": parse_fitrace,
+    "Growling": parse_growling,
+    "Fit1": parse_fit1,
+    "GymBeam": parse_gymbeam_listing,
+}
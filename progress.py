@@ -0,0 +1,100 @@
+"""
+Πρόοδος ενός scraping run την ώρα που τρέχει, για το UI.
+
+Το ScrapeProgress είναι καταναλωτής του BulkWriter: κάθε παρτίδα καταχωρήσεων που
+γράφεται στη βάση περνάει από το add_listings, το οποίο μετράει τα προϊόντα ανά
+κατάστημα και κρατάει τα Top N ανά κατηγορία (και συνολικά) με βάση την τιμή ανά
+γραμμάριο. Τα διπλότυπα (ίδιο name_key) λύνονται όπως και στη βάση: μένει η χαμηλότερη
+τιμή. Κρατιούνται μόνο οι μετρητές και τα N καλύτερα κάθε κατηγορίας, οπότε η μνήμη
+μένει σταθερή όσο μεγάλος κι αν είναι ο κατάλογος.
+
+Τα Top N είναι προσωρινά: στο τέλος του run η κατάταξη από τη βάση (μετά το finish_run)
+είναι η τελική.
+"""
+import threading
+from typing import Dict, List, Optional
+
+from sidp02 import CATEGORIES, derive_product_columns, normalize_name
+
+# Το κλειδί της συνολικής κατάταξης (όλες οι κατηγορίες)
+ALL = None
+
+
+class ScrapeProgress:
+    def __init__(self, top_n: int = 10, categories: Optional[Dict[str, List[str]]] = None):
+        self.top_n = top_n
+        self.categories = categories or CATEGORIES
+        self.counts: Dict[str, int] = {}
+        self.status: Dict[str, str] = {}
+        # κατηγορία -> {name_key: προϊόν}, το πολύ top_n προϊόντα η καθεμία
+        self.top: Dict[Optional[str], Dict[str, Dict]] = {category: {} for category in (ALL, *self.categories)}
+        # Αυξάνεται σε κάθε αλλαγή, ώστε το UI να ξέρει πότε χρειάζεται ανανέωση
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def add_listings(self, listings: List[tuple]):
+        """Καταναλωτής του BulkWriter: γραμμές (store, name, price, source_url, ...) που μόλις γράφτηκαν."""
+        with self._lock:
+            for store, name, price, source_url, *_ in listings:
+                self.counts[store] = self.counts.get(store, 0) + 1
+                try:
+                    price, grams, price_per_gram, categories = derive_product_columns(name, price)
+                except (ValueError, TypeError):
+                    continue
+                if price_per_gram is None:
+                    continue
+                product = {
+                    "name": name,
+                    "price": price,
+                    "grams": grams,
+                    "price_per_gram": price_per_gram,
+                    "url": source_url,
+                    "categories": [category for category in categories if category in self.top],
+                    "stores": [store],
+                }
+                key = normalize_name(name)
+                for category in (ALL, *product["categories"]):
+                    self._offer(self.top[category], key, product)
+            self.version += 1
+
+    def _offer(self, top: Dict[str, Dict], key: str, product: Dict):
+        """
+        Βάζει το προϊόν στα Top N μιας κατηγορίας αν είναι ανάμεσα στα N φθηνότερα ανά γραμμάριο.
+        Η τιμή ενός κλειδιού μόνο πέφτει (μένει η χαμηλότερη), οπότε ένα προϊόν που βγήκε από
+        τα Top N δεν χρειάζεται να θυμόμαστε: αν ξαναφανεί φθηνότερο, θα μπει ξανά.
+        """
+        current = top.get(key)
+        if current is not None:
+            if product["price_per_gram"] < current["price_per_gram"]:
+                top[key] = product
+            elif product["price_per_gram"] == current["price_per_gram"] and product["stores"][0] not in current["stores"]:
+                top[key] = dict(current, stores=sorted(current["stores"] + product["stores"]))
+            return
+        if len(top) < self.top_n:
+            top[key] = product
+            return
+        worst = max(top, key=lambda k: top[k]["price_per_gram"])
+        if product["price_per_gram"] < top[worst]["price_per_gram"]:
+            del top[worst]
+            top[key] = product
+
+    def finish_store(self, store: str, result: Dict):
+        """Καλείται από το run_store_jobs όταν τελειώσει (ή λήξει) ένα κατάστημα."""
+        with self._lock:
+            self.status[store] = result["status"]
+            self.version += 1
+
+    def snapshot(self, category: Optional[str] = ALL) -> Dict:
+        """
+        Η τρέχουσα πρόοδος: version, counts (προϊόντα ανά κατάστημα), total, status
+        (καταστήματα που τελείωσαν) και top (τα Top N της κατηγορίας, φθηνότερο πρώτο).
+        """
+        with self._lock:
+            top = sorted(self.top.get(category, {}).values(), key=lambda product: product["price_per_gram"])
+            return {
+                "version": self.version,
+                "counts": dict(self.counts),
+                "total": sum(self.counts.values()),
+                "status": dict(self.status),
+                "top": top,
+            }
@@ -0,0 +1,89 @@
+"""
+Υπηρεσία ερωτημάτων για το UI: τα ερωτήματα στη βάση (και η επεξεργασία των
+αποτελεσμάτων τους) τρέχουν σε worker pool, ώστε το main thread του Kivy να μην
+παγώνει, και τα αποτελέσματα επιστρέφουν στο main thread μέσω του deliver
+(στην εφαρμογή, Clock.schedule_once).
+
+Κάθε αποτέλεσμα κρατιέται στη μνήμη με το κλειδί του (π.χ. ("view", "Isolate", ...)),
+οπότε ένα επαναλαμβανόμενο κλικ απαντιέται αμέσως. Τα κλειδιά περιέχουν το κείμενο της
+αναζήτησης και τη μέγιστη τιμή ανά γραμμάριο, που αλλάζουν σε κάθε πλήκτρο, γι' αυτό η cache
+κρατάει μόνο τα max_entries πιο πρόσφατα χρησιμοποιημένα αποτελέσματα (LRU). Όταν αλλάξουν τα δεδομένα (τέλος
+του scraping) το invalidate() αδειάζει την cache· αποτελέσματα ερωτημάτων που ξεκίνησαν
+πριν από αυτό παραδίδονται σε όσους τα περιμένουν αλλά δεν μπαίνουν στην cache.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class QueryService:
+    def __init__(self, deliver: Callable[[Callable[[], None]], None], max_workers: int = 2,
+                 max_entries: int = 32):
+        self.deliver = deliver
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+        self._cache: "OrderedDict[Hashable, Any]" = OrderedDict()
+        # (generation, key) -> callbacks που περιμένουν το ερώτημα που τρέχει
+        self._waiting: Dict[Tuple[int, Hashable], List[tuple]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, query: Callable[[], Any], on_result: Callable[[Any], None],
+            on_error: Optional[Callable[[Exception], None]] = None) -> bool:
+        """
+        Το αποτέλεσμα του query για το key. Αν υπάρχει στην cache, το on_result καλείται
+        αμέσως (στο thread του καλούντος) και επιστρέφει True. Αλλιώς το query τρέχει σε
+        worker (μία φορά, όσοι κι αν το ζητήσουν μέχρι να τελειώσει) και το on_result ή
+        το on_error καλείται αργότερα μέσω του deliver.
+        """
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                result, cached = self._cache[key], True
+            else:
+                cached = False
+                pending = (self._generation, key)
+                start = pending not in self._waiting
+                self._waiting.setdefault(pending, []).append((on_result, on_error))
+        if cached:
+            on_result(result)
+            return True
+        if start:
+            self._executor.submit(self._run, pending, query)
+        return False
+
+    def invalidate(self):
+        """Τα δεδομένα άλλαξαν: αδειάζει την cache και αγνοεί ό,τι ερωτήματα τρέχουν ήδη."""
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def cached(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._cache
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, pending: Tuple[int, Hashable], query: Callable[[], Any]):
+        try:
+            result, error = query(), None
+        except Exception as e:
+            result, error = None, e
+
+        generation, key = pending
+        with self._lock:
+            callbacks = self._waiting.pop(pending, [])
+            if error is None and generation == self._generation:
+                self._cache[key] = result
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+
+        for on_result, on_error in callbacks:
+            if error is None:
+                self.deliver(partial(on_result, result))
+            elif on_error is not None:
+                self.deliver(partial(on_error, error))
@@ -0,0 +1,106 @@
+"""
+Κατάταξη και φίλτρα της λίστας του UI πάνω σε στήλες NumPy.
+
+Τα προϊόντα (βλ. sidp02.product_rows) φορτώνονται μία φορά σε στήλες με τις τιμές που
+υπολογίστηκαν κατά την εισαγωγή (price, grams, price_per_gram), οπότε τίποτα δεν ξαναδιαβάζεται
+από τα ονόματα. Οι μάσκες όλων των κατηγοριών και όλων των καταστημάτων φτιάχνονται με ένα
+πέρασμα, και για κάθε ταξινόμηση η σειρά υπολογίζεται μία φορά ανά φόρτωμα. Κάθε συνδυασμός
+φίλτρων (π.χ. τα Top μιας κατηγορίας) είναι μετά μια πράξη μασκών και μια επιλογή πάνω στην
+έτοιμη σειρά, χωρίς ταξινόμηση.
+
+Φορτώνει το NumPy, οπότε εισάγεται μόνο όταν φορτώνονται τα προϊόντα (όχι στην εκκίνηση του UI).
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def float_column(products: List[Dict], field: str) -> np.ndarray:
+    """Ένα αριθμητικό πεδίο των προϊόντων ως πίνακας float (NaN όπου λείπει)."""
+    return np.fromiter((np.nan if product[field] is None else product[field] for product in products),
+                       dtype=np.float64, count=len(products))
+
+
+def membership_masks(products: List[Dict], field: str) -> Dict[str, np.ndarray]:
+    """Μια μάσκα ανά τιμή ενός πεδίου-λίστας (π.χ. categories), όλες με ένα πέρασμα."""
+    members: Dict[str, List[int]] = {}
+    for index, product in enumerate(products):
+        for value in product[field]:
+            members.setdefault(value, []).append(index)
+    masks = {}
+    for value, indices in members.items():
+        mask = np.zeros(len(products), dtype=bool)
+        mask[indices] = True
+        masks[value] = mask
+    return masks
+
+
+class ProductColumns:
+    """
+    Τα προϊόντα του UI σε στήλες, με μάσκες ανά κατηγορία και κατάστημα.
+
+    Η σειρά κάθε ταξινόμησης είναι ίδια με την ταξινόμηση γραμμή-γραμμή: σταθερή (ισοβαθμίες
+    με τη σειρά της λίστας) και με τα προϊόντα χωρίς τιμή στο πεδίο πάντα στο τέλος.
+    """
+
+    # Πεδία ταξινόμησης με αριθμητικές τιμές· το "name" ταξινομείται χωρίς διάκριση πεζών/κεφαλαίων
+    NUMERIC_FIELDS = ("price", "grams", "price_per_gram")
+
+    def __init__(self, products: List[Dict]):
+        self.products = products
+        self.ids = np.fromiter((product["id"] for product in products), dtype=np.int64, count=len(products))
+        self.columns = {field: float_column(products, field) for field in self.NUMERIC_FIELDS}
+        self.category_masks = membership_masks(products, "categories")
+        self.store_masks = membership_masks(products, "stores")
+        self._orders: Dict[tuple, np.ndarray] = {}
+
+    def __len__(self):
+        return len(self.products)
+
+    @property
+    def stores(self) -> List[str]:
+        return sorted(self.store_masks)
+
+    def sort_key(self, field: str) -> np.ndarray:
+        """Κλειδί ταξινόμησης (NaN για όσα δεν έχουν τιμή)."""
+        if field != "name":
+            return self.columns[field]
+        # Η θέση κάθε ονόματος στη λεξικογραφική σειρά των ονομάτων σε πεζά
+        names = [product["name"].lower() for product in self.products]
+        rank = {name: position for position, name in enumerate(sorted(set(names)))}
+        return np.fromiter((rank[name] for name in names), dtype=np.float64, count=len(names))
+
+    def order(self, field: str, descending: bool = False) -> np.ndarray:
+        """Οι θέσεις όλων των προϊόντων ταξινομημένες κατά field (υπολογίζεται μία φορά)."""
+        key = (field, descending)
+        if key not in self._orders:
+            values = self.sort_key(field)
+            present = np.flatnonzero(~np.isnan(values))
+            ranked = present[np.argsort(-values[present] if descending else values[present], kind="stable")]
+            self._orders[key] = np.concatenate([ranked, np.flatnonzero(np.isnan(values))])
+        return self._orders[key]
+
+    def mask(self, store: Optional[str] = None, category: Optional[str] = None,
+             max_price_per_gram: Optional[float] = None, ids: Optional[List[int]] = None) -> np.ndarray:
+        """Τα προϊόντα που ταιριάζουν σε κατάστημα, κατηγορία, μέγιστη τιμή ανά γραμμάριο και ids."""
+        empty = np.zeros(len(self.products), dtype=bool)
+        mask = np.ones(len(self.products), dtype=bool)
+        if store is not None:
+            mask &= self.store_masks.get(store, empty)
+        if category is not None:
+            mask &= self.category_masks.get(category, empty)
+        if max_price_per_gram is not None:
+            # Οι συγκρίσεις με NaN είναι False: όσα δεν έχουν βάρος δεν περνάνε το φίλτρο
+            with np.errstate(invalid="ignore"):
+                mask &= self.columns["price_per_gram"] <= max_price_per_gram
+        if ids is not None:
+            mask &= np.isin(self.ids, np.asarray(list(ids), dtype=np.int64))
+        return mask
+
+    def view(self, store: Optional[str] = None, category: Optional[str] = None,
+             max_price_per_gram: Optional[float] = None, field: str = "price_per_gram",
+             descending: bool = False, ids: Optional[List[int]] = None) -> List[Dict]:
+        """Τα προϊόντα που περνάνε τα φίλτρα, ταξινομημένα κατά field."""
+        order = self.order(field, descending)
+        selected = order[self.mask(store, category, max_price_per_gram, ids)[order]]
+        return [self.products[index] for index in selected.tolist()]
@@ -0,0 +1,1218 @@
+"""
+Η στοίβα του scraping: HTTP με cache (HttpFetcher, ResponseCache), parsing σε ξεχωριστές
+διεργασίες (ParsePool), pool από headless Chrome (DriverPool, PageWaiter) και ο WebScraper
+που διαβάζει τα καταστήματα του stores.py.
+
+Φορτώνει τα requests, Selenium, BeautifulSoup και lxml, οπότε εισάγεται μόνο όταν ξεκινάει
+ένα scraping run (βλ. sidp02.main). Τα προϊόντα γράφονται στη βάση μέσω του sidp02.
+"""
+from bs4 import BeautifulSoup
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
+import threading
+import os
+import queue
+import json
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import Select
+from selenium.common.exceptions import WebDriverException
+from time import sleep
+import time
+import random
+from email.utils import parsedate_to_datetime
+from typing import List, Dict, Optional, Callable, NamedTuple, Iterator, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future, wait, as_completed, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from itertools import islice
+from contextlib import contextmanager
+import sqlite3
+
+import sidp02
+from sidp02 import (IncompleteScrape, ScrapeCancelled, active_run_id, insert_data, listing_fingerprint,
+                    load_card_fingerprints, mark_listing_seen, record_listing_card)
+from parsers import parse_context, parse_gymbeam_variants, parse_page, product_dicts
+from stores import (STORES, Pagination, RenderProfile, StoreConfig, blocked_url_patterns, current_page, page_url,
+                    store_config)
+from metrics import RunMetrics, duration_stats
+
+
+class ResponseCache:
+    """
+    Persistent HTTP response cache stored in SQLite.
+
+    Bodies are kept together with their ETag/Last-Modified headers so that
+    stale entries can be revalidated with a conditional request. Entries
+    younger than ttl seconds are served without touching the network, and the
+    least recently used entries are evicted once the bodies exceed max_bytes.
+    The products and page numbers parsed from a body can be stored alongside
+    it, so an unchanged page does not have to be parsed again.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 600, max_bytes: int = 100 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path or sidp02.cache_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                parsed TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        body, etag, last_modified, fetched_at = row
+        return {"body": body, "etag": etag, "last_modified": last_modified, "fetched_at": fetched_at}
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def validators(self, entry: Dict) -> Dict[str, str]:
+        """Conditional request headers for a cached entry"""
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]):
+        """Store a new body; any products parsed from the previous body are dropped"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO responses (url, body, etag, last_modified, fetched_at, accessed_at, size, parsed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, NULL)
+            """, (url, body, etag, last_modified, now, now, len(body)))
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, url: str):
+        """Mark a cached entry as revalidated (304 Not Modified)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            self._conn.commit()
+
+    def get_parsed(self, url: str) -> Optional[Tuple[List[Dict], List[int]]]:
+        """The products and page numbers stored for the cached body, if any"""
+        with self._lock:
+            row = self._conn.execute("SELECT parsed FROM responses WHERE url = ?", (url,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        parsed = json.loads(row[0])
+        # Παλιές εγγραφές κρατούσαν μόνο τη λίστα των προϊόντων, χωρίς τις σελίδες
+        if not isinstance(parsed, dict):
+            return None
+        return parsed["products"], parsed["pages"]
+
+    def put_parsed(self, url: str, products: List[Dict], pages: List[int] = ()):
+        with self._lock:
+            self._conn.execute("UPDATE responses SET parsed = ? WHERE url = ?",
+                               (json.dumps({"products": products, "pages": list(pages)}, ensure_ascii=False), url))
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class FetchResult(NamedTuple):
+    text: str
+    # True όταν το σώμα είναι ίδιο με αυτό που είχαμε ήδη στην cache (304 ή φρέσκια εγγραφή)
+    not_modified: bool = False
+    # Γιατί χάθηκε η σελίδα (τότε το text είναι κενό)· None όταν το fetch πέτυχε
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# Απαντήσεις που σημαίνουν ότι ο server είναι προσωρινά απασχολημένος και αξίζει νέα προσπάθεια
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Το Retry-After μιας απάντησης σε δευτερόλεπτα (δίνεται ως αριθμός ή ως ημερομηνία HTTP)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Per-host rate limiter: rate requests per second on average, with bursts of up to burst
+    requests. pause() stops the host for a while (e.g. after a 429 with Retry-After).
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        """Wait for a token; False if it would not be available before deadline (time.monotonic)"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now > self._updated:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                delay = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            if deadline is not None and now + delay > deadline:
+                return False
+            sleep(delay)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            # Μετά την παύση ξεκινάμε χωρίς αποθηκευμένα tokens, όχι με burst
+            self._tokens = 0
+            self._updated = self._paused_until
+
+
+class CircuitBreaker:
+    """
+    Stops requests to a host after failure_threshold consecutive failed fetches.
+    After reset_timeout seconds a single trial request is let through: success closes
+    the circuit again, failure keeps it open for another reset_timeout.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> bool:
+        """Record a failed fetch; True if this failure opened the circuit"""
+        with self._lock:
+            self.failures += 1
+            was_open = self.opened_at is not None and not self._trial
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+            return self.opened_at is not None and not was_open
+
+
+class HttpFetcher:
+    """
+    Pooled HTTP client with an optional response cache and a parallel batch API.
+
+    Requests are scheduled politely per host: at most per_host_limit in flight and
+    rate_per_host per second (token bucket). Failed requests (connection errors,
+    timeouts, 429 and 5xx) are retried up to retries times with jittered exponential
+    backoff, honouring Retry-After. Each fetch, retries included, has to finish within
+    request_budget seconds. After breaker_threshold consecutive failed fetches a host's
+    circuit opens and its URLs fail fast for breaker_reset seconds.
+    """
+
+    def __init__(self, max_workers: int = 16, per_host_limit: int = 8,
+                 connect_timeout: float = 5, read_timeout: float = 30,
+                 cache: Optional[ResponseCache] = None, metrics: Optional[RunMetrics] = None,
+                 rate_per_host: Optional[float] = 20, burst: Optional[float] = None,
+                 retries: int = 3, backoff: float = 0.5, max_backoff: float = 10,
+                 request_budget: float = 60, breaker_threshold: int = 5, breaker_reset: float = 30):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = (connect_timeout, read_timeout)
+        self.cache = cache
+        self.metrics = metrics or RunMetrics()
+        self.rate_per_host = rate_per_host
+        self.burst = burst if burst is not None else per_host_limit
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.request_budget = request_budget
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+
+        # Ένα Session κρατάει τις συνδέσεις ανοιχτές (keep-alive) ανάμεσα στα requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """Return the semaphore that caps concurrent requests to the URL's host"""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    def _bucket(self, host: str) -> Optional[TokenBucket]:
+        if self.rate_per_host is None:
+            return None
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+            return self._buckets[host]
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+            return self._breakers[host]
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number attempt (0-based)"""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _get(self, url: str, headers: Dict[str, str], store: str, deadline: float) -> Tuple[requests.Response, bytes]:
+        """One rate-limited GET whose connect, read and body download all end by deadline"""
+        bucket = self._bucket(urlparse(url).netloc)
+        if bucket is not None and not bucket.acquire(deadline):
+            raise requests.Timeout("rate limit wait exceeds the request budget")
+        with self._host_slot(url):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise requests.Timeout("request budget exhausted")
+            with self.metrics.timer(store, "fetch", url):
+                response = self.session.get(url, headers=headers, stream=True,
+                                            timeout=(min(self.timeout[0], remaining), min(self.timeout[1], remaining)))
+                try:
+                    # Το read timeout ισχύει ανά read· ένας server που στέλνει σταγόνα-σταγόνα
+                    # σταματάει εδώ. Το read1 (urllib3 2.x) επιστρέφει ό,τι έφτασε με ένα read,
+                    # χωρίς να περιμένει να γεμίσει το chunk· το urllib3 1.x έχει μόνο το read
+                    read = getattr(response.raw, "read1", None) or response.raw.read
+                    chunks = []
+                    while True:
+                        chunk = read(64 * 1024, decode_content=True)
+                        if not chunk:
+                            break
+                        chunks.append(chunk)
+                        if time.monotonic() > deadline:
+                            raise requests.Timeout("request budget exhausted while reading the body")
+                except urllib3.exceptions.HTTPError as e:
+                    raise requests.ConnectionError(e)
+                finally:
+                    response.close()
+        return response, b"".join(chunks)
+
+    def decode(self, body: bytes, encoding: Optional[str]) -> str:
+        """The body as text in the response's encoding (UTF-8 if it has none or an unknown one)"""
+        try:
+            return body.decode(encoding or "utf-8", errors="replace")
+        except LookupError:
+            return body.decode("utf-8", errors="replace")
+
+    def fetch_result(self, url: str, store: Optional[str] = None) -> FetchResult:
+        """
+        Fetch a single URL, revalidating any cached copy. A failed fetch (retries used up,
+        open circuit, error status) returns a result with no text and the error set.
+        Time, requests and bytes are recorded under store (default: the URL's host).
+        """
+        host = urlparse(url).netloc
+        store = store or host
+        entry = self.cache.get(url) if self.cache else None
+        if entry and self.cache.is_fresh(entry):
+            self.metrics.count(store, "cache_hits")
+            return FetchResult(entry["body"], not_modified=True)
+
+        breaker = self.breaker(host)
+        if not breaker.allow():
+            self.metrics.count(store, "circuit_open")
+            print(f"Circuit open for {host}, skipping {url}")
+            return FetchResult("", error=f"circuit open for {host}")
+
+        headers = self.cache.validators(entry) if entry else {}
+        deadline = time.monotonic() + self.request_budget
+        # Κάθε έξοδος (και μια απρόσμενη εξαίρεση, π.χ. από την cache) καταγράφεται στο circuit,
+        # ώστε ένα δοκιμαστικό request να μην το αφήνει μισάνοιχτο για το υπόλοιπο run
+        host_ok = False
+        try:
+            for attempt in range(self.retries + 1):
+                retry_after = None
+                try:
+                    response, body = self._get(url, headers, store, deadline)
+                except requests.RequestException as e:
+                    error = str(e)
+                else:
+                    self.metrics.count(store, "requests")
+                    self.metrics.count(store, "bytes", len(body))
+                    if response.status_code == 304 and entry:
+                        host_ok = True
+                        self.metrics.count(store, "not_modified")
+                        self.cache.touch(url)
+                        return FetchResult(entry["body"], not_modified=True)
+                    if response.status_code == 200:
+                        host_ok = True
+                        text = self.decode(body, response.encoding)
+                        if self.cache:
+                            self.cache.store(url, text, response.headers.get("ETag"),
+                                             response.headers.get("Last-Modified"))
+                        return FetchResult(text)
+                    if response.status_code not in RETRY_STATUSES:
+                        # Π.χ. 404: ο server απαντάει κανονικά, απλώς η σελίδα δεν υπάρχει
+                        host_ok = True
+                        self.metrics.count(store, "errors")
+                        print(f"Error: {response.status_code} ({url})")
+                        return FetchResult("", error=f"HTTP {response.status_code}")
+                    error = f"HTTP {response.status_code}"
+                    retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+                    if response.status_code in (429, 503):
+                        self.metrics.count(store, "throttled")
+                        # Ο server ζήτησε να κάνουμε πίσω: σταματάει όλος ο host, όχι μόνο αυτό το URL
+                        if retry_after and self._bucket(host) is not None:
+                            self._bucket(host).pause(min(retry_after, self.max_backoff))
+
+                delay = max(retry_after or 0, self.backoff_delay(attempt))
+                # Αν στο μεταξύ άνοιξε το circuit του host (από άλλα URLs), δεν επιμένουμε
+                if attempt == self.retries or time.monotonic() + delay >= deadline or breaker.is_open:
+                    break
+                self.metrics.count(store, "retries")
+                sleep(delay)
+
+            self.metrics.count(store, "errors")
+            print(f"Error fetching URL {url}: {error} (μετά από {attempt + 1} προσπάθειες)")
+            return FetchResult("", error=f"{error} after {attempt + 1} attempts")
+        finally:
+            if host_ok:
+                breaker.record_success()
+            elif breaker.record_failure():
+                print(f"Circuit opened for {host}: {self.breaker_threshold} αποτυχίες στη σειρά, "
+                      f"παύση {self.breaker_reset:.0f}s")
+
+    def fetch(self, url: str, store: Optional[str] = None) -> Optional[str]:
+        """Fetch a single URL and return the body, or None on failure"""
+        result = self.fetch_result(url, store)
+        return result.text if result.ok else None
+
+    def fetch_many_results(self, urls: List[str], store: Optional[str] = None) -> List[FetchResult]:
+        """Fetch all URLs in parallel and return the results in the same order"""
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            return list(executor.map(partial(self.fetch_result, store=store), urls))
+
+    def fetch_many(self, urls: List[str], store: Optional[str] = None) -> List[Optional[str]]:
+        """Fetch all URLs in parallel and return the bodies in the same order"""
+        return [result.text if result.ok else None for result in self.fetch_many_results(urls, store)]
+
+    def iter_results(self, urls: List[str], store: Optional[str] = None,
+                     window: Optional[int] = None) -> Iterator[Tuple[str, FetchResult]]:
+        """
+        Fetch URLs in parallel and yield (url, result) as each one completes.
+        At most window responses (default 2 * max_workers) are in flight or waiting
+        to be consumed, so memory does not grow with the number of URLs.
+        """
+        if not urls:
+            return
+        window = window or 2 * self.max_workers
+        remaining = iter(urls)
+        pending = {}
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls)))
+        try:
+            while True:
+                for url in islice(remaining, window - len(pending)):
+                    pending[executor.submit(self.fetch_result, url, store)] = url
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        finally:
+            # Αν ο καταναλωτής σταματήσει νωρίτερα, όσα URLs δεν έχουν ξεκινήσει δεν κατεβαίνουν
+            executor.shutdown(cancel_futures=True)
+
+    def close(self):
+        self.session.close()
+        if self.cache:
+            self.cache.close()
+
+
+class ParsePool:
+    """
+    Parses listing pages in worker processes (see parsers.parse_page).
+
+    Parsing is CPU-bound and holds the GIL, so on the fetch threads it runs one page
+    at a time and holds up the downloads. Pages are sent to the workers as UTF-8 bytes
+    and come back as compact product tuples, so parsing scales with the cores while
+    the threads keep fetching. The workers (default: one per core, at most
+    max_default_workers) start with the first page and load only parsers.py, never the
+    app's main module (see parsers.parse_context); with workers=0 pages are parsed in
+    the calling thread. If a worker dies, its pages are parsed in the calling thread
+    and the next pages go to a new pool.
+    """
+
+    # Ένα run έχει λίγες δεκάδες σελίδες λίστας: περισσότεροι workers κοστίζουν εκκίνηση και μνήμη
+    max_default_workers = 4
+
+    def __init__(self, workers: Optional[int] = None, metrics: Optional[RunMetrics] = None):
+        self.workers = min(self.max_default_workers, os.cpu_count() or 1) if workers is None else workers
+        self.metrics = metrics
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[Future, tuple] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def max_pending(self) -> int:
+        """How many pages a caller should keep waiting for a parse at most"""
+        return 2 * max(self.workers, 1)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Οι workers δεν κληρονομούν τα threads, τα sockets και τους browsers του scraper
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=parse_context())
+            return self._executor
+
+    def _reset(self, executor: ProcessPoolExecutor):
+        """Drop a broken pool; the next page starts a new one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, parse: Optional[Callable], html: str, url: str, page_param: Optional[str] = None) -> Future:
+        """Start parsing a page (parse=None only reads the page numbers); read it with result()"""
+        job = (parse, html.encode("utf-8"), url, page_param)
+        if self.workers > 0:
+            executor = self._pool()
+            try:
+                future = executor.submit(parse_page, *job)
+                self._jobs[future] = (executor, job)
+                return future
+            except BrokenProcessPool:
+                self._reset(executor)
+        future = Future()
+        future.set_result(parse_page(*job))
+        return future
+
+    def result(self, future: Future, store: str, url: str) -> Tuple[List[Dict], List[int]]:
+        """Wait for a submitted page and return its products and the page numbers in its links"""
+        executor, job = self._jobs.pop(future, (None, None))
+        try:
+            products, pages, elapsed = future.result()
+        except BrokenProcessPool:
+            self._reset(executor)
+            products, pages, elapsed = parse_page(*job)
+        if self.metrics is not None:
+            self.metrics.record(store, "parse", elapsed, url)
+        return product_dicts(products), pages
+
+    def parse(self, parse: Callable, html: str, store: str, url: str,
+              page_param: Optional[str] = None) -> Tuple[List[Dict], List[int]]:
+        """Parse one page and wait for it"""
+        return self.result(self.submit(parse, html, url, page_param), store, url)
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+class DriverPool:
+    """
+    Bounded pool of warm headless Chrome drivers with lease/return semantics.
+
+    Drivers are started lazily, so runs that only use HTTP never launch Chrome.
+    Each lease is expected to render one page; a driver is recycled after
+    max_pages leases, and discarded immediately if it fails its health check
+    or crashes while leased. After close() no new leases are handed out and
+    drivers still leased are quit when they are returned.
+    """
+
+    def __init__(self, options: Options, size: int = 4, max_pages: int = 50, page_load_timeout: float = 30):
+        self.options = options
+        self.size = size
+        self.max_pages = max_pages
+        self.page_load_timeout = page_load_timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._pages: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @contextmanager
+    def lease(self):
+        """Lease a driver for the duration of a with-block and return it afterwards"""
+        self._slots.acquire()
+        driver = None
+        try:
+            if self._closed:
+                raise RuntimeError("DriverPool is closed")
+            driver = self._acquire()
+            yield driver
+        except WebDriverException:
+            self._discard(driver)
+            driver = None
+            raise
+        finally:
+            if driver is not None:
+                self._release(driver)
+            self._slots.release()
+
+    def _acquire(self) -> webdriver.Chrome:
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = webdriver.Chrome(options=self.options)
+                # Χωρίς όριο το driver.get μιας σελίδας που δεν τελειώνει περιμένει 300s
+                driver.set_page_load_timeout(self.page_load_timeout)
+                with self._lock:
+                    self._pages[id(driver)] = 0
+                return driver
+            if self._is_healthy(driver):
+                return driver
+            self._discard(driver)
+
+    def _release(self, driver: webdriver.Chrome):
+        with self._lock:
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+            worn_out = self._pages[id(driver)] >= self.max_pages
+        if not worn_out and self._is_healthy(driver):
+            # Ο έλεγχος και το put γίνονται μαζί, ώστε το close να μην αφήσει driver στο _idle
+            with self._lock:
+                if not self._closed:
+                    self._idle.put(driver)
+                    return
+        self._discard(driver)
+
+    def _is_healthy(self, driver: webdriver.Chrome) -> bool:
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver: Optional[webdriver.Chrome]):
+        if driver is None:
+            return
+        with self._lock:
+            self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        """Quit every idle driver; leased drivers are quit when they are returned"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+# Μετράει τα ενεργά XHR/fetch requests της σελίδας και επιστρέφει την τρέχουσα κατάσταση του DOM
+PAGE_STATE_SCRIPT = """
+if (window.__pendingRequests === undefined) {
+    window.__pendingRequests = 0;
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        window.__pendingRequests++;
+        this.addEventListener('loadend', function() { window.__pendingRequests--; });
+        return send.apply(this, arguments);
+    };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function() {
+            window.__pendingRequests++;
+            return originalFetch.apply(this, arguments).finally(function() { window.__pendingRequests--; });
+        };
+    }
+}
+return [document.querySelectorAll(arguments[0]).length, document.body.scrollHeight, window.__pendingRequests];
+"""
+
+
+# Bytes που μετέφερε ο browser για τη σελίδα και τους πόρους της, και πλήθος πόρων
+# (Resource Timing· το transferSize είναι 0 για πόρους από την cache του browser)
+PAGE_TRANSFER_SCRIPT = """
+var entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+var bytes = 0;
+for (var i = 0; i < entries.length; i++) { bytes += entries[i].transferSize || 0; }
+return [bytes, entries.length];
+"""
+
+
+class PageWaiter:
+    """
+    Waits for a rendered page to settle instead of sleeping for a fixed time.
+
+    The page counts as settled when the number of product nodes and the page
+    height have not changed for a short quiescence window and there are no
+    XHR/fetch requests in flight. Every wait is recorded per store so the
+    timeouts can be tuned.
+    """
+
+    def __init__(self, quiescence: float = 0.75, timeout: float = 15, poll: float = 0.1,
+                 metrics: Optional[RunMetrics] = None):
+        self.quiescence = quiescence
+        self.timeout = timeout
+        self.poll = poll
+        self.metrics = metrics
+        self.stats: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def page_state(self, driver: webdriver.Chrome, selector: str) -> tuple:
+        return tuple(driver.execute_script(PAGE_STATE_SCRIPT, selector))
+
+    def wait_until_stable(self, driver: webdriver.Chrome, selector: str, store: str,
+                          quiescence: Optional[float] = None, timeout: Optional[float] = None,
+                          cancelled: Optional[threading.Event] = None) -> int:
+        """
+        Block until the page stops changing and return the number of nodes matching selector.
+        Returns early once cancelled is set; the caller decides whether to stop.
+        """
+        quiescence = self.quiescence if quiescence is None else quiescence
+        timeout = self.timeout if timeout is None else timeout
+
+        start = last_change = time.monotonic()
+        state = self.page_state(driver, selector)
+        while True:
+            sleep(self.poll)
+            now = time.monotonic()
+            new_state = self.page_state(driver, selector)
+            if new_state != state:
+                state, last_change = new_state, now
+            elif now - last_change >= quiescence and state[2] <= 0:
+                break
+            if now - start >= timeout or (cancelled is not None and cancelled.is_set()):
+                break
+
+        self.record(store, time.monotonic() - start)
+        return state[0]
+
+    def record(self, store: str, elapsed: float):
+        with self._lock:
+            self.stats.setdefault(store, []).append(elapsed)
+        if self.metrics is not None:
+            self.metrics.record(store, "wait", elapsed)
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-store wait statistics (count, total, mean, p95 and max in seconds)"""
+        with self._lock:
+            return {store: duration_stats(waits) for store, waits in self.stats.items()}
+
+    def print_summary(self):
+        for store, stats in self.summary().items():
+            print(f"Αναμονές {store:<10} {stats['count']:>4} φορές, σύνολο {stats['total']:.1f}s, "
+                  f"μέσος όρος {stats['mean']:.2f}s, p95 {stats['p95']:.2f}s, max {stats['max']:.2f}s")
+
+
+class WebScraper:
+    def __init__(self, driver_pool_size: int = 4, use_cache: bool = True, incremental: bool = False,
+                 parse_workers: Optional[int] = None):
+        self.incremental = incremental
+        self.metrics = RunMetrics()
+        self.setup_selenium_options()
+        self.fetcher = HttpFetcher(cache=ResponseCache() if use_cache else None, metrics=self.metrics)
+        self.parse_pool = ParsePool(parse_workers, metrics=self.metrics)
+        self.driver_pool = DriverPool(self.options, size=driver_pool_size)
+        self.waiter = PageWaiter(metrics=self.metrics)
+
+    def close(self):
+        """Release the browsers, parse workers and HTTP connections held by the scraper"""
+        self.driver_pool.close()
+        self.parse_pool.close()
+        self.fetcher.close()
+        
+    def setup_selenium_options(self) -> Options:
+        """Initialize Chrome options for Selenium"""
+        self.options = Options()
+        self.options.add_argument('--headless')
+        self.options.add_argument('--ignore-certificate-errors')
+        self.options.add_argument('--disable-gpu')
+        # Το driver.get επιστρέφει με το DOMContentLoaded· όσα προφίλ θέλουν και το load το
+        # περιμένουν στο load_page, οπότε ένας driver του pool εξυπηρετεί κάθε προφίλ
+        self.options.page_load_strategy = 'eager'
+        return self.options
+
+    def apply_profile(self, driver: webdriver.Chrome, profile: RenderProfile):
+        """Block the resource types and domains of a render profile on a leased driver (Chrome DevTools Protocol)"""
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns(profile)})
+
+    def load_page(self, driver: webdriver.Chrome, url: str, profile: RenderProfile, timeout: float = 30):
+        """Navigate to url with the blocking and page-load strategy of the profile"""
+        self.apply_profile(driver, profile)
+        driver.get(url)
+        if profile.page_load == "normal":
+            WebDriverWait(driver, timeout).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+        # Ώστε το Resource Timing να κρατήσει όλους τους πόρους και όχι μόνο τους πρώτους 250
+        driver.execute_script("performance.setResourceTimingBufferSize(100000);")
+
+    def page_transfer(self, driver: webdriver.Chrome) -> Tuple[int, int]:
+        """Bytes transferred and number of resources loaded by the current page"""
+        try:
+            transferred, resources = driver.execute_script(PAGE_TRANSFER_SCRIPT)
+            return int(transferred), int(resources)
+        except WebDriverException:
+            return 0, 0
+
+    def get_soup(self, url: str) -> Optional[BeautifulSoup]:
+        """Get BeautifulSoup object from URL using the pooled fetcher"""
+        html = self.fetcher.fetch(url)
+        return BeautifulSoup(html, "lxml") if html is not None else None
+
+    def get_soups(self, urls: List[str]) -> List[Optional[BeautifulSoup]]:
+        """Fetch all URLs in parallel and return their soups in the same order"""
+        return [BeautifulSoup(html, "lxml") if html is not None else None
+                for html in self.fetcher.fetch_many(urls)]
+
+    def iter_http_pages(self, store: str, urls: List[str], parse: Callable[[str], List[Dict]],
+                        pagination: Optional[Pagination] = None,
+                        cancelled: Optional[threading.Event] = None) -> Iterator[Dict]:
+        """
+        Fetch all pages in parallel and yield the products parsed from each one (see parsers.py)
+        as soon as it has been parsed. Pages are parsed by the parse pool while the next ones
+        are still downloading; pages that the cache reports as unchanged reuse the products and
+        page numbers parsed last time without being parsed. With "pages" pagination, the page
+        count is read from the page links of every fetched page and all pages not fetched yet
+        are fetched together in the next batch. Raises ScrapeCancelled once cancelled is set.
+        """
+        cache = self.fetcher.cache
+        paginated = pagination is not None and pagination.kind == "pages"
+        page_param = pagination.param if paginated else None
+        # Οι σελίδες που έχουν ήδη ζητηθεί, ανά αρχική σελίδα (κατηγορία)
+        known = {url: {current_page(url, pagination.param)} if paginated else set() for url in urls}
+        # url -> η αρχική σελίδα στην οποία ανήκει
+        batch = {url: url for url in urls}
+
+        while batch:
+            next_batch = {}
+            # future του parse pool -> url
+            parsing = {}
+
+            def add_pages(url: str, pages: List[int]):
+                if paginated:
+                    # Η μεγαλύτερη σελίδα στους συνδέσμους είναι το πλήθος των σελίδων, ακόμα κι αν
+                    # η σελιδοποίηση δείχνει μόνο τις γειτονικές και την τελευταία
+                    start_url = batch[url]
+                    new_pages = set(range(1, max(pages, default=0) + 1)) - known[start_url]
+                    known[start_url].update(new_pages)
+                    next_batch.update((page_url(start_url, pagination.param, number), start_url)
+                                      for number in sorted(new_pages))
+
+            def finish(future) -> Tuple[str, List[Dict]]:
+                url = parsing.pop(future)
+                page_products, pages = self.parse_pool.result(future, store, url)
+                print(f"Found {len(page_products)} products on {url}")
+                if cache:
+                    cache.put_parsed(url, page_products, pages)
+                add_pages(url, pages)
+                return url, page_products
+
+            for url, result in self.fetcher.iter_results(list(batch), store):
+                self.check_cancelled(store, cancelled)
+                if not result.ok:
+                    # Τα προϊόντα της σελίδας λείπουν από αυτό το run (βλ. scrape_store)
+                    self.metrics.count(store, "lost_pages")
+                    continue
+                parsed = cache.get_parsed(url) if cache and result.not_modified else None
+                if parsed is not None:
+                    page_products, pages = parsed
+                    print(f"Unchanged page, reusing {len(page_products)} products on {url}")
+                    add_pages(url, pages)
+                    for product in page_products:
+                        yield dict(product, url=url)
+                    continue
+
+                parsing[self.parse_pool.submit(parse, result.text, url, page_param)] = url
+
+                # Ό,τι έχει τελειώσει βγαίνει αμέσως· όταν περιμένουν πολλές σελίδες, η επόμενη
+                # απάντηση διαβάζεται αφού τελειώσει μία, ώστε να μη μαζεύεται HTML στη μνήμη
+                done = [future for future in parsing if future.done()]
+                if not done and len(parsing) >= self.parse_pool.max_pending:
+                    done, _ = wait(parsing, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page, page_products = finish(future)
+                    for product in page_products:
+                        yield dict(product, url=page)
+
+            for future in as_completed(list(parsing)):
+                page, page_products = finish(future)
+                for product in page_products:
+                    yield dict(product, url=page)
+            if next_batch:
+                print(f"{store}: {len(next_batch)} ακόμα σελίδες")
+            batch = next_batch
+
+    @staticmethod
+    def check_cancelled(store: str, cancelled: Optional[threading.Event]):
+        """Raise ScrapeCancelled if the store's job has been cancelled (see sidp02.run_store_jobs)"""
+        if cancelled is not None and cancelled.is_set():
+            raise ScrapeCancelled(f"Το scraping του {store} ακυρώθηκε")
+
+    def iter_store(self, config: StoreConfig, cancelled: Optional[threading.Event] = None) -> Iterator[Dict]:
+        """Yield the products of a store described by its registry entry (see stores.py) as they are scraped"""
+        if config.render == "http":
+            yield from self.iter_http_pages(config.name, config.urls, config.parse, config.pagination, cancelled)
+            return
+        if not config.urls:
+            return
+
+        # Κάθε αρχική σελίδα (κατηγορία) σε δικό της browser του pool· τα προϊόντα μιας
+        # σελίδας βγαίνουν μόλις τελειώσει το render της, χωρίς να περιμένουν τις άλλες
+        executor = ThreadPoolExecutor(max_workers=min(self.driver_pool.size, len(config.urls)))
+        try:
+            futures = {executor.submit(self.render_page, config, url, cancelled): url for url in config.urls}
+            for future in as_completed(futures):
+                yield from self.iter_rendered_page(config, futures[future], future.result(), cancelled)
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def stream_store(self, config: StoreConfig, products: Optional[Iterator[Dict]] = None,
+                     cancelled: Optional[threading.Event] = None) -> Iterator[Dict]:
+        """
+        Write every product of the store (default: iter_store) to the database as it arrives and pass it on.
+        The rows belong to the run that is writing when the stream starts and are dropped once it has closed.
+        """
+        run_id = active_run_id()
+        for product in self.iter_store(config, cancelled) if products is None else products:
+            self.check_cancelled(config.name, cancelled)
+            insert_data(product["name"], product["price"], product["url"], config.name, run_id=run_id)
+            yield product
+
+    def scrape_store(self, config: StoreConfig, cancelled: Optional[threading.Event] = None) -> int:
+        """
+        Scrape a store described by its registry entry and return the number of products.
+        The products go to the database as they arrive and are not kept in memory.
+        Raises IncompleteScrape if any page of the store could not be read, so that
+        the listings missing from this run are not taken as removed, and ScrapeCancelled
+        once cancelled is set.
+        """
+        lost = self.metrics.value(config.name, "lost_pages")
+        found = sum(1 for _ in self.stream_store(config, cancelled=cancelled))
+        lost = self.metrics.value(config.name, "lost_pages") - lost
+        if lost:
+            raise IncompleteScrape(config.name, found, int(lost))
+        return found
+
+    def render_page(self, config: StoreConfig, url: str, cancelled: Optional[threading.Event] = None) -> str:
+        """
+        Load a listing page in a pooled browser, follow its pagination and return the final HTML.
+        Raises ScrapeCancelled once cancelled is set.
+        """
+        pagination = config.pagination
+        self.check_cancelled(config.name, cancelled)
+        with self.driver_pool.lease() as driver:
+            self.check_cancelled(config.name, cancelled)
+            print(f"\nProcessing {config.name} URL: {url}")
+            self.metrics.count(config.name, "renders")
+            start = time.perf_counter()
+            with self.metrics.timer(config.name, "render", url):
+                self.load_page(driver, url, config.profile)
+                if pagination.kind == "infinite_scroll":
+                    self.scroll_to_bottom(driver, config.product_selector, config.name, done=pagination.done,
+                                          cancelled=cancelled)
+                elif pagination.kind == "load_more":
+                    self.click_load_more(driver, config.product_selector, config.name, pagination.button,
+                                         cancelled)
+                else:
+                    self.waiter.wait_until_stable(driver, config.product_selector, config.name, cancelled=cancelled)
+                    self.check_cancelled(config.name, cancelled)
+            elapsed = time.perf_counter() - start
+            transferred, resources = self.page_transfer(driver)
+            self.metrics.count(config.name, "render_bytes", transferred)
+            print(f"Rendered {url}: {transferred / 1024:.0f} KB, {resources} πόροι, {elapsed:.1f}s")
+            return driver.page_source
+
+    def iter_rendered_page(self, config: StoreConfig, url: str, page_source: Optional[str] = None,
+                           cancelled: Optional[threading.Event] = None) -> Iterator[Dict]:
+        """Yield the products of one browser-rendered listing page (rendered here unless page_source is given)"""
+        if page_source is None:
+            page_source = self.render_page(config, url, cancelled)
+        cards, _ = self.parse_pool.parse(config.parse, page_source, config.name, url)
+        if config.variants is not None:
+            yield from self.iter_product_pages(config, cards, cancelled)
+            return
+
+        print(f"Found {len(cards)} products on {url}")
+        for card in cards:
+            yield dict(card, url=url)
+
+    def scrape_rendered_page(self, config: StoreConfig, url: str) -> List[Dict]:
+        """Scrape one browser-rendered listing page of a store"""
+        return list(self.stream_store(config, self.iter_rendered_page(config, url)))
+
+    def iter_product_pages(self, config: StoreConfig, cards: List[Dict],
+                           cancelled: Optional[threading.Event] = None) -> Iterator[Dict]:
+        """
+        Yield the variants (size and price) of every listed product, read from its own page
+        as soon as the page arrives. In incremental mode only products whose listing card
+        is new or changed are visited. Raises ScrapeCancelled once cancelled is set.
+        """
+        store = config.name
+        listing = [(card["name"], card["url"], listing_fingerprint(card["name"], card["price"], card["url"]))
+                   for card in cards]
+
+        # Σε incremental mode ξαναεπισκεπτόμαστε μόνο τα προϊόντα που είναι νέα ή άλλαξαν στη λίστα
+        known = load_card_fingerprints(store) if self.incremental else {}
+        changed = {product_url: (product_name, fingerprint)
+                   for product_name, product_url, fingerprint in listing if known.get(product_url) != fingerprint}
+        for _, product_url, fingerprint in listing:
+            if known.get(product_url) == fingerprint:
+                mark_listing_seen(store, product_url)
+        if known:
+            print(f"{store}: {len(changed)}/{len(listing)} προϊόντα είναι νέα ή άλλαξαν")
+
+        # Οι σελίδες προϊόντων κατεβαίνουν παράλληλα με απλό HTTP και οι τιμές όλων των
+        # μεγεθών διαβάζονται από τα δεδομένα κάθε σελίδας μόλις φτάσει
+        found = 0
+        fallback_urls = []
+        # Σελίδες προϊόντων που δεν κατέβηκαν: χάνονται αν δεν τις σώσει ούτε ο browser
+        failed = set()
+        for product_url, result in self.fetcher.iter_results(list(changed), store):
+            self.check_cancelled(store, cancelled)
+            with self.metrics.timer(store, "variants", product_url):
+                variants = config.variants(result.text) if result.ok else []
+            if not result.ok:
+                failed.add(product_url)
+            if not variants:
+                fallback_urls.append(product_url)
+                continue
+            for product in self.variant_products(store, product_url, *changed[product_url], variants):
+                found += 1
+                yield product
+
+        # Ο browser χρησιμοποιείται μόνο όταν λείπουν τα δεδομένα από το HTML,
+        # μοιρασμένος σε όλους τους browsers του pool
+        if fallback_urls and config.variants_fallback:
+            print(f"{store}: {len(fallback_urls)}/{len(changed)} προϊόντα χρειάστηκαν Selenium")
+            fallback = partial(getattr(self, config.variants_fallback), cancelled=cancelled)
+            executor = ThreadPoolExecutor(max_workers=self.driver_pool.size)
+            try:
+                for product_url, variants in zip(fallback_urls, executor.map(fallback, fallback_urls)):
+                    self.check_cancelled(store, cancelled)
+                    if variants:
+                        failed.discard(product_url)
+                    for product in self.variant_products(store, product_url, *changed[product_url], variants):
+                        found += 1
+                        yield product
+            finally:
+                executor.shutdown(cancel_futures=True)
+        if failed:
+            self.metrics.count(store, "lost_pages", len(failed))
+
+        print(f"Found {found} products on {store}")
+
+    def variant_products(self, store: str, product_url: str, product_name: str, fingerprint: str,
+                         variants: List[Dict]) -> Iterator[Dict]:
+        """Yield one product per variant; the listing card is recorded once all of them have been consumed"""
+        for variant in variants:
+            yield {
+                "name": f"{product_name} - {variant['size']}",
+                "price": variant['price'],
+                "url": product_url
+            }
+        if variants:
+            record_listing_card(store, product_url, fingerprint)
+
+    def scrape_katerelos(self, urls: List[str]) -> List[Dict]:
+        """Scrape products from Katerelos website"""
+        return list(self.stream_store(store_config("Katerelos", urls)))
+
+    def scrape_fitrace(self, urls: List[str]) -> List[Dict]:
+        """Scrape products from Fitrace website"""
+        return list(self.stream_store(store_config("Fitrace", urls)))
+
+    def scrape_growling(self, url: str) -> List[Dict]:
+        """Scrape products from Growling website"""
+        return list(self.stream_store(store_config("Growling", [url])))
+
+    def scrape_fit1(self, urls: List[str]) -> List[Dict]:
+        """Scrape products from Fit1 website, one category per pooled browser"""
+        return list(self.stream_store(store_config("Fit1", urls)))
+
+    def scrape_fit1_page(self, url: str) -> List[Dict]:
+        """Scrape a single Fit1 category page"""
+        return self.scrape_rendered_page(STORES["Fit1"], url)
+
+    def scrape_gymbeam(self, base_url: str) -> List[Dict]:
+        """Scrape products from GymBeam website, including size and price from dropdown"""
+        return list(self.stream_store(store_config("GymBeam", [base_url])))
+
+    def parse_gymbeam_variants(self, html: str, size_label: str = "Γραμμάρια") -> List[Dict]:
+        """Get variant prices for a GymBeam product from the spConfig embedded in the page"""
+        return parse_gymbeam_variants(html, size_label)
+
+    def get_gymbeam_variants_pooled(self, product_url: str,
+                                    cancelled: Optional[threading.Event] = None) -> List[Dict]:
+        """Run the Selenium variant fallback on a driver leased from the pool"""
+        try:
+            self.check_cancelled("GymBeam", cancelled)
+            with self.driver_pool.lease() as driver, self.metrics.timer("GymBeam", "variants", product_url):
+                self.metrics.count("GymBeam", "renders")
+                self.apply_profile(driver, STORES["GymBeam"].profile)
+                return self.get_gymbeam_variants(driver, product_url, cancelled)
+        except WebDriverException as e:
+            print(f"Error rendering {product_url}: {e}")
+            return []
+
+    def get_gymbeam_variants(self, driver: webdriver.Chrome, product_url: str,
+                             cancelled: Optional[threading.Event] = None) -> List[Dict]:
+        """
+        Get variant prices for GymBeam product by clicking through the dropdown (Selenium fallback).
+        Raises ScrapeCancelled once cancelled is set.
+        """
+        variants = []
+        try:
+            self.check_cancelled("GymBeam", cancelled)
+            driver.get(product_url)
+            dropdown = WebDriverWait(driver, 5).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, 'select[aria-label="Γραμμάρια (γρ)"]'))
+            )
+            select = Select(dropdown)
+            price_selector = 'span[data-test="hp-bestsellers-price"]'
+            # Also installs the XHR/fetch counter, so the waits below see the price request of each option
+            self.waiter.wait_until_stable(driver, price_selector, "GymBeam", cancelled=cancelled)
+
+            for option in select.options:
+                self.check_cancelled("GymBeam", cancelled)
+                select.select_by_visible_text(option.text)
+                # The price is updated in place: wait until the request it starts has finished
+                self.waiter.wait_until_stable(driver, price_selector, "GymBeam", quiescence=0.25, cancelled=cancelled)
+                self.check_cancelled("GymBeam", cancelled)
+                price_element = WebDriverWait(driver, 5).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, price_selector))
+                )
+                variants.append({
+                    "size": option.text,
+                    "price": price_element.text.strip()
+                })
+    
+        except WebDriverException as e:
+            print(f"Error reading variants of {product_url}: {e.__class__.__name__}")
+    
+        return variants
+
+
+    def click_load_more(self, driver: webdriver.Chrome, selector: str, store: str, button: str,
+                        cancelled: Optional[threading.Event] = None):
+        """
+        Click the "load more" button until it disappears or stops bringing new products.
+        Raises ScrapeCancelled once cancelled is set.
+        """
+        previous_count = self.waiter.wait_until_stable(driver, selector, store, cancelled=cancelled)
+        while True:
+            self.check_cancelled(store, cancelled)
+            try:
+                load_more = WebDriverWait(driver, 2).until(
+                    EC.element_to_be_clickable((By.CLASS_NAME, button))
+                )
+                driver.execute_script("arguments[0].scrollIntoView(true);", load_more)
+                driver.execute_script("arguments[0].click();", load_more)
+            except WebDriverException:
+                break
+
+            # Συνεχίζουμε μόνο όσο το κουμπί φέρνει νέα προϊόντα
+            current_count = self.waiter.wait_until_stable(driver, selector, store, cancelled=cancelled)
+            if current_count <= previous_count:
+                break
+            previous_count = current_count
+
+    def scroll_to_bottom(self, driver: webdriver.Chrome, selector: str = "div.brand-line",
+                         store: str = "Fit1", max_attempts: int = 2, done: Optional[str] = "no-more-products",
+                         cancelled: Optional[threading.Event] = None):
+        """
+        Scroll to bottom of page for infinite loading, waiting only until new products settle.
+        Raises ScrapeCancelled once cancelled is set.
+        """
+        scroll_attempts = 0
+        last_state = self.waiter.page_state(driver, selector)[:2]
+        
+        while scroll_attempts < max_attempts:
+            self.check_cancelled(store, cancelled)
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight - 100);")
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            count = self.waiter.wait_until_stable(driver, selector, store, cancelled=cancelled)
+            
+            new_state = (count, self.waiter.page_state(driver, selector)[1])
+            if new_state == last_state:
+                scroll_attempts += 1
+            else:
+                scroll_attempts = 0
+            last_state = new_state
+            
+            if done is None:
+                continue
+            try:
+                if driver.find_element(By.CLASS_NAME, done).is_displayed():
+                    break
+            except WebDriverException:
+                pass
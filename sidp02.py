@@ -1,476 +1,1163 @@
-from bs4 import BeautifulSoup 
-import requests
+"""
+Η βάση των προϊόντων, τα runs και οι κατατάξεις.
+
+Το module φορτώνεται γρήγορα και χωρίς παρενέργειες (μόνο η standard library και το
+metrics.py), ώστε το UI να δείχνει τις κατατάξεις χωρίς να φορτώσει τη στοίβα του
+scraping. Η στοίβα του scraping (requests, Selenium, BeautifulSoup, lxml) βρίσκεται στο
+scraper.py και φορτώνεται την πρώτη φορά που χρειάζεται: στο main() ή όταν ζητηθεί
+κάποιο από τα ονόματά της από εδώ (π.χ. sidp02.WebScraper). Οι συνδέσεις με τη βάση
+ανοίγουν μόνο όταν καλείται μια συνάρτηση που τη χρειάζεται.
+"""
+from urllib.parse import urlparse
+import threading
+import queue
+import json
+import hashlib
+import importlib
 import re
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import Select
-from time import sleep
 import time
-from typing import List, Dict, Optional
+import unicodedata
+from typing import List, Dict, Optional, Callable, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache, partial
 import sqlite3
 import os
+from metrics import RunMetrics, write_json_report, write_prometheus_report
+
+if TYPE_CHECKING:
+    from stores import StoreConfig
+
+# Ονόματα που ζουν στο scraper.py και διατίθενται και από εδώ (φορτώνονται με την πρώτη χρήση)
+SCRAPER_NAMES = {"ResponseCache", "FetchResult", "HttpFetcher", "DriverPool", "PageWaiter", "WebScraper",
+                 "PAGE_STATE_SCRIPT"}
+
+
+def __getattr__(name):
+    if name in SCRAPER_NAMES:
+        return getattr(importlib.import_module("scraper"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 base_dir = os.path.dirname(os.path.abspath(__file__))  # Παίρνει τη διαδρομή του φακέλου του τρέχοντος script
 db_path = os.path.join(base_dir, "products.db")
-conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
+cache_path = os.path.join(base_dir, "http_cache.db")
+# Οι αναφορές των runs (run-<id>.json και, προαιρετικά, scrape.prom)
+report_dir = os.path.join(base_dir, "run_reports")
 
+# Ο writer που είναι ενεργός κατά τη διάρκεια ενός scraping run (βλ. BulkWriter)
+active_writer = None
 
-def insert_data(name, price, source_url):
-    if not name or not price:
-        return
-        
-    try:
-        # Καθαρισμός τιμής
-        if isinstance(price, str):
-            price = price.replace('€', '').replace(',', '.').strip()
-        price = float(price)
-        
-        conn = sqlite3.connect('products.db')
-        cursor = conn.cursor()  
-        cursor.execute("""
+
+def connect_db(timeout: float = 30) -> sqlite3.Connection:
+    """Ανοίγει σύνδεση με τη βάση των προϊόντων."""
+    return sqlite3.connect(db_path, timeout=timeout)
+
+
+def create_products_table(cursor):
+    """
+    Δημιουργεί τον πίνακα products αν δεν υπάρχει.
+
+    Οι στήλες grams, price_per_gram και category υπολογίζονται μία φορά κατά την
+    εισαγωγή (βλ. upsert_products), ώστε οι κατατάξεις να είναι απλά ORDER BY ... LIMIT.
+    Επειδή ένα προϊόν μπορεί να ανήκει σε πολλές κατηγορίες (π.χ. "Whey Isolate"),
+    η συμμετοχή σε κατηγορίες κρατιέται στον πίνακα product_categories.
+    Η στήλη name_key (κανονικοποιημένο όνομα, βλ. normalize_name) είναι UNIQUE,
+    οπότε κάθε προϊόν υπάρχει μία φορά και τα διπλότυπα λύνονται κατά την εισαγωγή.
+    """
+    cursor.execute("""
         CREATE TABLE IF NOT EXISTS products (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        price REAL NOT NULL,
-        source_url TEXT NOT NULL
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            price REAL NOT NULL,
+            source_url TEXT NOT NULL,
+            grams INTEGER,
+            price_per_gram REAL,
+            category TEXT,
+            name_key TEXT,
+            canonical_id INTEGER
         )
-    """)     
-        cursor.execute("INSERT INTO products (name, price, source_url) VALUES (?, ?, ?)", (name, price, source_url))
-        conn.commit()
-        conn.close()
-        
-    except (ValueError, sqlite3.Error) as e:
-        print(f"Σφάλμα εισαγωγής προϊόντος {name}: {e}")
-        
-def reset_database():
-    """Reset the database by dropping and recreating the table."""
-    connection = sqlite3.connect('products.db')
-    cursor = connection.cursor()
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS product_categories (
+            product_id INTEGER NOT NULL REFERENCES products (id) ON DELETE CASCADE,
+            category TEXT NOT NULL,
+            price_per_gram REAL NOT NULL,
+            PRIMARY KEY (product_id, category)
+        )
+    """)
+    if add_missing_columns(cursor, "products", {"grams": "INTEGER", "price_per_gram": "REAL", "category": "TEXT"}):
+        backfill_derived_columns(cursor)
+    added_key = "name_key" in add_missing_columns(cursor, "products", {"name_key": "TEXT", "canonical_id": "INTEGER"})
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_products_name_key ON products (name_key)")
+    if added_key:
+        merge_unkeyed_products(cursor)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_category_ppg ON products (category, price_per_gram)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_ppg ON products (price_per_gram)")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_product_categories_ppg
+        ON product_categories (category, price_per_gram)
+    """)
+    create_search_index(cursor)
+
+
+def has_search_index(cursor) -> bool:
+    return cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'products_fts'").fetchone() is not None
 
-    # Διαγραφή του πίνακα αν υπάρχει
-    cursor.execute("DROP TABLE IF EXISTS products")
 
-    # Δημιουργία του πίνακα από την αρχή
+def create_search_index(cursor) -> bool:
+    """
+    Δημιουργεί το ευρετήριο πλήρους κειμένου products_fts (FTS5) αν δεν υπάρχει.
+
+    Το rowid κάθε γραμμής είναι το id του προϊόντος και το κείμενο είναι το όνομά του
+    μετά το fold_text, οπότε οι αναζητήσεις δεν κάνουν διάκριση πεζών/κεφαλαίων και τόνων.
+    Οι εγγραφές ενημερώνονται μαζί με τις κατηγορίες (βλ. sync_product_categories) και
+    σβήνονται με trigger όταν σβήνεται το προϊόν. Τα prefix indexes (2 και 3 χαρακτήρες)
+    κάνουν γρήγορες τις αναζητήσεις με πρόθεμα ("iso"*).
+
+    Την πρώτη φορά γεμίζει από τα υπάρχοντα προϊόντα και υπολογίζει ξανά τις κατηγορίες
+    τους (το match_categories συγκρίνει πλέον με το fold_text). Επιστρέφει False αν η
+    SQLite δεν έχει FTS5· τότε οι αναζητήσεις διατρέχουν τον πίνακα products.
+    """
+    if not has_search_index(cursor):
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS products_fts
+                USING fts5(name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')
+            """)
+        except sqlite3.OperationalError:
+            return False
+        backfill_derived_columns(cursor)
+        cursor.executemany("INSERT OR REPLACE INTO products_fts (rowid, name) VALUES (?, ?)", [
+            (product_id, fold_text(name))
+            for product_id, name in cursor.execute("SELECT id, name FROM products").fetchall()
+        ])
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+            DELETE FROM products_fts WHERE rowid = old.id;
+        END
+    """)
+    return True
+
+
+def add_missing_columns(cursor, table: str, columns: Dict[str, str]) -> List[str]:
+    """Προσθέτει σε υπάρχοντα πίνακα (από παλαιότερη έκδοση) όσες στήλες λείπουν."""
+    existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()}
+    added = []
+    for column, column_type in columns.items():
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+            added.append(column)
+    return added
+
+
+def backfill_derived_columns(cursor):
+    """Υπολογίζει τις παράγωγες στήλες για γραμμές που γράφτηκαν πριν υπάρξουν."""
+    rows = cursor.execute("SELECT id, name, price FROM products").fetchall()
+    updates, memberships = [], []
+    for product_id, name, price in rows:
+        try:
+            price, grams, price_per_gram, categories = derive_product_columns(name, price)
+        except (ValueError, TypeError):
+            continue
+        updates.append((price, grams, price_per_gram, categories[0] if categories else None, product_id))
+        if price_per_gram is not None:
+            memberships.extend((product_id, category, price_per_gram) for category in categories)
+    cursor.executemany("UPDATE products SET price = ?, grams = ?, price_per_gram = ?, category = ? WHERE id = ?", updates)
+    cursor.executemany("INSERT OR REPLACE INTO product_categories (product_id, category, price_per_gram) VALUES (?, ?, ?)",
+                       memberships)
+
+
+def create_listing_tables(cursor):
+    """
+    Δημιουργεί τους πίνακες που κρατάνε την κατάσταση ανάμεσα στα runs.
+
+    listings: μία γραμμή ανά προϊόν καταστήματος, με το fingerprint της και
+    το τελευταίο run που τη συνάντησε. Όσες εξαφανίστηκαν σημειώνονται με removed_at.
+    Το canonical_id είναι κοινό για τις καταχωρήσεις του ίδιου προϊόντος σε όλα τα
+    καταστήματα (βλ. matching.assign_canonical_ids).
+    listing_cards: το fingerprint κάθε κάρτας προϊόντος στη λίστα ενός καταστήματος
+    που έχει σελίδα λεπτομερειών (GymBeam), ώστε να ξέρουμε πότε χρειάζεται νέα επίσκεψη.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at REAL NOT NULL,
+            finished_at REAL,
+            mode TEXT NOT NULL
+        )
+    """)
     cursor.execute("""
-        CREATE TABLE products (
+        CREATE TABLE IF NOT EXISTS listings (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
+            store TEXT NOT NULL,
             name TEXT NOT NULL,
-            price TEXT NOT NULL,
-            source_url TEXT NOT NULL
+            price REAL NOT NULL,
+            source_url TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            run_id INTEGER NOT NULL,
+            first_seen REAL NOT NULL,
+            last_seen REAL NOT NULL,
+            removed_at REAL,
+            name_key TEXT,
+            canonical_id INTEGER,
+            UNIQUE (store, source_url, name)
         )
     """)
-    connection.commit()
-    connection.close()
-    print("Database has been reset.")
-        
-class WebScraper:
-    def __init__(self):
-        self.setup_selenium_options()
-        
-    def setup_selenium_options(self) -> Options:
-        """Initialize Chrome options for Selenium"""
-        self.options = Options()
-        self.options.add_argument('--headless')
-        self.options.add_argument('--ignore-certificate-errors')
-        self.options.add_argument('--disable-gpu')
-        return self.options
-
-    def get_soup(self, url: str) -> Optional[BeautifulSoup]:
-        """Get BeautifulSoup object from URL using requests"""
-        try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                return BeautifulSoup(response.text, "lxml")
-            print(f"Error: {response.status_code}")
-            return None
-        except Exception as e:
-            print(f"Error fetching URL: {e}")
-            return None
-
-    def extract_price(self, price_tag) -> str:
-        """Extract price from a price tag element"""
-        if price_tag:
-            price = price_tag.find("strong") or price_tag.find("span")
-            return price.text.strip() if price else "No price"
-        return "No price"
-
-    def clean_text(self, text: str) -> str:
-        """Clean text by removing non-ASCII characters"""
-        return re.sub(r'[^\x00-\x7F]+', ' ', text).strip()
-
-    def scrape_katerelos(self, urls: List[str]) -> List[Dict]:
-        """Scrape products from Katerelos website"""
-        products = []
-        for url in urls:
-            soup = self.get_soup(url)
-            if not soup:
-                continue
+    if "name_key" in add_missing_columns(cursor, "listings", {"name_key": "TEXT", "canonical_id": "INTEGER"}):
+        cursor.executemany("UPDATE listings SET name_key = ? WHERE id = ?", [
+            (normalize_name(name), listing_id)
+            for listing_id, name in cursor.execute("SELECT id, name FROM listings").fetchall()
+        ])
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_listings_store_run ON listings (store, run_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_listings_name_key ON listings (name_key)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_listings_canonical ON listings (canonical_id)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS listing_cards (
+            store TEXT NOT NULL,
+            source_url TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            run_id INTEGER NOT NULL,
+            PRIMARY KEY (store, source_url)
+        )
+    """)
+
+
+def listing_fingerprint(name: str, price, source_url: str) -> str:
+    """Fingerprint μιας καταχώρησης: όνομα + τιμή λίστας + URL."""
+    return hashlib.sha1(f"{name}|{price}|{source_url}".encode("utf-8")).hexdigest()
+
+
+def load_card_fingerprints(store: str) -> Dict[str, str]:
+    """Επιστρέφει {source_url: fingerprint} για τις κάρτες του καταστήματος από το προηγούμενο run."""
+    conn = connect_db()
+    try:
+        create_listing_tables(conn.cursor())
+        rows = conn.execute("SELECT source_url, fingerprint FROM listing_cards WHERE store = ?", (store,)).fetchall()
+        return dict(rows)
+    finally:
+        conn.close()
 
-            protein_elements = soup.find_all("div", class_="block_btm")
-            print(f"Found {len(protein_elements)} products on {url}")
-            
-            for protein in protein_elements:
-                name = self.clean_text(protein.find("h4").text.strip())
-                price = self.extract_price(protein.find("h6"))
-                products.append({"name": name, "price": price})
-                #print(f"Product: {name}, Price: {price}")
-                insert_data(name, price, url)
-        return products
-
-    def scrape_fitrace(self, urls: List[str]) -> List[Dict]:
-        """Scrape products from Fitrace website"""
-        products = []
-        for url in urls:
-            soup = self.get_soup(url)
-            if not soup:
+
+def clean_price(price) -> float:
+    """Μετατρέπει μια τιμή της μορφής '29,90 €' σε float."""
+    if isinstance(price, str):
+        price = price.replace('€', '').replace(',', '.').strip()
+    return float(price)
+
+
+# Λέξεις-κλειδιά κάθε κατηγορίας, με τη σειρά προτεραιότητας για τη στήλη category
+CATEGORIES = {
+    "Isolate": ['iso', 'isolated', 'απομονωμένος ορός γάλακτος'],
+    "Mass Gainer": ['mass', 'gainer', 'μάζα'],
+    "Hydrolyzed": ['hydro', 'hydrolized', 'υδρολυμένος'],
+    "Whey": ['whey', 'ορρός γάλακτος'],
+}
+
+# Βελτιωμένο pattern για να αναγνωρίζει περισσότερες μορφές βάρους
+WEIGHT_PATTERNS = [
+    (re.compile(r"(\d+(?:\.\d+)?)\s*(?:g|gr|grams|Γραμμάρια)", re.IGNORECASE), 1),
+    (re.compile(r"(\d+(?:\.\d+)?)\s*(?:kg|KG|κιλά|kgs)", re.IGNORECASE), 1000),
+    (re.compile(r"(\d+(?:\.\d+)?)\s*k(?=\s|$)", re.IGNORECASE), 1000),
+]
+
+
+def parse_grams(name: str) -> Optional[int]:
+    """Βρίσκει το βάρος σε γραμμάρια μέσα στο όνομα ενός προϊόντος."""
+    for pattern, multiplier in WEIGHT_PATTERNS:
+        match = pattern.search(name)
+        if match:
+            return int(float(match.group(1)) * multiplier) or None
+    return None
+
+
+# Τόνοι, διαλυτικά και άλλα σημάδια που μένουν χωριστά μετά το NFD
+COMBINING_MARKS = re.compile("[\u0300-\u036f]")
+# Διπλά ελληνικά γράμματα, που συχνά γράφονται και μονά ("ορρός" / "ορός")
+DOUBLED_GREEK = re.compile(r"([α-ω])\1")
+
+
+def fold_text(text: str) -> str:
+    """
+    Το κείμενο όπως συγκρίνεται στις κατηγορίες και στις αναζητήσεις: πεζά (και το ς ως σ),
+    χωρίς τόνους και διαλυτικά και με τα διπλά ελληνικά γράμματα μονά, ώστε τα "ΟΡΡΟΣ",
+    "ορρός" και "ορός" να είναι το ίδιο.
+    """
+    if text.isascii():
+        return text.lower()
+    text = COMBINING_MARKS.sub("", unicodedata.normalize("NFD", text.casefold()))
+    return DOUBLED_GREEK.sub(r"\1", text)
+
+
+@lru_cache(maxsize=256)
+def fold_keyword(keyword: str) -> str:
+    """fold_text για τις λέξεις-κλειδιά, που είναι λίγες και ελέγχονται σε κάθε προϊόν."""
+    return fold_text(keyword)
+
+
+def match_categories(name: str, categories: Optional[Dict[str, List[str]]] = None) -> List[str]:
+    """Επιστρέφει τις κατηγορίες στις οποίες ανήκει ένα προϊόν με βάση τις λέξεις-κλειδιά (βλ. fold_text)."""
+    folded = fold_text(name)
+    return [category for category, keywords in (categories or CATEGORIES).items()
+            if any(fold_keyword(keyword) in folded for keyword in keywords)]
+
+
+def search_words(text: str) -> List[str]:
+    """Οι λέξεις ενός κειμένου μετά το fold_text, όπως τις χωρίζει ο tokenizer unicode61."""
+    return re.findall(r"[^\W_]+", fold_text(text))
+
+
+def matches_phrase(words: List[str], phrase: List[str]) -> bool:
+    """True αν η φράση εμφανίζεται στις λέξεις, με την τελευταία λέξη της ως πρόθεμα (όπως το "..."* του FTS5)."""
+    size = len(phrase)
+    return any(words[i:i + size - 1] == phrase[:-1] and words[i + size - 1].startswith(phrase[-1])
+               for i in range(len(words) - size + 1))
+
+
+def search_match(terms: List[str], match_any: bool = False) -> str:
+    """
+    Το MATCH του products_fts για λέξεις-κλειδιά ή για τις λέξεις ενός κειμένου αναζήτησης.
+    Κάθε όρος γίνεται fold_text και φράση με πρόθεμα ("απομονωμενοσ ορος γαλακτοσ"*), ώστε
+    το "iso" να βρίσκει και το "Isolate". Οι όροι ενώνονται με OR (match_any) ή AND.
+    Κενό string αν δεν υπάρχει καμία λέξη.
+    """
+    phrases = []
+    for term in terms:
+        words = search_words(term)
+        if words:
+            phrases.append('"' + " ".join(words) + '"*')
+    return (" OR " if match_any else " AND ").join(phrases)
+
+
+def derive_product_columns(name: str, price) -> tuple:
+    """Υπολογίζει (price, grams, price_per_gram, categories) για ένα προϊόν."""
+    price = clean_price(price)
+    # Διόρθωση τιμής αν είναι μικρότερη από 1
+    if price < 1:
+        price *= 100
+    grams = parse_grams(name)
+    price_per_gram = price / grams if grams else None
+    return price, grams, price_per_gram, match_categories(name)
+
+
+def normalize_name(name: str) -> str:
+    """Κλειδί αποδιπλασιασμού: το όνομα σε πεζά με ενοποιημένα κενά."""
+    return re.sub(r'\s+', ' ', name).strip().lower()
+
+
+# Upsert με τους κανόνες αποδιπλασιασμού: κρατιέται η χαμηλότερη τιμή και
+# σε ισοτιμία προστίθεται το URL (αν δεν υπάρχει ήδη) στη λίστα των URLs.
+# Μέσα στο DO UPDATE οι στήλες χωρίς πρόθεμα είναι οι τιμές της υπάρχουσας γραμμής.
+PRODUCT_UPSERT_LOWEST = """
+    INSERT INTO products (name_key, name, price, source_url, grams, price_per_gram, category)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (name_key) DO UPDATE SET
+        source_url = CASE
+            WHEN excluded.price < price THEN excluded.source_url
+            WHEN excluded.price = price
+                 AND instr(', ' || source_url || ', ', ', ' || excluded.source_url || ', ') = 0
+                THEN source_url || ', ' || excluded.source_url
+            ELSE source_url
+        END,
+        price_per_gram = CASE WHEN excluded.price < price THEN excluded.price_per_gram ELSE price_per_gram END,
+        price = MIN(price, excluded.price)
+"""
+
+# Upsert για γραμμές που υπολογίστηκαν ξανά από όλες τις ενεργές καταχωρήσεις (βλ. refresh_products)
+PRODUCT_UPSERT_REPLACE = """
+    INSERT INTO products (name_key, name, price, source_url, grams, price_per_gram, category)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (name_key) DO UPDATE SET
+        price = excluded.price,
+        source_url = excluded.source_url,
+        price_per_gram = excluded.price_per_gram
+"""
+
+
+def product_record(name: str, price, source_url: str) -> Optional[tuple]:
+    """Η γραμμή (name_key, name, price, source_url, grams, price_per_gram, category) ενός προϊόντος."""
+    try:
+        price, grams, price_per_gram, categories = derive_product_columns(name, price)
+    except (ValueError, TypeError) as e:
+        print(f"Σφάλμα εισαγωγής προϊόντος {name}: {e}")
+        return None
+    return (normalize_name(name), name, price, source_url, grams, price_per_gram,
+            categories[0] if categories else None)
+
+
+def upsert_products(cursor, rows: List[tuple]) -> int:
+    """
+    Εισάγει γραμμές (name, price, source_url) στον πίνακα products. Αν υπάρχει ήδη
+    προϊόν με το ίδιο κανονικοποιημένο όνομα κρατιέται η χαμηλότερη τιμή και σε
+    ισοτιμία συνδυάζονται τα URLs. Επιστρέφει πόσες γραμμές γράφτηκαν.
+    """
+    records = [record for record in (product_record(*row) for row in rows) if record is not None]
+    cursor.executemany(PRODUCT_UPSERT_LOWEST, records)
+    sync_product_categories(cursor, {record[0] for record in records})
+    return len(records)
+
+
+def refresh_products(cursor, keys) -> int:
+    """
+    Υπολογίζει ξανά τα προϊόντα των κλειδιών από τις ενεργές καταχωρήσεις (listings):
+    χαμηλότερη τιμή, τα URLs όσων την έχουν, και το όνομα της παλαιότερης καταχώρησης.
+    Κλειδιά χωρίς ενεργές καταχωρήσεις διαγράφονται. Επιστρέφει πόσα προϊόντα γράφτηκαν.
+    """
+    keys = json.dumps(sorted(set(keys)))
+    rows = cursor.execute("""
+        SELECT name_key, name, price, source_url FROM listings
+        WHERE removed_at IS NULL AND name_key IN (SELECT value FROM json_each(?))
+        ORDER BY name_key, id
+    """, (keys,)).fetchall()
+
+    best = {}
+    for key, name, price, source_url in rows:
+        record = product_record(name, price, source_url)
+        if record is None:
+            continue
+        current = best.get(key)
+        if current is None or record[2] < current[0][2]:
+            # Το όνομα μένει της παλαιότερης καταχώρησης, όπως και στο upsert
+            best[key] = (record[:1] + (current[0][1],) + record[2:] if current else record, [source_url])
+        elif record[2] == current[0][2] and source_url not in current[1]:
+            current[1].append(source_url)
+    records = [record[:3] + (', '.join(urls),) + record[4:] for record, urls in best.values()]
+
+    cursor.execute("""
+        DELETE FROM product_categories WHERE product_id IN (
+            SELECT id FROM products WHERE name_key IN (SELECT value FROM json_each(?))
+        )
+    """, (keys,))
+    cursor.executemany("DELETE FROM products WHERE name_key = ?",
+                       [(key,) for key in json.loads(keys) if key not in best])
+    cursor.executemany(PRODUCT_UPSERT_REPLACE, records)
+    sync_product_categories(cursor, best.keys())
+    return len(records)
+
+
+def sync_product_categories(cursor, keys):
+    """
+    Ξαναγράφει τη συμμετοχή σε κατηγορίες (και το price_per_gram της) για τα προϊόντα
+    των κλειδιών, και τις εγγραφές τους στο ευρετήριο κειμένου (products_fts).
+    """
+    products = cursor.execute("""
+        SELECT id, name, price_per_gram FROM products
+        WHERE name_key IN (SELECT value FROM json_each(?))
+    """, (json.dumps(list(keys)),)).fetchall()
+    cursor.executemany("DELETE FROM product_categories WHERE product_id = ?",
+                       [(product_id,) for product_id, _, _ in products])
+    cursor.executemany("INSERT INTO product_categories (product_id, category, price_per_gram) VALUES (?, ?, ?)", [
+        (product_id, category, price_per_gram)
+        for product_id, name, price_per_gram in products if price_per_gram is not None
+        for category in match_categories(name)
+    ])
+    if has_search_index(cursor):
+        cursor.executemany("INSERT OR REPLACE INTO products_fts (rowid, name) VALUES (?, ?)",
+                           [(product_id, fold_text(name)) for product_id, name, _ in products])
+
+
+def merge_unkeyed_products(cursor) -> int:
+    """
+    Συγχωνεύει με upsert όσα προϊόντα δεν έχουν ακόμα name_key (γραμμές από παλαιότερη
+    έκδοση της βάσης). Αγγίζει μόνο αυτές τις γραμμές. Επιστρέφει πόσες ήταν.
+    """
+    rows = cursor.execute("SELECT id, name, price, source_url FROM products WHERE name_key IS NULL ORDER BY id").fetchall()
+    if not rows:
+        return 0
+    cursor.executemany("DELETE FROM product_categories WHERE product_id = ?", [(row[0],) for row in rows])
+    cursor.execute("DELETE FROM products WHERE name_key IS NULL")
+    upsert_products(cursor, [row[1:] for row in rows])
+    return len(rows)
+
+
+class BulkWriter:
+    """
+    Γράφει τα προϊόντα στη βάση από ένα αποκλειστικό thread.
+
+    Οι scrapers καλούν submit() (μέσω insert_data) και συνεχίζουν αμέσως.
+    Το thread του writer κρατάει τη μοναδική σύνδεση με τη βάση, μαζεύει τις
+    γραμμές σε παρτίδες και τις γράφει με executemany μέσα σε ένα transaction
+    ανά παρτίδα, σε WAL journal mode. Κάθε γραμμή γίνεται upsert στον πίνακα
+    listings με το run_id του τρέχοντος run και στο ίδιο transaction ενημερώνονται
+    τα προϊόντα των κλειδιών που άγγιξε η παρτίδα (βλ. refresh_products).
+    Με metrics, ο χρόνος κάθε παρτίδας μοιράζεται στα καταστήματα ανάλογα με τις γραμμές τους.
+
+    Η ουρά έχει όριο max_pending: αν οι scrapers φέρνουν προϊόντα πιο γρήγορα από όσο
+    γράφονται, το submit περιμένει, οπότε η μνήμη δεν μεγαλώνει με το μέγεθος του καταλόγου.
+    Το on_batch (π.χ. progress.ScrapeProgress.add_listings) καλείται από το thread του
+    writer με τις γραμμές listings κάθε παρτίδας που γράφτηκε.
+
+    Οι γραμμές μιας παρτίδας που απέτυχε μετριούνται ανά κατάστημα στο failed (βλ.
+    mark_write_failures), ώστε το finish_run να μη σβήσει καταχωρήσεις που δεν γράφτηκαν.
+    Αν το thread του writer σταματήσει, το submit και το flush σηκώνουν RuntimeError αντί
+    να περιμένουν για πάντα.
+    """
+
+    def __init__(self, run_id: int, batch_size: int = 1000, flush_interval: float = 0.5,
+                 metrics: Optional[RunMetrics] = None, max_pending: int = 10000,
+                 on_batch: Optional[Callable[[List[tuple]], None]] = None):
+        self.run_id = run_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.metrics = metrics
+        self.on_batch = on_batch
+        self.rows_written = 0
+        self.elapsed = 0.0
+        # Γραμμές που δεν γράφτηκαν, ανά κατάστημα, και το σφάλμα που σταμάτησε το thread
+        self.failed: Dict[str, int] = {}
+        self.error: Optional[BaseException] = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._stop = object()
+        # Μετά το close οι νέες γραμμές απορρίπτονται (βλ. _put)
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def _stopped(self) -> bool:
+        """True αν το thread ξεκίνησε και δεν τρέχει πια."""
+        return self._thread is not None and not self._thread.is_alive()
+
+    def _enqueue(self, item):
+        """Περιμένει θέση στην ουρά όσο το thread του writer τρέχει."""
+        while True:
+            if self._stopped():
+                raise RuntimeError(f"Ο writer της βάσης σταμάτησε: {self.error}")
+            try:
+                self._queue.put(item, timeout=self.flush_interval)
+                return
+            except queue.Full:
                 continue
 
-            protein_elements = soup.find_all("div", class_="description")
-            print(f"Found {len(protein_elements)} products on {url}")
-            
-            for protein in protein_elements:
-                name = self.clean_text(protein.find("h4").text.strip())
-                price = self.extract_price(protein.find_next("div", class_="price"))
-                products.append({"name": name, "price": price})
-                #print(f"Product: {name}, Price: {price}")
-                insert_data(name, price, url)
-                
-        return products
-
-    def scrape_growling(self, url: str) -> List[Dict]:
-        """Scrape products from Growling website"""
-        products = []
-        driver = webdriver.Chrome(options=self.options)
-        
+    def _put(self, item: tuple) -> bool:
+        """Βάζει μια γραμμή στην ουρά· False αν ο writer έχει ήδη κλείσει."""
+        # Ο έλεγχος και το put μαζί: αλλιώς μια γραμμή μπορεί να μπει μετά το _stop και να χαθεί
+        with self._lock:
+            if self._closed:
+                return False
+            self._enqueue(item)
+        return True
+
+    def submit(self, store: str, name: str, price: float, source_url: str) -> bool:
+        return self._put(("listing", store, name, price, source_url, listing_fingerprint(name, price, source_url)))
+
+    def mark_seen(self, store: str, source_url: str):
+        """Οι καταχωρήσεις του URL δεν άλλαξαν: μένουν ενεργές χωρίς νέα επίσκεψη."""
+        self._put(("seen", store, source_url))
+
+    def record_card(self, store: str, source_url: str, fingerprint: str):
+        self._put(("card", store, source_url, fingerprint))
+
+    def flush(self):
+        """Περιμένει μέχρι να γραφτούν όλες οι γραμμές που έχουν υποβληθεί."""
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                if self._stopped():
+                    raise RuntimeError(f"Ο writer της βάσης σταμάτησε: {self.error}")
+                self._queue.all_tasks_done.wait(timeout=self.flush_interval)
+
+    def close(self):
+        if self._thread is None:
+            return
+        with self._lock:
+            self._closed = True
+            if not self._stopped():
+                try:
+                    self._enqueue(self._stop)
+                except RuntimeError:
+                    pass
+        self._thread.join()
+        self._thread = None
+        # Ό,τι έμεινε στην ουρά ενός writer που σταμάτησε δεν γράφτηκε
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not self._stop:
+                self._fail([item])
+            self._queue.task_done()
+        for store, rows in self.failed.items():
+            print(f"{store}: {rows} γραμμές δεν γράφτηκαν στη βάση")
+        rate = self.rows_written / self.elapsed if self.elapsed else 0
+        print(f"Writer: {self.rows_written} γραμμές σε {self.elapsed:.2f}s ({rate:.0f} γραμμές/s)")
+
+    def __enter__(self):
+        global active_writer
+        active_writer = self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global active_writer
+        active_writer = None
+        self.close()
+
+    def _run(self):
         try:
-            driver.get(url)
-            wait = WebDriverWait(driver, 40)
-            
-            while True:
+            conn = connect_db()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            create_products_table(conn.cursor())
+            create_listing_tables(conn.cursor())
+            conn.commit()
+        except sqlite3.Error as e:
+            # Οι γραμμές μένουν στην ουρά και μετριούνται ως αποτυχημένες στο close
+            self.error = e
+            print(f"Σφάλμα σύνδεσης του writer με τη βάση: {e}")
+            return
+
+        stopping = False
+        try:
+            while not stopping:
                 try:
-                    load_more = WebDriverWait(driver, 5).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, 'load-more'))
-                    )
-                    if load_more.is_displayed():
-                        print("Found Load More button. Clicking...")
-                        driver.execute_script("arguments[0].scrollIntoView(true);", load_more)
-                        sleep(1)
-                        load_more.click()
-                        sleep(3)
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+
+                batch = []
+                while True:
+                    if item is self._stop:
+                        stopping = True
+                        self._queue.task_done()
                     else:
+                        batch.append(item)
+                    if stopping or len(batch) >= self.batch_size:
                         break
-                except:
-                    #print("No more Load More button found.")
-                    break
-
-            soup = BeautifulSoup(driver.page_source, "lxml")
-            proteins = soup.find_all("h3", class_="heading-title product-name")
-            print(f"\nFound {len(proteins)} products on Growling")
-            
-            for protein in proteins:
-                try:
-                    name = protein.find("a").text.strip()
-                    price_tag = protein.find_next("span", class_="price")
-                    price = price_tag.text.strip() if price_tag else "No price"
-                    products.append({"name": name, "price": price})
-                    #print(f"Product: {name}, Price: {price}")
-                    insert_data(name, price, url)
-                except Exception as e:
-                    print(f"Error processing product: {e}")
-                    
-        finally:
-            driver.quit()
-            
-        return products
-
-    def scrape_fit1(self, urls: List[str]) -> List[Dict]:
-        """Scrape products from Fit1 website"""
-        products = []
-        driver = webdriver.Chrome(options=self.options)
-        
-        try:
-            for url in urls:
-                print(f"\nProcessing Fit1 URL: {url}")
-                driver.get(url)
-                self.scroll_to_bottom(driver)
-                
-                soup = BeautifulSoup(driver.page_source, "lxml")
-                proteins = soup.find_all("div", class_="brand-line")
-                prices = soup.find_all("div", class_="price-line")
-                print(f"Found {len(proteins)} products")
-                
-                for i, protein in enumerate(proteins):
                     try:
-                        brand_name = protein.text.strip()
-                        title = protein.find_next("h3").get('title', '').strip()
-                        pack_info = protein.find_next("div", class_="pack-line").text.strip()
-                        full_name = f"{brand_name} {title} {pack_info}"
-                        
-                        price = "No price"
-                        if i < len(prices):
-                            price_element = prices[i].find("b", class_="green") or prices[i].find("b", class_="normalp")
-                            if price_element:
-                                price = self.process_price(price_element)
-                                
-                        products.append({"name": full_name, "price": price})
-                        #print(f"Product: {full_name}, Price: {price}")
-                        insert_data(full_name, price, url)
-                    except Exception as e:
-                        print(f"Error processing product: {e}")
-                        
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if batch:
+                    try:
+                        self._write(conn, batch)
+                    except BaseException as e:
+                        # Απρόβλεπτο σφάλμα: το thread σταματάει και όσοι περιμένουν το βλέπουν
+                        self.error = e
+                        self._fail(batch)
+                        raise
+                    finally:
+                        for _ in batch:
+                            self._queue.task_done()
         finally:
-            driver.quit()
-            
-        return products
+            conn.close()
+
+    def _fail(self, batch: List[tuple]):
+        """Μετράει ανά κατάστημα τις γραμμές μιας παρτίδας που δεν γράφτηκε."""
+        for item in batch:
+            self.failed[item[1]] = self.failed.get(item[1], 0) + 1
+            if self.metrics is not None:
+                self.metrics.count(item[1], "write_errors")
+
+    def _write(self, conn: sqlite3.Connection, batch: List[tuple]):
+        start = time.perf_counter()
+        now = time.time()
+        listings = [item[1:] + (self.run_id, now, now, normalize_name(item[2])) for item in batch if item[0] == "listing"]
+        seen = [(self.run_id, now, item[1], item[2]) for item in batch if item[0] == "seen"]
+        cards = [item[1:] + (self.run_id,) for item in batch if item[0] == "card"]
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT INTO listings (store, name, price, source_url, fingerprint, run_id, first_seen, last_seen,
+                                          name_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (store, source_url, name) DO UPDATE SET
+                        price = excluded.price,
+                        fingerprint = excluded.fingerprint,
+                        run_id = excluded.run_id,
+                        last_seen = excluded.last_seen,
+                        removed_at = NULL
+                """, listings)
+                conn.executemany("""
+                    UPDATE listings SET run_id = ?, last_seen = ?
+                    WHERE store = ? AND source_url = ? AND removed_at IS NULL
+                """, seen)
+                conn.executemany("""
+                    INSERT OR REPLACE INTO listing_cards (store, source_url, fingerprint, run_id)
+                    VALUES (?, ?, ?, ?)
+                """, cards)
+                # Οι κάρτες που δεν άλλαξαν μένουν στο τρέχον run
+                conn.executemany("UPDATE listing_cards SET run_id = ? WHERE store = ? AND source_url = ?",
+                                 [(run_id, store, url) for run_id, _, store, url in seen])
+                refresh_products(conn.cursor(), {listing[-1] for listing in listings})
+            self.rows_written += len(listings)
+        except sqlite3.Error as e:
+            print(f"Σφάλμα εγγραφής παρτίδας {len(batch)} προϊόντων: {e}")
+            self._fail(batch)
+            listings = []
+        elapsed = time.perf_counter() - start
+        self.elapsed += elapsed
+
+        if self.metrics is not None:
+            per_store = {}
+            for item in batch:
+                per_store[item[1]] = per_store.get(item[1], 0) + 1
+            for listing in listings:
+                self.metrics.count(listing[0], "rows")
+            for store, count in per_store.items():
+                self.metrics.record(store, "db_write", elapsed * count / len(batch))
+
+        if self.on_batch is not None and listings:
+            try:
+                self.on_batch(listings)
+            except Exception as e:
+                print(f"Σφάλμα στην ενημέρωση προόδου: {e}")
 
-    
 
-    def scrape_gymbeam(self, base_url: str) -> List[Dict]:
-        """Scrape products from GymBeam website, including size and price from dropdown"""
-        products = []
-        driver = webdriver.Chrome(options=self.options)
-    
-        try:
-            driver.get(base_url)
-            previous_count = 0
+def mark_write_failures(results: Dict[str, Dict], failed: Dict[str, int]):
+    """
+    Καταστήματα με γραμμές που δεν γράφτηκαν στη βάση (βλ. BulkWriter.failed) δεν είναι
+    πλήρη: ένα "ok" γίνεται "partial", ώστε το finish_run να μη σβήσει τις καταχωρήσεις τους.
+    """
+    for store, rows in failed.items():
+        result = results.get(store)
+        if result is not None and result["status"] == "ok":
+            result["status"] = "partial"
+            result["error"] = f"{rows} γραμμές δεν γράφτηκαν στη βάση"
+
+
+def active_run_id() -> Optional[int]:
+    """Το run που γράφει αυτή τη στιγμή (βλ. BulkWriter), ή None εκτός run."""
+    writer = active_writer
+    return writer.run_id if writer is not None else None
+
+
+def insert_data(name, price, source_url, store=None, run_id=None):
+    """
+    Γράφει ένα προϊόν: κατά τη διάρκεια ενός run μέσω του BulkWriter, αλλιώς απευθείας.
+    Με run_id η γραμμή ανήκει σε εκείνο το run· αν έχει ήδη κλείσει (π.χ. ένα job που
+    έληξε και δεν σταμάτησε εγκαίρως), η γραμμή δεν γράφεται.
+    """
+    if not name or not price:
+        return
         
-            while True:
-                try:
-                    current_products = WebDriverWait(driver, 5).until(
-                        EC.presence_of_all_elements_located((By.CLASS_NAME, "product-item"))
-                    )
-                    current_count = len(current_products)
-                
-                    if current_count > previous_count:
-                        previous_count = current_count
-
-                        try:
-                            load_more = WebDriverWait(driver, 5).until(
-                                EC.element_to_be_clickable((By.CLASS_NAME, "amscroll-load-button"))
-                            )
-                            driver.execute_script("arguments[0].scrollIntoView(true);", load_more)
-                            time.sleep(1)
-                            driver.execute_script("arguments[0].click();", load_more)
-                            time.sleep(2)
-                        except Exception:
-                            break
-                    else:
-                        break
-                
-                except Exception:
-                    break
+    try:
+        # Καθαρισμός τιμής
+        price = clean_price(price)
+
+        # Κατά τη διάρκεια ενός run οι γραμμές πηγαίνουν στον BulkWriter
+        writer = active_writer
+        if run_id is not None and (writer is None or writer.run_id != run_id):
+            return
+        if writer is not None:
+            writer.submit(store or urlparse(source_url).netloc, name, price, source_url)
+            return
+
+        conn = connect_db()
+        cursor = conn.cursor()
+        create_products_table(cursor)
+        upsert_products(cursor, [(name, price, source_url)])
+        conn.commit()
+        conn.close()
         
-            soup = BeautifulSoup(driver.page_source, "lxml")
-            product_elements = soup.find_all("div", class_="product details product-item-details")
+    except (ValueError, sqlite3.Error) as e:
+        print(f"Σφάλμα εισαγωγής προϊόντος {name}: {e}")
         
-            for product in product_elements:
-                try:
-                    product_link = product.find("a", class_="product-item-link")
-                    if not product_link:
-                        continue
-                    
-                    product_name = product_link.text.strip()
-                    product_url = product_link['href']
-                
-                    variants = self.get_gymbeam_variants(driver, product_url)
-                    for variant in variants:
-                        product_full_name = f"{product_name} - {variant['size']}"
-                        
-                        # Insert data into the database
-                        insert_data(product_full_name, variant['price'], product_url)
-                        
-                        products.append({
-                            "name": product_full_name,
-                            "price": variant['price'],
-                            "url": product_url
-                        })
-            
-                except Exception:
+def mark_listing_seen(store: str, source_url: str):
+    """Κρατάει ενεργές τις καταχωρήσεις ενός URL που δεν άλλαξε από το προηγούμενο run."""
+    if active_writer is not None:
+        active_writer.mark_seen(store, source_url)
+
+
+def record_listing_card(store: str, source_url: str, fingerprint: str):
+    """Αποθηκεύει το fingerprint μιας κάρτας προϊόντος για το επόμενο incremental run."""
+    if active_writer is not None:
+        active_writer.record_card(store, source_url, fingerprint)
+
+
+def reset_database():
+    """Reset the database by dropping and recreating the tables."""
+    connection = connect_db()
+    cursor = connection.cursor()
+
+    # Διαγραφή των πινάκων αν υπάρχουν. Το ιστορικό τιμών (history.py) και τα runs μένουν
+    cursor.execute("DROP TABLE IF EXISTS products")
+    cursor.execute("DROP TABLE IF EXISTS product_categories")
+    cursor.execute("DROP TABLE IF EXISTS listings")
+    cursor.execute("DROP TABLE IF EXISTS listing_cards")
+    cursor.execute("DROP TABLE IF EXISTS products_fts")
+
+    # Δημιουργία των πινάκων από την αρχή
+    create_products_table(cursor)
+    create_listing_tables(cursor)
+    connection.commit()
+    connection.close()
+    print("Database has been reset.")
+
+
+def start_run(mode: str) -> int:
+    """Καταγράφει την έναρξη ενός scraping run και επιστρέφει το id του."""
+    conn = connect_db()
+    try:
+        create_listing_tables(conn.cursor())
+        with conn:
+            cursor = conn.execute("INSERT INTO runs (started_at, mode) VALUES (?, ?)", (time.time(), mode))
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+
+def finish_run(run_id: int, results: Dict[str, Dict]):
+    """
+    Κλείνει ένα run: σημειώνει ως αφαιρεμένες (tombstone) τις καταχωρήσεις που δεν
+    εμφανίστηκαν και υπολογίζει ξανά μόνο τα προϊόντα που επηρεάζονται από αυτές.
+    Καταστήματα που απέτυχαν, έληξαν ή έχασαν σελίδες ("partial") δεν χάνουν τα προϊόντα τους.
+    """
+    now = time.time()
+    conn = connect_db()
+    try:
+        with conn:
+            cursor = conn.cursor()
+            create_products_table(cursor)
+            affected = set()
+            for store, result in results.items():
+                if result["status"] != "ok":
                     continue
-    
-        finally:
-            driver.quit()
-        
-        print(f"Found {len(products)} products on GymBeam")
-        return products
+                keys = {row[0] for row in cursor.execute("""
+                    SELECT name_key FROM listings WHERE store = ? AND run_id <> ? AND removed_at IS NULL
+                """, (store, run_id)).fetchall()}
+                removed = conn.execute("""
+                    UPDATE listings SET removed_at = ?
+                    WHERE store = ? AND run_id <> ? AND removed_at IS NULL
+                """, (now, store, run_id)).rowcount
+                conn.execute("DELETE FROM listing_cards WHERE store = ? AND run_id <> ?", (store, run_id))
+                if removed:
+                    print(f"{store}: {removed} προϊόντα δεν υπάρχουν πια")
+                affected.update(keys)
+
+            refresh_products(cursor, affected)
+            conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (now, run_id))
+    finally:
+        conn.close()
 
-    def get_gymbeam_variants(self, driver: webdriver.Chrome, product_url: str) -> List[Dict]:
-        """Get variant prices for GymBeam product"""
-        variants = []
-        try:
-            driver.get(product_url)
-            dropdown = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'select[aria-label="Γραμμάρια (γρ)"]'))
-            )
-            select = Select(dropdown)
-        
-            for option in select.options:
-                select.select_by_visible_text(option.text)
-                time.sleep(1)
-                price_element = WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'span[data-test="hp-bestsellers-price"]'))
-                )
-                variants.append({
-                    "size": option.text,
-                    "price": price_element.text.strip()
-                })
-    
-        except Exception:
-            pass
-    
-        return variants
 
+class ScrapeCancelled(Exception):
+    """Το job ενός καταστήματος σταμάτησε επειδή ακυρώθηκε (π.χ. ξεπέρασε το job_timeout)."""
 
-    def scroll_to_bottom(self, driver: webdriver.Chrome):
-        """Scroll to bottom of page for infinite loading"""
-        scroll_attempts = 0
-        max_attempts = 15
-        last_height = driver.execute_script("return document.body.scrollHeight")
-        
-        while scroll_attempts < max_attempts:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            sleep(2)
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight - 100);")
-            sleep(1)
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            sleep(2)
-            
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                scroll_attempts += 1
-            else:
-                scroll_attempts = 0
-            last_height = new_height
-            
-            try:
-                if driver.find_element(By.CLASS_NAME, "no-more-products").is_displayed():
-                    break
-            except:
-                pass
-
-    def process_price(self, price_element) -> str:
-        """Process price element to extract clean price"""
-        main_price = price_element.text.strip().replace('€', '').strip()
-        sup_element = price_element.find("sup")
-        if sup_element:
-            main_price = main_price.replace(sup_element.text, "")
-            return f"{main_price},{sup_element.text.strip()}"
-        return main_price
-
-
-def main():
-    reset_database()
-    scraper = WebScraper()
-    
-    # Katerelos URLs
-    katerelos_urls = [
-        "https://www.katerelosfitness.gr/category/794_800_797/prwteines_oros_galaktos.html",
-        "https://www.katerelosfitness.gr/category/794_800_797/prwteines_oros_galaktos.html?page=2",
-        "https://www.katerelosfitness.gr/category/794_800_778/prwteines_apomonwmenos_oros_galaktos.html",
-        "https://www.katerelosfitness.gr/category/794_800_778/prwteines_apomonwmenos_oros_galaktos.html?page=2",
-        "https://www.katerelosfitness.gr/category/794_800_798/prwteines_ydrolymenos_oros_galaktos.html"
-    ]
-    print("\n=== Scraping Katerelos ===")
-    katerelos_products = scraper.scrape_katerelos(katerelos_urls)
-    
-    # Fitrace URLs
-    fitrace_urls = [
-        'https://www.fitrace.gr/category/161/prwteines.html?page=1&sort=5a',
-        'https://www.fitrace.gr/category/161/prwteines.html?page=2&sort=5a',
-        'https://www.fitrace.gr/category/161/prwteines.html?page=3&sort=5a'
-    ]
-    print("\n=== Scraping Fitrace ===")
-    fitrace_products = scraper.scrape_fitrace(fitrace_urls)
-    
-    # Growling
-    print("\n=== Scraping Growling ===")
-    growling_products = scraper.scrape_growling('https://growlingstore.gr/product-category/proteines/')
-    
-    # Fit1 URLs
-    fit1_urls = [
-        'https://fit1.gr/category/whey-protein',
-        'https://fit1.gr/category/whey-protein-isolate',
-        'https://fit1.gr/category/hydrolyzed-whey-protein'
-    ]
-    print("\n=== Scraping Fit1 ===")
-    fit1_products = scraper.scrape_fit1(fit1_urls)
-    
-    # GymBeam
-    print("\n=== Scraping GymBeam ===")
-    gymbeam_products = scraper.scrape_gymbeam("https://gymbeam.gr/proteini-orou-galaktos")
 
+class IncompleteScrape(Exception):
+    """
+    Ένα κατάστημα τελείωσε αλλά κάποιες σελίδες του δεν διαβάστηκαν (αποτυχία fetch,
+    ανοιχτό circuit). Τα products είναι όσα βρέθηκαν και έχουν ήδη γραφτεί· οι υπόλοιπες
+    καταχωρήσεις του καταστήματος μένουν όπως ήταν.
+    """
 
-if __name__ == "__main__":
- main()
+    def __init__(self, store: str, products: int, lost: int):
+        super().__init__(f"Δεν διαβάστηκαν {lost} σελίδες του {store}")
+        self.products = products
+        self.lost = lost
 
-def analyze_products():
-    # Σύνδεση με τη βάση δεδομένων
-    conn = sqlite3.connect('products.db')
-    cursor = conn.cursor()
+
+def run_store_jobs(jobs: Dict[str, Callable[[threading.Event], int]], max_workers: int = 5,
+                   job_timeout: Optional[float] = None,
+                   on_result: Optional[Callable[[str, Dict], None]] = None,
+                   cancel_grace: float = 15, on_stopped: Optional[Callable[[], None]] = None) -> Dict[str, Dict]:
+    """
+    Τρέχει κάθε κατάστημα ως ξεχωριστό job σε worker pool.
+
+    Κάθε job καλείται με ένα threading.Event που γίνεται set όταν το job ακυρώνεται και
+    επιστρέφει το πλήθος των προϊόντων του (τα ίδια τα προϊόντα έχουν ήδη πάει στη βάση),
+    οπότε το "products" κάθε αποτελέσματος είναι αριθμός.
+    max_workers: πόσα καταστήματα τρέχουν ταυτόχρονα.
+    job_timeout: μέγιστος χρόνος (σε δευτερόλεπτα) για κάθε job από τη στιγμή που ξεκινάει.
+    Ένα job που σηκώνει IncompleteScrape καταγράφεται ως "partial" με τα προϊόντα που βρήκε.
+    Ένα job που ξεπερνάει το timeout καταγράφεται ως "timeout" και ακυρώνεται: τα threads δεν
+    σταματάνε βίαια, οπότε το job ελέγχει το Event σε κάθε σελίδα, scroll και "load more" και
+    πριν επιστρέψει η συνάρτηση περιμένουμε έως cancel_grace δευτερόλεπτα να σταματήσει.
+    on_result: καλείται (όνομα, αποτέλεσμα) μόλις τελειώσει ή λήξει κάθε job.
+    on_stopped: καλείται μία φορά όταν έχουν σταματήσει όλα τα jobs, π.χ. για να κλείσει ό,τι
+    μοιράζονται (scraper, browsers, cache). Αν κάποιο job δεν σταμάτησε μέσα στο cancel_grace,
+    καλείται από το thread του όταν τελειώσει, ώστε να μην κλείσει τίποτα κάτω από αυτό.
+    """
+    results = {name: {"status": "pending", "products": 0, "elapsed": 0.0, "error": None} for name in jobs}
+    started = {}
+    cancelled = {name: threading.Event() for name in jobs}
+    abandoned = set()
+
+    def run_job(name, job):
+        started[name] = time.monotonic()
+        return job(cancelled[name])
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="store")
+    futures = {executor.submit(run_job, name, job): name for name, job in jobs.items()}
+    pending = set(futures)
+    run_start = time.monotonic()
 
     try:
-        # Δημιουργία του πίνακα αν δεν υπάρχει
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS products (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            price TEXT NOT NULL,
-            source_url TEXT            
-        )
-        """)
+        while pending:
+            done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+
+            for future in done:
+                name = futures[future]
+                result = results[name]
+                result["elapsed"] = now - started.get(name, now)
+                try:
+                    result["products"] = future.result() or 0
+                    result["status"] = "ok"
+                except IncompleteScrape as e:
+                    result["products"] = e.products
+                    result["status"] = "partial"
+                    result["error"] = str(e)
+                except Exception as e:
+                    result["status"] = "error"
+                    result["error"] = str(e)
+                print(f"[{name}] {result['status']} σε {result['elapsed']:.1f}s")
+                if on_result is not None:
+                    on_result(name, result)
+
+            if job_timeout is None:
+                continue
+
+            for future in list(pending):
+                name = futures[future]
+                if name in started and now - started[name] > job_timeout:
+                    cancelled[name].set()
+                    pending.discard(future)
+                    abandoned.add(future)
+                    results[name]["status"] = "timeout"
+                    results[name]["elapsed"] = now - started[name]
+                    results[name]["error"] = f"Ξεπεράστηκε το όριο των {job_timeout}s"
+                    print(f"[{name}] timeout μετά από {job_timeout}s")
+                    if on_result is not None:
+                        on_result(name, results[name])
+    finally:
+        for event in cancelled.values():
+            event.set()
+        # Τα jobs που ακυρώθηκαν σταματάνε στον επόμενο έλεγχο του Event τους· μέχρι τότε
+        # χρησιμοποιούν ακόμα το scraper, οπότε το on_stopped περιμένει και αυτά
+        _, running = wait(abandoned, timeout=cancel_grace)
+        for future in running:
+            print(f"[{futures[future]}] δεν σταμάτησε μέσα σε {cancel_grace:.0f}s· οι γραμμές του δεν θα γραφτούν")
+        executor.shutdown(wait=False, cancel_futures=True)
+        if on_stopped is not None:
+            call_when_done(running, on_stopped)
+
+    print_run_summary(results, time.monotonic() - run_start)
+    return results
+
+
+def call_when_done(futures, callback: Callable[[], None]):
+    """Καλεί το callback μία φορά, αμέσως αν έχουν τελειώσει όλα τα futures, αλλιώς μόλις τελειώσει το τελευταίο."""
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(_):
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            callback()
+
+    if not futures:
+        callback()
+    for future in futures:
+        future.add_done_callback(done)
+
+
+def print_run_summary(results: Dict[str, Dict], total_elapsed: float):
+    """Εκτυπώνει συγκεντρωτική αναφορά για όλα τα jobs."""
+    print("\n=== Σύνοψη Scraping ===")
+    total_products = 0
+    for name, result in results.items():
+        count = result["products"]
+        total_products += count
+        line = f"{name:<12} {result['status']:<8} {count:>5} προϊόντα  {result['elapsed']:>7.1f}s"
+        if result["error"]:
+            line += f"  ({result['error']})"
+        print(line)
+    print(f"Σύνολο: {total_products} προϊόντα σε {total_elapsed:.1f}s")
+
+
+def write_run_report(run_id: int, results: Dict[str, Dict], metrics: RunMetrics, mode: str,
+                     prometheus: bool = False) -> Dict:
+    """
+    Γράφει την αναφορά του run σε JSON (run_reports/run-<id>.json) με τους χρόνους
+    κάθε σταδίου ανά κατάστημα και ανά URL, και με prometheus=True και το scrape.prom.
+    """
+    report = metrics.report(run_id, results, mode)
+    path = write_json_report(report, os.path.join(report_dir, f"run-{run_id}.json"))
+    print(f"Αναφορά run: {path}")
+    if prometheus:
+        print(f"Μετρήσεις Prometheus: {write_prometheus_report(report, os.path.join(report_dir, 'scrape.prom'))}")
+
+    for store, entry in report["stores"].items():
+        stages = ", ".join(f"{stage} {stats['total']:.1f}s" for stage, stats in entry["stages"].items())
+        print(f"{store:<12} {stages}")
+    return report
+
+
+def main(max_workers: int = 5, job_timeout: Optional[float] = None, incremental: bool = True,
+         prometheus: bool = False, stores: Optional[Dict[str, "StoreConfig"]] = None,
+         progress=None) -> Dict[str, Dict]:
+    """
+    Τρέχει όλους τους scrapers.
+
+    incremental=True κρατάει τα δεδομένα του προηγούμενου run: ξαναεπισκέπτεται μόνο
+    τις σελίδες προϊόντων που είναι νέες ή άλλαξαν, ενημερώνει όσα άλλαξαν και σημειώνει
+    όσα εξαφανίστηκαν. incremental=False σβήνει τη βάση και κάνει πλήρες scraping.
+    stores: τα καταστήματα προς scraping (προεπιλογή όλα τα STORES του stores.py).
+    progress: π.χ. progress.ScrapeProgress· λαμβάνει κάθε παρτίδα που γράφεται στη βάση
+    και το αποτέλεσμα κάθε καταστήματος, ώστε το UI να δείχνει την πρόοδο όσο τρέχει το run.
+    Στο τέλος οι τιμές καταγράφονται στο ιστορικό (βλ. history.record_run_prices) και
+    γράφεται η αναφορά του run (βλ. write_run_report).
+    """
+    # Η στοίβα του scraping φορτώνεται μόνο όταν ξεκινάει ένα run
+    from scraper import WebScraper
+    from stores import STORES
+
+    stores = STORES if stores is None else stores
+    if not incremental:
+        reset_database()
+    mode = "incremental" if incremental else "full"
+    run_id = start_run(mode)
+    scraper = WebScraper(incremental=incremental)
+
+    # Κάθε κατάστημα του registry (stores.py) τρέχει ως ξεχωριστό job
+    jobs = {name: partial(scraper.scrape_store, config) for name, config in stores.items()}
+    print(f"\n=== Scraping {len(jobs)} καταστημάτων (έως {max_workers} παράλληλα) ===")
+    # Όλοι οι scrapers γράφουν μέσω ενός κοινού writer. Το scraper κλείνει μόλις σταματήσουν
+    # όλα τα jobs, ακόμα κι αν κάποιο που έληξε συνεχίσει λίγο μετά το τέλος του run
+    with BulkWriter(run_id, metrics=scraper.metrics,
+                    on_batch=progress.add_listings if progress is not None else None) as writer:
+        results = run_store_jobs(jobs, max_workers=max_workers, job_timeout=job_timeout,
+                                 on_result=progress.finish_store if progress is not None else None,
+                                 on_stopped=scraper.close)
+    mark_write_failures(results, writer.failed)
+    finish_run(run_id, results)
+    # Τοπικά imports: το matching και το history εισάγουν από αυτό το module
+    from matching import assign_canonical_ids
+    from history import record_run_prices
+    print(f"Προϊόντα σε περισσότερα από ένα καταστήματα: {assign_canonical_ids()}")
+    print(f"Αλλαγές τιμών στο ιστορικό: {record_run_prices(run_id)}")
+    scraper.waiter.print_summary()
+    write_run_report(run_id, results, scraper.metrics, mode, prometheus=prometheus)
+    return results
+
+
+def format_ranked_product(position: int, row: tuple) -> str:
+    """Μορφοποιεί μια γραμμή (id, name, price, grams, price_per_gram, url) για εμφάνιση."""
+    product_id, name, price, grams, price_per_gram, url = row
+    return (f"Θέση #{position}\nΠροϊόν: {name}\nΤιμή: {price}€\nΒάρος: {grams}g\n"
+            f"Τιμή ανά γραμμάριο: {price_per_gram:.4f}€\nURL: {url}\n{'-'*100}")
+
+
+# Οι στήλες των dicts του UI (βλ. product_dict), με p τον πίνακα products
+PRODUCT_DICT_COLUMNS = """
+    p.id, p.name, p.price, p.grams, p.price_per_gram, p.source_url,
+    (SELECT GROUP_CONCAT(c.category, '|') FROM product_categories c WHERE c.product_id = p.id),
+    (SELECT GROUP_CONCAT(DISTINCT l.store) FROM listings l
+     WHERE l.name_key = p.name_key AND l.removed_at IS NULL)
+"""
+
+
+def product_dict(row: tuple) -> Dict:
+    """Μια γραμμή με τις στήλες PRODUCT_DICT_COLUMNS ως dict (βλ. product_rows)."""
+    product_id, name, price, grams, price_per_gram, url, categories, stores = row
+    return {
+        "id": product_id,
+        "name": name,
+        "price": price,
+        "grams": grams,
+        "price_per_gram": price_per_gram,
+        "url": url,
+        "categories": categories.split("|") if categories else [],
+        "stores": sorted(stores.split(",")) if stores else [urlparse(url.split(", ")[0]).netloc],
+    }
+
+
+def product_rows() -> List[Dict]:
+    """
+    Όλα τα προϊόντα ως dicts για τη λίστα αποτελεσμάτων του UI: id, name, price, grams,
+    price_per_gram, url, categories (λίστα) και stores (τα καταστήματα με ενεργή καταχώρηση,
+    ή ο host του URL για προϊόντα χωρίς καταχωρήσεις).
+    """
+    conn = connect_db()
+    try:
+        create_products_table(conn.cursor())
+        create_listing_tables(conn.cursor())
         conn.commit()
+        rows = conn.execute(f"SELECT {PRODUCT_DICT_COLUMNS} FROM products p").fetchall()
+    finally:
+        conn.close()
+    return [product_dict(row) for row in rows]
 
-        # Παίρνουμε όλα τα προϊόντα
-        cursor.execute("SELECT id, name, price, source_url FROM products")
-        products = cursor.fetchall()
 
-        # Λίστα για τα προϊόντα με υπολογισμένη τιμή ανά γραμμάριο
-        products_with_price_per_gram = []
+def search_product_ids(query: str, limit: Optional[int] = None) -> List[int]:
+    """
+    Αναζήτηση ελεύθερου κειμένου στα ονόματα των προϊόντων. Κάθε λέξη του query πρέπει να
+    ξεκινάει κάποια λέξη του ονόματος, χωρίς διάκριση πεζών/κεφαλαίων και τόνων (βλ. fold_text).
+    Επιστρέφει τα ids, φθηνότερα ανά γραμμάριο πρώτα (όσα δεν έχουν βάρος στο τέλος).
+    Χωρίς FTS5 διατρέχει τον πίνακα products με το ίδιο ταίριασμα.
+    """
+    match = search_match(query.split())
+    if not match:
+        return []
+    conn = connect_db()
+    try:
+        create_products_table(conn.cursor())
+        conn.commit()
+        if has_search_index(conn.cursor()):
+            rows = conn.execute("""
+                SELECT p.id FROM products_fts f JOIN products p ON p.id = f.rowid
+                WHERE products_fts MATCH ?
+                ORDER BY p.price_per_gram IS NULL, p.price_per_gram
+                LIMIT ?
+            """, (match, -1 if limit is None else limit)).fetchall()
+            return [product_id for product_id, in rows]
+        rows = conn.execute("SELECT id, name FROM products ORDER BY price_per_gram IS NULL, price_per_gram").fetchall()
+    finally:
+        conn.close()
 
-        for product in products:
-            product_id, name, price, url = product
+    terms = [words for words in map(search_words, query.split()) if words]
+    found = [product_id for product_id, name in rows
+             if all(matches_phrase(search_words(name), words) for words in terms)]
+    return found if limit is None else found[:limit]
 
-            try:
-                # Μετατροπή της τιμής σε float αφού αφαιρεθούν μη απαραίτητα σύμβολα
-                clean_price = float(str(price).replace('€', '').replace(',', '.').strip())
 
-                # **Διόρθωση τιμής αν είναι μικρότερη από 1**
-                if clean_price < 1:
-                    clean_price *= 100
-                    cursor.execute(
-                        "UPDATE products SET price = ? WHERE id = ?",
-                        (f"{clean_price:.2f}", product_id)
-                    )
-                    conn.commit()
+def search_products(query: str, limit: Optional[int] = 50) -> List[Dict]:
+    """Τα προϊόντα του search_product_ids ως dicts (όπως το product_rows), με την ίδια σειρά."""
+    ids = search_product_ids(query, limit)
+    if not ids:
+        return []
+    conn = connect_db()
+    try:
+        create_listing_tables(conn.cursor())
+        conn.commit()
+        rows = conn.execute(f"""
+            SELECT {PRODUCT_DICT_COLUMNS} FROM products p
+            WHERE p.id IN (SELECT value FROM json_each(?))
+        """, (json.dumps(ids),)).fetchall()
+    finally:
+        conn.close()
+    position = {product_id: index for index, product_id in enumerate(ids)}
+    return sorted(map(product_dict, rows), key=lambda product: position[product["id"]])
 
-                # Εύρεση γραμμαρίων στο όνομα του προϊόντος
-                grams_match = re.search(r"(\d+)\s*(g|gr|grams|Γραμμάρια)", name, re.IGNORECASE)
-                if grams_match:
-                    grams = int(grams_match.group(1))
 
-                    # Υπολογισμός τιμής ανά γραμμάριο
-                    price_per_gram = clean_price / grams
+def analyze_products():
+    # Σύνδεση με τη βάση δεδομένων
+    conn = connect_db()
+    cursor = conn.cursor()
 
-                    products_with_price_per_gram.append((product_id, name, clean_price, grams, price_per_gram, url))
+    try:
+        # Δημιουργία του πίνακα αν δεν υπάρχει
+        create_products_table(cursor)
+        conn.commit()
 
-            except (ValueError, TypeError, ZeroDivisionError) as e:
-                continue
-            
-        # Ταξινόμηση με βάση την τιμή ανά γραμμάριο και πάρε τα top 5
-        sorted_products = sorted(products_with_price_per_gram, key=lambda x: x[4])[:5]
+        # Η τιμή ανά γραμμάριο έχει υπολογιστεί κατά την εισαγωγή, οπότε τα top 5
+        # έρχονται κατευθείαν από το index
+        cursor.execute("""
+            SELECT id, name, price, grams, price_per_gram, source_url FROM products
+            WHERE price_per_gram IS NOT NULL
+            ORDER BY price_per_gram
+            LIMIT 5
+        """)
 
         # Επιστρέφει τα αποτελέσματα
-        result_text = []
-        for i, product in enumerate(sorted_products, 1):
-            product_id, name, price, grams, price_per_gram, url = product
-            result_text.append(f"Θέση #{i}\nΠροϊόν: {name}\nΤιμή: {price}€\nΒάρος: {grams}g\nΤιμή ανά γραμμάριο: {price_per_gram:.4f}€\nURL: {url}\n{'-'*100}")
-
-        return result_text  # Επιστρέφει τη λίστα με τα αποτελέσματα
+        return [format_ranked_product(i, row) for i, row in enumerate(cursor.fetchall(), 1)]
 
     except sqlite3.Error as e:
         return [f"Σφάλμα βάσης δεδομένων: {e}"]
@@ -484,66 +1171,20 @@ def clean_duplicate_products():
     """
     Καθαρίζει τη βάση δεδομένων από διπλότυπα προϊόντα, κρατώντας το προϊόν με τη χαμηλότερη τιμή.
     Αν δύο προϊόντα έχουν την ίδια τιμή, συνδυάζει τα URLs τους.
+
+    Τα διπλότυπα λύνονται ήδη κατά την εισαγωγή (UNIQUE name_key + upsert), οπότε εδώ
+    συγχωνεύονται μόνο όσες γραμμές δεν έχουν ακόμα κλειδί, σε ένα transaction.
     """
-    conn = sqlite3.connect('products.db')  # Ονομασία της βάσης δεδομένων
+    conn = connect_db()
     cursor = conn.cursor()
 
     try:
-        # Λήψη όλων των προϊόντων από τη βάση δεδομένων
-        cursor.execute("SELECT id, name, price, source_url FROM products")
-        products = cursor.fetchall()
-
-        print(f"Total products fetched: {len(products)}")  # Debug
-
-        # Dictionary για μοναδικά προϊόντα
-        unique_products = {}
-
-        for prod_id, name, price, url in products:
-            try:
-                # Καθαρισμός τιμής και κανονικοποίηση ονόματος
-                clean_price = float(str(price).replace('€', '').replace(',', '.').strip())
-                normalized_name = re.sub(r'\s+', ' ', name).strip().lower()
-                
-                current_data = unique_products.get(normalized_name)
-                
-                if current_data is None:
-                    # Αν δεν υπάρχει, το προσθέτουμε
-                    unique_products[normalized_name] = {
-                        'name': name,
-                        'price': clean_price,
-                        'urls': {url}
-                    }
-                else:
-                    # Αν υπάρχει, συγκρίνουμε τιμές
-                    if clean_price < current_data['price']:
-                        # Αν βρεθεί χαμηλότερη τιμή, ενημερώνουμε
-                        current_data['price'] = clean_price
-                        current_data['urls'] = {url}
-                    elif clean_price == current_data['price']:
-                        # Αν οι τιμές είναι ίδιες, προσθέτουμε το URL
-                        current_data['urls'].add(url)
-
-            except (ValueError, TypeError) as e:
-                print(f"Error processing product {prod_id}: {e}")
-                continue
-
-        print(f"Unique products found: {len(unique_products)}")  # Debug
-
-        # Καθαρισμός του πίνακα `products`
-        cursor.execute("DELETE FROM products")
-        conn.commit()
-
-        # Εισαγωγή καθαρισμένων δεδομένων πίσω στη βάση
-        for product_data in unique_products.values():
-            cursor.execute("""
-                INSERT INTO products (name, price, source_url)
-                VALUES (?, ?, ?)
-            """, (
-                product_data['name'],
-                product_data['price'],
-                ', '.join(product_data['urls'])
-            ))
-        conn.commit()
+        with conn:
+            create_products_table(cursor)
+            merged = merge_unkeyed_products(cursor)
+        total = cursor.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        print(f"Products merged: {merged}")  # Debug
+        print(f"Unique products found: {total}")  # Debug
         print("Database cleaned and updated with unique products.")
 
     except sqlite3.Error as e:
@@ -553,69 +1194,78 @@ def clean_duplicate_products():
 
 
 
+def format_category_ranking(category_name, sorted_products, top_n=5):
+    """Μορφοποιεί τα Top προϊόντα (id, name, price, grams, price_per_gram, url) μιας κατηγορίας."""
+    results = []
+    results.append(f"\nΤα Top {top_n} προϊόντα για την κατηγορία '{category_name}':")
+    results.append("-" * 100)
+    
+    for i, product in enumerate(sorted_products, 1):
+        product_id, name, price, grams, price_per_gram, url = product
+        results.append(f"Θέση #{i}")
+        results.append(f"Προϊόν: {name}")
+        results.append(f"Τιμή: {price}€")
+        results.append(f"Βάρος: {grams}g")
+        results.append(f"Τιμή ανά γραμμάριο: {price_per_gram:.4f}€")
+        results.append(f"URL: {url}")
+        results.append("-" * 100)
+
+    return results
+
+
 def get_top_products_by_category(category_keywords, category_name, top_n=5):
     """
     Επιστρέφει τα Top προϊόντα μιας κατηγορίας με βάση λέξεις-κλειδιά.
+    Για τις γνωστές κατηγορίες (CATEGORIES) είναι ένα ORDER BY ... LIMIT πάνω στο index.
+    Άλλες λέξεις-κλειδιά ψάχνονται στο ευρετήριο κειμένου (βλ. search_match): μια λέξη-κλειδί
+    ταιριάζει όταν ξεκινάει κάποια λέξη του ονόματος, χωρίς διάκριση πεζών/κεφαλαίων και τόνων.
     """
-    conn = sqlite3.connect('products.db')
+    conn = connect_db()
     cursor = conn.cursor()
-    results = []
 
     try:
-        cursor.execute("SELECT id, name, price, source_url FROM products")
-        products = cursor.fetchall()
-
-        filtered_products = []
-
-        for product in products:
-            product_id, name, price, url = product
-
-            if any(keyword.lower() in name.lower() for keyword in category_keywords):
-                try:
-                    clean_price = float(str(price).replace('€', '').replace(',', '.').strip())
-
-                    # Βελτιωμένο pattern για να αναγνωρίζει περισσότερες μορφές βάρους
-                    weight_patterns = [
-                        r"(\d+(?:\.\d+)?)\s*(?:g|gr|grams|Γραμμάρια)",
-                        r"(\d+(?:\.\d+)?)\s*(?:kg|KG|κιλά|kgs)",
-                        r"(\d+(?:\.\d+)?)\s*k(?=\s|$)"
-                    ]
-
-                    grams = None
-                    for pattern in weight_patterns:
-                        match = re.search(pattern, name, re.IGNORECASE)
-                        if match:
-                            weight = float(match.group(1))
-                            if 'kg' in pattern.lower() or 'k' in pattern.lower():
-                                grams = int(weight * 1000)
-                            else:
-                                grams = int(weight)
-                            break
-
-                    if grams:
-                        price_per_gram = clean_price / grams
-                        filtered_products.append((product_id, name, clean_price, grams, price_per_gram, url))
-
-                except (ValueError, TypeError, ZeroDivisionError) as e:
-                    results.append(f"Σφάλμα κατά την επεξεργασία του προϊόντος {product_id}: {e}")
-                    continue
+        create_products_table(cursor)
+        conn.commit()
 
-        sorted_products = sorted(filtered_products, key=lambda x: x[4])[:top_n]
+        if CATEGORIES.get(category_name) == list(category_keywords):
+            cursor.execute("""
+                SELECT p.id, p.name, p.price, p.grams, p.price_per_gram, p.source_url
+                FROM product_categories c
+                JOIN products p ON p.id = c.product_id
+                WHERE c.category = ?
+                ORDER BY c.price_per_gram
+                LIMIT ?
+            """, (category_name, top_n))
+            sorted_products = cursor.fetchall()
+        elif has_search_index(cursor):
+            # Άγνωστες λέξεις-κλειδιά: τα προϊόντα που ταιριάζουν έρχονται από το ευρετήριο
+            # κειμένου και ταξινομούνται μόνο αυτά
+            match = search_match(category_keywords, match_any=True)
+            sorted_products = cursor.execute("""
+                SELECT p.id, p.name, p.price, p.grams, p.price_per_gram, p.source_url
+                FROM products_fts f JOIN products p ON p.id = f.rowid
+                WHERE products_fts MATCH ? AND p.price_per_gram IS NOT NULL
+                ORDER BY p.price_per_gram
+                LIMIT ?
+            """, (match, top_n)).fetchall() if match else []
+        else:
+            # Χωρίς FTS5: διατρέχουμε τα προϊόντα με σειρά τιμής ανά γραμμάριο
+            # και σταματάμε μόλις βρεθούν top_n
+            phrases = [words for words in map(search_words, category_keywords) if words]
+            sorted_products = []
+            cursor.execute("""
+                SELECT id, name, price, grams, price_per_gram, source_url FROM products
+                WHERE price_per_gram IS NOT NULL
+                ORDER BY price_per_gram
+            """)
+            for product in cursor:
+                words = search_words(product[1])
+                if any(matches_phrase(words, phrase) for phrase in phrases):
+                    sorted_products.append(product)
+                    if len(sorted_products) == top_n:
+                        break
 
-        results.append(f"\nΤα Top {top_n} προϊόντα για την κατηγορία '{category_name}':")
-        results.append("-" * 100)
-        
-        for i, product in enumerate(sorted_products, 1):
-            product_id, name, price, grams, price_per_gram, url = product
-            results.append(f"Θέση #{i}")
-            results.append(f"Προϊόν: {name}")
-            results.append(f"Τιμή: {price}€")
-            results.append(f"Βάρος: {grams}g")
-            results.append(f"Τιμή ανά γραμμάριο: {price_per_gram:.4f}€")
-            results.append(f"URL: {url}")
-            results.append("-" * 100)
-
-        return results
+        return format_category_ranking(category_name, sorted_products, top_n)
 
     except sqlite3.Error as e:
         return [f"Σφάλμα βάσης δεδομένων: {e}"]
@@ -623,20 +1273,16 @@ def get_top_products_by_category(category_keywords, category_name, top_n=5):
         conn.close()
 
 def top_isolate_products():
-    keywords = ['iso', 'isolated', 'απομονωμένος ορός γάλακτος']
-    return get_top_products_by_category(keywords, "Isolate")
+    return get_top_products_by_category(CATEGORIES["Isolate"], "Isolate")
 
 def top_mass_gainer_products():
-    keywords = ['mass', 'gainer', 'μάζα']
-    return get_top_products_by_category(keywords, "Mass Gainer")
+    return get_top_products_by_category(CATEGORIES["Mass Gainer"], "Mass Gainer")
 
 def top_hydrolyzed_products():
-    keywords = ['hydro', 'hydrolized', 'υδρολυμένος']
-    return get_top_products_by_category(keywords, "Hydrolyzed")
+    return get_top_products_by_category(CATEGORIES["Hydrolyzed"], "Hydrolyzed")
 
 def top_whey_products():
-    keywords = ['whey', 'ορρός γάλακτος']
-    return get_top_products_by_category(keywords, "Whey")
+    return get_top_products_by_category(CATEGORIES["Whey"], "Whey")
 
 # top_whey_products()
 # top_isolate_products()
@@ -654,3 +1300,9 @@ def top_whey_products():
 
 # analyze_products()
 
+
+if __name__ == "__main__":
+    # Το scraper.py εισάγει το sidp02, οπότε το run τρέχει από το module sidp02 και όχι από
+    # το __main__ (αλλιώς ο writer του run θα ήταν σε διαφορετικό αντίγραφο του module)
+    import sidp02
+    sidp02.main()
@@ -0,0 +1,166 @@
+"""
+Τα καταστήματα ως δεδομένα: για κάθε κατάστημα οι αρχικές σελίδες (μία ανά κατηγορία),
+ο parser της σελίδας λίστας (parsers.py), ο τρόπος φόρτωσης (HTTP ή browser) και η
+σελιδοποίηση. Το WebScraper.scrape_store διαβάζει μια εγγραφή και κάνει το scraping,
+οπότε ένα νέο κατάστημα ή μια νέα κατηγορία είναι μια αλλαγή εδώ και όχι νέα μέθοδος.
+
+Σελιδοποίηση:
+    pages            σελίδες με αριθμό στο query (?page=N). Το πλήθος των σελίδων βγαίνει από
+                     τους συνδέσμους σελιδοποίησης της πρώτης και οι υπόλοιπες κατεβαίνουν
+                     όλες μαζί παράλληλα (και ξανά, αν κάποια δείξει ακόμα περισσότερες).
+    load_more        browser, κλικ στο κουμπί button μέχρι να μην έρχονται νέα προϊόντα
+    infinite_scroll  browser, scroll μέχρι το τέλος ή μέχρι να φανεί το στοιχείο done
+    none             μία σελίδα
+
+Τα καταστήματα με browser έχουν προφίλ φόρτωσης (RenderProfile): πότε θεωρείται φορτωμένη
+η σελίδα και ποιοι πόροι δεν κατεβαίνουν καθόλου (εικόνες, γραμματοσειρές, trackers), αφού
+από τη σελίδα διαβάζουμε μόνο κείμενο και τιμές. Στα runs μετριούνται μόνο τα bytes και ο χρόνος
+με το προφίλ του καταστήματος (render_bytes και render στην αναφορά)· πόσα γλιτώνει σε σχέση με
+το FULL_PROFILE μετριέται μόνο με το benchmarks/bench_render.py, που φορτώνει κάθε σελίδα και
+με τα δύο.
+"""
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from parsers import (parse_fit1, parse_fitrace, parse_growling, parse_gymbeam_listing, parse_gymbeam_variants,
+                     parse_katerelos)
+
+
+class Pagination(NamedTuple):
+    kind: str = "none"
+    # pages: η παράμετρος του query με τον αριθμό σελίδας
+    param: str = "page"
+    # load_more: η κλάση του κουμπιού
+    button: Optional[str] = None
+    # infinite_scroll: η κλάση του στοιχείου που εμφανίζεται στο τέλος της λίστας
+    done: Optional[str] = None
+
+
+# URL patterns (για το Network.setBlockedURLs του Chrome) ανά τύπο πόρου
+RESOURCE_PATTERNS = {
+    "image": ("jpg", "jpeg", "png", "gif", "webp", "avif", "svg", "ico"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "ogg", "mp3", "m4a"),
+    "stylesheet": ("css",),
+}
+
+# Analytics, διαφημίσεις, chat και pixels που φορτώνουν τα καταστήματα
+TRACKER_DOMAINS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "googleadservices.com", "facebook.net", "facebook.com", "hotjar.com", "clarity.ms", "tiktok.com",
+    "criteo.com", "criteo.net", "bing.com", "pinterest.com", "tawk.to", "smartsupp.com", "onesignal.com",
+    "skroutz.gr", "bestprice.gr", "youtube.com",
+)
+
+
+class RenderProfile(NamedTuple):
+    # eager: η σελίδα είναι έτοιμη με το DOMContentLoaded· normal: περιμένουμε και το load
+    page_load: str = "eager"
+    # Τύποι πόρων (κλειδιά του RESOURCE_PATTERNS) που δεν κατεβαίνουν
+    block: Tuple[str, ...] = ("image", "font", "media")
+    # Domains (και subdomains) από τα οποία δεν κατεβαίνει τίποτα
+    blocked_domains: Tuple[str, ...] = TRACKER_DOMAINS
+
+
+# Όπως ένας κανονικός browser: όλοι οι πόροι, αναμονή για το load
+FULL_PROFILE = RenderProfile(page_load="normal", block=(), blocked_domains=())
+LIGHT_PROFILE = RenderProfile()
+
+
+def blocked_url_patterns(profile: RenderProfile) -> List[str]:
+    """Τα URL patterns που μπλοκάρει ένα προφίλ (με ή χωρίς query μετά την κατάληξη)."""
+    patterns = []
+    for kind in profile.block:
+        for extension in RESOURCE_PATTERNS[kind]:
+            patterns += [f"*.{extension}", f"*.{extension}?*"]
+    for domain in profile.blocked_domains:
+        patterns += [f"*://{domain}/*", f"*://*.{domain}/*", f"*://{domain}:*", f"*://*.{domain}:*"]
+    return patterns
+
+
+class StoreConfig(NamedTuple):
+    name: str
+    urls: List[str]
+    parse: Callable[[str], List[Dict]]
+    render: str = "http"
+    pagination: Pagination = Pagination()
+    # browser: ο CSS selector των καρτών, για την αναμονή μέχρι να σταθεροποιηθεί η σελίδα
+    product_selector: Optional[str] = None
+    # Αν οριστεί, οι κάρτες της λίστας έχουν "url" και τα προϊόντα (μεγέθη και τιμές)
+    # διαβάζονται από κάθε σελίδα προϊόντος με αυτή τη συνάρτηση
+    variants: Optional[Callable[[str], List[Dict]]] = None
+    # Μέθοδος του WebScraper (product_url -> variants) για όσες σελίδες προϊόντων
+    # δεν έχουν τα δεδομένα στο HTML και θέλουν browser
+    variants_fallback: Optional[str] = None
+    # browser: πώς φορτώνονται οι σελίδες (και του variants_fallback)
+    profile: RenderProfile = LIGHT_PROFILE
+
+
+STORES: Dict[str, StoreConfig] = {
+    "Katerelos": StoreConfig(
+        name="Katerelos",
+        urls=[
+            "https://www.katerelosfitness.gr/category/794_800_797/prwteines_oros_galaktos.html",
+            "https://www.katerelosfitness.gr/category/794_800_778/prwteines_apomonwmenos_oros_galaktos.html",
+            "https://www.katerelosfitness.gr/category/794_800_798/prwteines_ydrolymenos_oros_galaktos.html",
+        ],
+        parse=parse_katerelos,
+        pagination=Pagination("pages"),
+    ),
+    "Fitrace": StoreConfig(
+        name="Fitrace",
+        urls=["https://www.fitrace.gr/category/161/prwteines.html?page=1&sort=5a"],
+        parse=parse_fitrace,
+        pagination=Pagination("pages"),
+    ),
+    "Growling": StoreConfig(
+        name="Growling",
+        urls=["https://growlingstore.gr/product-category/proteines/"],
+        parse=parse_growling,
+        render="browser",
+        pagination=Pagination("load_more", button="load-more"),
+        product_selector="h3.product-name",
+    ),
+    "Fit1": StoreConfig(
+        name="Fit1",
+        urls=[
+            "https://fit1.gr/category/whey-protein",
+            "https://fit1.gr/category/whey-protein-isolate",
+            "https://fit1.gr/category/hydrolyzed-whey-protein",
+        ],
+        parse=parse_fit1,
+        render="browser",
+        pagination=Pagination("infinite_scroll", done="no-more-products"),
+        product_selector="div.brand-line",
+    ),
+    "GymBeam": StoreConfig(
+        name="GymBeam",
+        urls=["https://gymbeam.gr/proteini-orou-galaktos"],
+        parse=parse_gymbeam_listing,
+        render="browser",
+        pagination=Pagination("load_more", button="amscroll-load-button"),
+        product_selector=".product-item",
+        variants=parse_gymbeam_variants,
+        variants_fallback="get_gymbeam_variants_pooled",
+    ),
+}
+
+
+def store_config(name: str, urls: Optional[List[str]] = None) -> StoreConfig:
+    """Η εγγραφή ενός καταστήματος, με άλλες αρχικές σελίδες αν δοθούν urls."""
+    config = STORES[name]
+    return config._replace(urls=list(urls)) if urls is not None else config
+
+
+def page_url(url: str, param: str, number: int) -> str:
+    """Το url με τον αριθμό σελίδας number στην παράμετρο param (οι υπόλοιπες μένουν ίδιες)."""
+    parts = urlparse(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != param]
+    query.append((param, str(number)))
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+
+def current_page(url: str, param: str) -> int:
+    """Ο αριθμός σελίδας του url (1 αν δεν έχει την παράμετρο)."""
+    value = dict(parse_qsl(urlparse(url).query)).get(param, "1")
+    return int(value) if value.isdigit() else 1
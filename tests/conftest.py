@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+import sidp02  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Η βάση των προϊόντων σε προσωρινό φάκελο."""
+    path = str(tmp_path / "products.db")
+    monkeypatch.setattr(sidp02, "db_path", path)
+    return path
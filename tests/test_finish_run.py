@@ -0,0 +1,61 @@
+import sidp02
+
+
+def write_run(products: list, results: dict) -> int:
+    """Ένα run που γράφει τα (store, name, price) μέσω του BulkWriter και κλείνει με τα results."""
+    run_id = sidp02.start_run("full")
+    with sidp02.BulkWriter(run_id) as writer:
+        for index, (store, name, price) in enumerate(products):
+            writer.submit(store, name, price, f"https://{store.lower()}.example/p/{index}")
+    sidp02.mark_write_failures(results, writer.failed)
+    sidp02.finish_run(run_id, results)
+    return run_id
+
+
+def active_listings() -> set:
+    conn = sidp02.connect_db()
+    try:
+        return set(conn.execute("SELECT store, name FROM listings WHERE removed_at IS NULL").fetchall())
+    finally:
+        conn.close()
+
+
+FIRST_RUN = [
+    ("Katerelos", "Whey Protein 1kg", 30.0),
+    ("Katerelos", "Iso Whey 2kg", 55.0),
+    ("Fitrace", "Mass Gainer 3kg", 40.0),
+]
+
+
+def test_finish_run_tombstones_listings_missing_from_complete_store(db_path):
+    write_run(FIRST_RUN, {"Katerelos": {"status": "ok"}, "Fitrace": {"status": "ok"}})
+    run_id = write_run([("Katerelos", "Whey Protein 1kg", 29.0), ("Fitrace", "Mass Gainer 3kg", 40.0)],
+                       {"Katerelos": {"status": "ok"}, "Fitrace": {"status": "ok"}})
+
+    assert active_listings() == {("Katerelos", "Whey Protein 1kg"), ("Fitrace", "Mass Gainer 3kg")}
+    assert sorted(product["name"] for product in sidp02.product_rows()) == ["Mass Gainer 3kg", "Whey Protein 1kg"]
+    conn = sidp02.connect_db()
+    try:
+        assert conn.execute("SELECT finished_at FROM runs WHERE id = ?", (run_id,)).fetchone()[0] is not None
+    finally:
+        conn.close()
+
+
+def test_finish_run_keeps_listings_of_incomplete_stores(db_path):
+    write_run(FIRST_RUN, {"Katerelos": {"status": "ok"}, "Fitrace": {"status": "ok"}})
+    write_run([("Katerelos", "Whey Protein 1kg", 30.0)],
+              {"Katerelos": {"status": "partial", "error": "1 σελίδα δεν διαβάστηκε"},
+               "Fitrace": {"status": "timeout", "error": "job_timeout"}})
+
+    assert active_listings() == {(store, name) for store, name, _ in FIRST_RUN}
+
+
+def test_finish_run_keeps_listings_of_store_with_unwritten_rows(db_path):
+    write_run(FIRST_RUN, {"Katerelos": {"status": "ok"}, "Fitrace": {"status": "ok"}})
+    results = {"Katerelos": {"status": "ok"}, "Fitrace": {"status": "ok"}}
+    # Μια γραμμή χωρίς τιμή παραβιάζει το NOT NULL και η παρτίδα αποτυγχάνει
+    write_run([("Katerelos", "Whey Protein 1kg", None)], results)
+
+    assert results["Katerelos"]["status"] == "partial"
+    assert ("Katerelos", "Iso Whey 2kg") in active_listings()
+    assert ("Fitrace", "Mass Gainer 3kg") not in active_listings()
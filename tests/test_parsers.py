@@ -0,0 +1,40 @@
+import pytest
+
+import fixtures
+from parsers import STORE_PARSERS, clean_text, parse_gymbeam_variants
+
+
+def expected_products(store: str, count: int) -> list:
+    """Τα προϊόντα του fixtures.catalog όπως πρέπει να τα δώσει ο parser του store."""
+    products = []
+    for brand, product, weight, slug, price in fixtures.catalog(count):
+        if store == "GymBeam":
+            products.append({"name": f"{brand} {product}", "url": f"https://gymbeam.gr/{slug}.html",
+                             "price": fixtures.euro(price)})
+        elif store == "Fit1":
+            products.append({"name": f"{brand} {product} {weight}", "price": f"{price:.2f}".replace(".", ",")})
+        else:
+            name = f"{brand} {product} {weight}"
+            # Katerelos και Fitrace κρατάνε μόνο τους ASCII χαρακτήρες του ονόματος (βλ. clean_text)
+            products.append({"name": clean_text(name) if store in ("Katerelos", "Fitrace") else name,
+                             "price": fixtures.euro(price)})
+    return products
+
+
+@pytest.mark.parametrize("store", sorted(STORE_PARSERS))
+def test_listing_parser_reads_every_card(store):
+    assert STORE_PARSERS[store](fixtures.store_page(store, 25)) == expected_products(store, 25)
+
+
+@pytest.mark.parametrize("store", sorted(STORE_PARSERS))
+def test_listing_parser_on_page_without_products(store):
+    assert STORE_PARSERS[store](fixtures.page(store, [])) == []
+
+
+def test_gymbeam_variants_take_the_lowest_price_of_each_size():
+    brand, product, weight, slug, price = item = fixtures.catalog(1)[0]
+    variants = parse_gymbeam_variants(fixtures.gymbeam_product_page(*item))
+    assert [variant["size"] for variant in variants] == fixtures.GYMBEAM_SIZES
+    assert [variant["price"] for variant in variants] == [
+        f"{round(price * (index + 1) * 0.9, 2):.2f}" for index in range(len(fixtures.GYMBEAM_SIZES))
+    ]